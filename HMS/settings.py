@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'accounts',
     'guests',
@@ -79,13 +80,20 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'Frontend'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory for the life of the process
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.hotel',
             ],
         },
     },
@@ -116,6 +124,93 @@ DATABASES = {
 }
 
 
+##########################
+# CACHE CONFIGURATION
+##########################
+
+# Login throttling and other cross-request state live in the cache, so
+# multi-worker deployments must point this at a shared backend
+# (e.g. django.core.cache.backends.redis.RedisCache).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='hms-default'),
+    },
+    # Password-reset OTPs. For multiple workers use a shared Redis/Memcached
+    # cache, whose incr() keeps the attempt limit atomic; the database
+    # backend (run `createcachetable`) also works but counts less strictly.
+    'otp': {
+        'BACKEND': config('OTP_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('OTP_CACHE_LOCATION', default='hms-otp'),
+    },
+    # {% cache %} fragments in templates. Kept per process on purpose so a
+    # deploy (new hashed static URLs) never serves stale fragments.
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hms-template-fragments',
+    },
+}
+
+
+##########################
+# LOGIN THROTTLING
+##########################
+
+LOGIN_THROTTLE_CACHE_ALIAS = 'default'
+LOGIN_THROTTLE_WINDOW = config('LOGIN_THROTTLE_WINDOW', default=3600, cast=int)
+
+
+##########################
+# PASSWORD RESET OTP
+##########################
+
+OTP_CACHE_ALIAS = 'otp'
+
+
+##########################
+# AUTHENTICATION
+##########################
+
+# Session users are loaded together with their Hotel in one query. The pair is
+# cached only when this alias is shared by all workers (not LocMem/Dummy), so a
+# password change or deactivation takes effect everywhere at once.
+AUTHENTICATION_BACKENDS = ['accounts.backends.HotelUserBackend']
+HOTEL_USER_CACHE_ALIAS = 'default'
+HOTEL_USER_CACHE_TIMEOUT = config('HOTEL_USER_CACHE_TIMEOUT', default=300, cast=int)
+
+
+##########################
+# BILLING
+##########################
+
+# Tax posted with each night's room charge by the night audit (0.13 = 13%)
+ROOM_TAX_RATE = config('ROOM_TAX_RATE', default='0.13')
+
+# Rendered invoice PDFs, named by content hash (kept out of MEDIA_ROOT so they are never public)
+INVOICE_PDF_DIR = config('INVOICE_PDF_DIR', default=str(BASE_DIR / 'invoice_pdfs'))
+
+
+##########################
+# REPORTS
+##########################
+
+# Forecasts are keyed by hotel and business date, so they roll over daily
+REPORTS_CACHE_ALIAS = 'default'
+FORECAST_CACHE_TIMEOUT = config('FORECAST_CACHE_TIMEOUT', default=6 * 3600, cast=int)
+
+# CSV artifacts written by run_report_jobs (outside MEDIA_ROOT, served only to their hotel)
+REPORT_ARTIFACT_DIR = config('REPORT_ARTIFACT_DIR', default=str(BASE_DIR / 'report_artifacts'))
+
+
+##########################
+# REFERRALS
+##########################
+
+# Share of a referred guest's room revenue earned by each referrer up the chain,
+# nearest first (direct referrer 5%, their referrer 2%); the chain stops after the last rate
+REFERRAL_REWARD_RATES = config('REFERRAL_REWARD_RATES', default='0.05,0.02')
+
+
 ##########################
 # PASSWORD VALIDATION
 ##########################
@@ -146,6 +241,25 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Hashed, minified and precompressed assets (requires collectstatic)
+STATIC_PIPELINE = config('STATIC_PIPELINE', default=False, cast=bool)
+
+# Serve STATIC_ROOT from Django itself when there is no CDN/proxy in front
+SERVE_STATIC = config('SERVE_STATIC', default=False, cast=bool)
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'core.storage.CompressedManifestStaticFilesStorage'
+            if STATIC_PIPELINE else
+            'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+
 
 ##########################
 # MEDIA FILES CONFIG
@@ -161,6 +275,9 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Skips load tests and benchmarks unless run with `--tag load`
+TEST_RUNNER = 'core.testing.TestRunner'
+
 
 ##########################
 # EMAIL SETTINGS
@@ -0,0 +1,83 @@
+"""
+Authentication backend that loads the user together with their Hotel.
+
+Every authenticated request resolves the session user through the backend's
+get_user(). Doing that with select_related('hotel') and keeping the result in
+the cache means `request.user.hotel` costs no extra query, and warm requests
+skip the user lookup as well. Cached entries are dropped whenever the User or
+Hotel row is saved or deleted (see accounts/signals.py).
+
+The cached user carries its password hash and is_active flag, which
+Django's session check and this backend rely on. So caching is only
+enabled when HOTEL_USER_CACHE_ALIAS points at a backend shared by every
+worker (Redis, Memcached, database, file). With a process-local backend
+(LocMem, Dummy), an invalidation in one worker would leave the others
+accepting a deactivated user or a changed password until the entry
+expired. In that case each request loads the pair from the database
+instead, still in one query.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+KEY_PREFIX = 'hotel_user'
+
+# Backends whose entries live in one process only
+LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def _cache():
+    """The cache for user/hotel pairs, or None when it is not shared between workers"""
+    alias = getattr(settings, 'HOTEL_USER_CACHE_ALIAS', 'default')
+    if settings.CACHES[alias]['BACKEND'] in LOCAL_CACHE_BACKENDS:
+        return None
+    return caches[alias]
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def load_user(user_id):
+    """Fetch a user and their hotel in a single query, or None"""
+    UserModel = get_user_model()
+    try:
+        return UserModel._default_manager.select_related('hotel').get(pk=user_id)
+    except UserModel.DoesNotExist:
+        return None
+
+
+def get_cached_user(user_id):
+    """Return the user with their hotel attached, from cache when possible"""
+    cache = _cache()
+    if cache is None:
+        return load_user(user_id)
+    user = cache.get(_key(user_id))
+    if user is None:
+        user = load_user(user_id)
+        if user is not None:
+            cache.set(_key(user_id), user, getattr(settings, 'HOTEL_USER_CACHE_TIMEOUT', 300))
+    return user
+
+
+def invalidate_cached_user(user_id):
+    """Forget the cached user/hotel pair after either row changes"""
+    cache = _cache()
+    if cache is not None:
+        cache.delete(_key(user_id))
+
+
+class HotelUserBackend(ModelBackend):
+    """ModelBackend whose session lookups include the user's Hotel"""
+
+    def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        if user is None or not self.user_can_authenticate(user):
+            return None
+        return user
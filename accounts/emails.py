@@ -0,0 +1,70 @@
+"""
+Rendering for account notification emails.
+
+Each notification has an HTML template and a sibling ``.txt`` template
+for the plain-text alternative, so sending never re-parses rendered HTML
+with ``strip_tags``. Compiled templates are kept in process memory and
+render times are collected per template for ``get_render_stats``.
+"""
+
+import logging
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+_render_stats = {}
+
+
+@lru_cache(maxsize=None)
+def _cached_template(template_name):
+    return get_template(template_name)
+
+
+def _get_template(template_name):
+    # Keep template edits visible while developing
+    if settings.DEBUG:
+        return get_template(template_name)
+    return _cached_template(template_name)
+
+
+def _record_timing(template_name, elapsed):
+    with _stats_lock:
+        stats = _render_stats.setdefault(template_name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        stats['count'] += 1
+        stats['total_ms'] += elapsed
+        stats['max_ms'] = max(stats['max_ms'], elapsed)
+
+
+def render_email(template_name, context):
+    """Render an email template pair and return (text_content, html_content)"""
+    start = time.perf_counter()
+
+    html_content = _get_template(f'{template_name}.html').render(context)
+    try:
+        text_content = _get_template(f'{template_name}.txt').render(context)
+    except TemplateDoesNotExist:
+        text_content = strip_tags(html_content)
+
+    elapsed = (time.perf_counter() - start) * 1000
+    _record_timing(template_name, elapsed)
+    logger.debug('Rendered %s in %.2f ms', template_name, elapsed)
+
+    return text_content, html_content
+
+
+def get_render_stats():
+    """Return per-template render counts and timings in milliseconds"""
+    with _stats_lock:
+        return {
+            name: dict(stats, avg_ms=stats['total_ms'] / stats['count'])
+            for name, stats in _render_stats.items()
+        }
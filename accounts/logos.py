@@ -0,0 +1,101 @@
+"""
+Hotel logo uploads and thumbnail processing.
+
+Uploads arrive as multipart form data and are streamed to a temporary
+file by Django's upload handlers. Requests whose Content-Length is
+already too big are rejected before the body is read, and
+``LogoUploadHandler`` stops the upload as soon as it grows past
+``MAX_LOGO_SIZE``. Resizing happens later in the ``process_hotel_logos``
+command, outside the request; a logo that keeps failing is given up on
+after ``MAX_LOGO_ATTEMPTS`` runs so it can't hold up newer uploads.
+"""
+
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db.models import F
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from PIL import Image
+
+from .backends import invalidate_cached_user
+from .models import Hotel, hotel_logo_thumbnail_path
+
+
+MAX_LOGO_SIZE = 2 * 1024 * 1024
+
+# Room for multipart boundaries and headers on top of the file itself
+MAX_LOGO_REQUEST_SIZE = MAX_LOGO_SIZE + 64 * 1024
+
+LOGO_CONTENT_TYPES = {
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+}
+
+LOGO_THUMBNAIL_SIZES = (64, 128, 256)
+
+MAX_LOGO_ATTEMPTS = 3
+
+
+class LogoUploadHandler(FileUploadHandler):
+    """Abort the upload once the file exceeds MAX_LOGO_SIZE"""
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.received = 0
+        self.too_large = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > MAX_LOGO_SIZE:
+            self.too_large = True
+            raise StopUpload(connection_reset=True)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def process_logo(hotel):
+    """Write fixed-size WEBP thumbnails for a hotel's logo"""
+    storage = hotel.hotel_logo.storage
+
+    with hotel.hotel_logo.open('rb') as logo:
+        image = Image.open(logo)
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+
+    for size in LOGO_THUMBNAIL_SIZES:
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size), Image.LANCZOS)
+
+        buffer = BytesIO()
+        thumbnail.save(buffer, format='WEBP', quality=85, method=6)
+
+        path = hotel_logo_thumbnail_path(hotel, size)
+        if storage.exists(path):
+            storage.delete(path)
+        storage.save(path, ContentFile(buffer.getvalue()))
+
+    Hotel.objects.filter(pk=hotel.pk).update(logo_processed=True)
+    invalidate_cached_user(hotel.user_id)
+
+
+def record_logo_failure(hotel):
+    """Count a failed processing run against the hotel's current logo"""
+    Hotel.objects.filter(pk=hotel.pk).update(logo_attempts=F('logo_attempts') + 1)
+
+
+def get_pending_logos(limit=50):
+    """Hotels whose uploaded logo has no thumbnails yet, untried ones first"""
+    return (
+        Hotel.objects
+        .filter(logo_processed=False, logo_attempts__lt=MAX_LOGO_ATTEMPTS)
+        .exclude(hotel_logo='')
+        .exclude(hotel_logo__isnull=True)
+        .order_by('logo_attempts', 'updated_at')[:limit]
+    )
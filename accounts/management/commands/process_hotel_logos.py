@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.logos import get_pending_logos, process_logo, record_logo_failure
+
+
+class Command(BaseCommand):
+    help = 'Generate resized thumbnails for newly uploaded hotel logos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new logos')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when idle')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = 0
+            for hotel in get_pending_logos(options['batch_size']):
+                try:
+                    process_logo(hotel)
+                    processed += 1
+                except Exception as e:
+                    record_logo_failure(hotel)
+                    self.stderr.write(f'Logo processing failed for hotel {hotel.pk}: {e}')
+
+            if processed:
+                self.stdout.write(f'Processed {processed} logo(s)')
+
+            if not options['loop']:
+                if processed:
+                    continue
+                break
+
+            if not processed:
+                time.sleep(options['interval'])
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import MAX_ATTEMPTS, deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued account emails in batches over one SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when idle')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_pending(options['batch_size'], options['max_attempts'])
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}')
+
+            if not options['loop']:
+                # Drain everything that is due, then exit
+                if sent or failed:
+                    continue
+                break
+
+            if not (sent or failed):
+                time.sleep(options['interval'])
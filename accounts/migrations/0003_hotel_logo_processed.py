@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotel',
+            name='logo_processed',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Case-insensitive lookup indexes for auth_user.
+#
+# Django compiles `email__iexact` / `username__iexact` to
+# UPPER("auth_user"."email"::text) = UPPER(%s) on PostgreSQL and
+# `username__istartswith` to UPPER(...) LIKE UPPER(%s). auth_user belongs to
+# django.contrib.auth, so the matching expression indexes are created here.
+# text_pattern_ops lets the username index serve prefix LIKE as well.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0003_hotel_logo_processed'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS auth_user_email_upper_idx '
+                'ON auth_user (UPPER(email::text));',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS auth_user_email_upper_idx;',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS auth_user_username_upper_idx '
+                'ON auth_user (UPPER(username::text) text_pattern_ops);',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS auth_user_username_upper_idx;',
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 07:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    SubscriptionModel was removed from accounts/models.py before the first
+    release but was still part of the migration state from 0001_initial.
+    Only the state is updated here; the accounts_subscriptionmodel table
+    and any rows in it are left untouched for the operator to drop.
+    """
+
+    dependencies = [
+        ('accounts', '0004_auth_user_upper_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.DeleteModel(
+                    name='SubscriptionModel',
+                ),
+            ],
+            database_operations=[],
+        ),
+    ]
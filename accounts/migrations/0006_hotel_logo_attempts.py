@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 07:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_delete_subscriptionmodel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotel',
+            name='logo_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 import os
 
 def hotel_logo_path(instance, filename):
@@ -7,10 +8,15 @@ def hotel_logo_path(instance, filename):
     filename = f'hotel_{instance.user.id}_logo.{ext}'
     return os.path.join('hotel_logos', filename)
 
+def hotel_logo_thumbnail_path(hotel, size):
+    return os.path.join('hotel_logos', 'thumbs', f'hotel_{hotel.user_id}_logo_{size}.webp')
+
 class Hotel(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='hotel')
     hotel_name = models.CharField(max_length=200)
     hotel_logo = models.ImageField(upload_to=hotel_logo_path, blank=True, null=True)
+    logo_processed = models.BooleanField(default=False)
+    logo_attempts = models.PositiveSmallIntegerField(default=0)
     mobile_number = models.CharField(max_length=15)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -26,4 +32,44 @@ class Hotel(models.Model):
     def get_logo_url(self):
         if self.hotel_logo:
             return self.hotel_logo.url
-        return None
\ No newline at end of file
+        return None
+
+    def get_logo_thumbnail_url(self, size):
+        if self.hotel_logo and self.logo_processed:
+            url = self.hotel_logo.storage.url(hotel_logo_thumbnail_path(self, size))
+            # Thumbnail names are fixed per hotel; a new upload bumps updated_at
+            return f'{url}?v={int(self.updated_at.timestamp())}'
+        return self.get_logo_url()
+
+class OutgoingEmail(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Outgoing Email'
+        verbose_name_plural = 'Outgoing Emails'
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {", ".join(self.to)}'
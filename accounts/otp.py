@@ -0,0 +1,102 @@
+"""
+OTP storage for the forgot-password flow.
+
+Records are kept in the cache alias named by ``OTP_CACHE_ALIAS`` and are
+written with a timeout, so the backend expires them natively. Use the
+local-memory backend for single-process setups and a shared Redis or
+Memcached backend when requests are spread across workers: verification
+attempts are counted with ``incr()``, which those backends (and LocMem)
+perform atomically. The database backend works too, but its ``incr()`` is
+a read followed by a write, so parallel guesses may share a count.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+KEY_PREFIX = 'otp'
+
+OTP_EXPIRY_SECONDS = 600
+OTP_RESEND_COOLDOWN = 60
+OTP_MAX_ATTEMPTS = 5
+
+
+def _cache():
+    return caches[getattr(settings, 'OTP_CACHE_ALIAS', 'default')]
+
+
+def _key(kind, email):
+    return f'{KEY_PREFIX}:{kind}:{email}'
+
+
+def get_otp(email):
+    """Return the stored OTP record for an email, or None if expired"""
+    return _cache().get(_key('record', email))
+
+
+def store_otp(email, otp):
+    """Store a freshly generated OTP and start the resend cooldown"""
+    cache = _cache()
+    now = time.time()
+    record = {
+        'otp': otp,
+        'email': email,
+        'created_at': now,
+        'verified': False,
+    }
+    cache.set_many({
+        _key('record', email): record,
+        _key('attempts', email): 0,
+    }, OTP_EXPIRY_SECONDS)
+    cache.set(_key('cooldown', email), now, OTP_RESEND_COOLDOWN)
+    return record
+
+
+def get_resend_wait(email):
+    """Return seconds left before another OTP may be sent (0 if allowed)"""
+    last_sent = _cache().get(_key('cooldown', email))
+    if last_sent is None:
+        return 0
+    return max(OTP_RESEND_COOLDOWN - int(time.time() - last_sent), 0)
+
+
+def get_attempts(email):
+    """Return the number of verification attempts made against the OTP"""
+    return _cache().get(_key('attempts', email), 0)
+
+
+def register_attempt(email):
+    """
+    Count a verification attempt and return the new total.
+
+    Called before the code is compared, so concurrent guesses each get
+    their own count and none can slip past the limit. A counter that has
+    gone with its record counts as exhausted.
+    """
+    try:
+        return _cache().incr(_key('attempts', email))
+    except ValueError:
+        return OTP_MAX_ATTEMPTS + 1
+
+
+def mark_verified(email):
+    """Flag the OTP as verified without extending its lifetime"""
+    record = get_otp(email)
+    if record is None:
+        return False
+
+    remaining = int(record['created_at'] + OTP_EXPIRY_SECONDS - time.time())
+    if remaining <= 0:
+        delete_otp(email)
+        return False
+
+    record['verified'] = True
+    _cache().set(_key('record', email), record, remaining)
+    return True
+
+
+def delete_otp(email):
+    """Remove the OTP record and its attempt counter"""
+    _cache().delete_many([_key('record', email), _key('attempts', email)])
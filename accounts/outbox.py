@@ -0,0 +1,106 @@
+"""
+Durable outbox for account notification emails.
+
+Views call ``queue_email`` which only inserts a row; the
+``send_queued_emails`` management command delivers due messages in
+batches over a single SMTP connection and retries failures with
+exponential backoff.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+MAX_ATTEMPTS = 5
+BASE_RETRY_SECONDS = 60
+MAX_RETRY_SECONDS = 3600
+
+
+def queue_email(subject, text_content, html_content, to):
+    """Queue an email for background delivery"""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=text_content,
+        html_body=html_content or '',
+        from_email=settings.EMAIL_HOST_USER,
+        to=list(to),
+    )
+
+
+def get_retry_delay(attempts):
+    """Backoff delay before the next attempt, doubling per failure"""
+    return timedelta(seconds=min(BASE_RETRY_SECONDS * 2 ** (attempts - 1), MAX_RETRY_SECONDS))
+
+
+def _record_failure(item, error, max_attempts):
+    item.last_error = str(error)
+    if item.attempts >= max_attempts:
+        item.status = OutgoingEmail.STATUS_FAILED
+    else:
+        item.next_attempt_at = timezone.now() + get_retry_delay(item.attempts)
+
+
+def deliver_pending(batch_size=50, max_attempts=MAX_ATTEMPTS):
+    """Send one batch of due emails and return (sent, failed) counts"""
+    sent = failed = 0
+
+    with transaction.atomic():
+        batch = list(
+            OutgoingEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.STATUS_PENDING, next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if not batch:
+            return sent, failed
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            # Server unreachable: the whole batch backs off and is retried
+            for item in batch:
+                item.attempts += 1
+                _record_failure(item, e, max_attempts)
+            failed = len(batch)
+        else:
+            try:
+                for item in batch:
+                    message = EmailMultiAlternatives(
+                        subject=item.subject,
+                        body=item.body,
+                        from_email=item.from_email,
+                        to=item.to,
+                        connection=connection,
+                    )
+                    if item.html_body:
+                        message.attach_alternative(item.html_body, "text/html")
+
+                    item.attempts += 1
+                    try:
+                        message.send(fail_silently=False)
+                    except Exception as e:
+                        _record_failure(item, e, max_attempts)
+                        failed += 1
+                    else:
+                        # Drop the content once delivered; welcome emails carry credentials
+                        item.status = OutgoingEmail.STATUS_SENT
+                        item.sent_at = timezone.now()
+                        item.body = ''
+                        item.html_body = ''
+                        item.last_error = ''
+                        sent += 1
+            finally:
+                connection.close()
+
+        OutgoingEmail.objects.bulk_update(batch, [
+            'status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'body', 'html_body',
+        ])
+
+    return sent, failed
@@ -8,4 +8,5 @@ urlpatterns = [
     path('forgot-password/', views.forgot_password_view, name='forgot_password'),
     path('resend-otp/', views.resend_otp_view, name='resend_otp'),
     path('update-profile/', views.update_profile_view, name='update_profile'),
+    path('upload-logo/', views.upload_logo_view, name='upload_logo'),
 ]
\ No newline at end of file
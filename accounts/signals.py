@@ -0,0 +1,24 @@
+"""
+Keep the cached user/hotel pair from accounts.backends in step with the DB.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import invalidate_cached_user
+from .models import Hotel
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_user(sender, instance, **kwargs):
+    user_id = instance.pk
+    # Wait for commit so a concurrent request cannot re-cache the old row
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+@receiver([post_save, post_delete], sender=Hotel)
+def invalidate_hotel(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
@@ -0,0 +1,10 @@
+from django import template
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def hotel_logo_url(hotel, size=128):
+    """WEBP thumbnail of the hotel's logo, or the original until process_hotel_logos has run"""
+    return hotel.get_logo_thumbnail_url(size)
@@ -1,3 +1,553 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client, SimpleTestCase, TestCase, override_settings, tag
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import otp as otp_store
+from .logos import MAX_LOGO_ATTEMPTS, get_pending_logos, process_logo, record_logo_failure
+from .models import Hotel, OutgoingEmail
+from .outbox import deliver_pending, get_retry_delay, queue_email
+from .throttling import (
+    clear_failed_attempts, get_failed_attempts, get_lockout_remaining, get_lockout_time,
+    register_failed_attempt,
+)
+from .views import generate_username
+
+
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+class UnreachableBackend(BaseEmailBackend):
+    """SMTP server down: opening the connection fails"""
+
+    def open(self):
+        raise ConnectionRefusedError('Connection refused')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('send_messages called without a connection')
+
+
+class RejectingBackend(BaseEmailBackend):
+    """Connection opens but every message is refused"""
+
+    def send_messages(self, email_messages):
+        raise OSError('550 Mailbox unavailable')
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM_BACKEND, EMAIL_HOST_USER='hotel@example.com')
+class OutboxTests(TestCase):
+    def queue(self, count=1):
+        return [
+            queue_email(f'Subject {i}', 'Plain body', '<p>HTML body</p>', [f'guest{i}@example.com'])
+            for i in range(count)
+        ]
+
+    def test_queue_only_inserts_a_row(self):
+        self.queue()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.STATUS_PENDING).count(), 1)
+
+    def test_deliver_sends_and_clears_content(self):
+        self.queue(3)
+
+        self.assertEqual(deliver_pending(), (3, 0))
+
+        self.assertEqual(len(mail.outbox), 3)
+        message = mail.outbox[0]
+        self.assertEqual(message.subject, 'Subject 0')
+        self.assertEqual(message.to, ['guest0@example.com'])
+        self.assertEqual(message.from_email, 'hotel@example.com')
+        self.assertEqual(message.alternatives[0][1], 'text/html')
+        for item in OutgoingEmail.objects.all():
+            self.assertEqual(item.status, OutgoingEmail.STATUS_SENT)
+            self.assertEqual(item.attempts, 1)
+            self.assertEqual((item.body, item.html_body), ('', ''))
+            self.assertIsNotNone(item.sent_at)
+
+    def test_deliver_respects_batch_size(self):
+        self.queue(5)
+        self.assertEqual(deliver_pending(batch_size=2), (2, 0))
+        self.assertEqual(deliver_pending(batch_size=2), (2, 0))
+        self.assertEqual(deliver_pending(batch_size=2), (1, 0))
+        self.assertEqual(deliver_pending(batch_size=2), (0, 0))
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_rejected_message_backs_off_then_succeeds(self):
+        [item] = self.queue()
+
+        with override_settings(EMAIL_BACKEND='accounts.tests.RejectingBackend'):
+            before = timezone.now()
+            self.assertEqual(deliver_pending(), (0, 1))
+
+        item.refresh_from_db()
+        self.assertEqual(item.status, OutgoingEmail.STATUS_PENDING)
+        self.assertEqual(item.attempts, 1)
+        self.assertIn('550', item.last_error)
+        self.assertGreaterEqual(item.next_attempt_at, before + get_retry_delay(1))
+        # Not due yet
+        self.assertEqual(deliver_pending(), (0, 0))
+
+        OutgoingEmail.objects.filter(pk=item.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_pending(), (1, 0))
+        item.refresh_from_db()
+        self.assertEqual(item.status, OutgoingEmail.STATUS_SENT)
+        self.assertEqual(item.attempts, 2)
+        self.assertEqual(item.last_error, '')
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_unreachable_server_defers_whole_batch(self):
+        self.queue(3)
+
+        with override_settings(EMAIL_BACKEND='accounts.tests.UnreachableBackend'):
+            self.assertEqual(deliver_pending(), (0, 3))
+
+        for item in OutgoingEmail.objects.all():
+            self.assertEqual(item.status, OutgoingEmail.STATUS_PENDING)
+            self.assertEqual(item.attempts, 1)
+            self.assertIn('Connection refused', item.last_error)
+            self.assertGreater(item.next_attempt_at, timezone.now())
+
+    def test_gives_up_after_max_attempts(self):
+        [item] = self.queue()
+
+        with override_settings(EMAIL_BACKEND='accounts.tests.UnreachableBackend'):
+            for attempt in range(3):
+                OutgoingEmail.objects.filter(pk=item.pk).update(next_attempt_at=timezone.now())
+                deliver_pending(max_attempts=3)
+
+        item.refresh_from_db()
+        self.assertEqual(item.status, OutgoingEmail.STATUS_FAILED)
+        self.assertEqual(item.attempts, 3)
+        self.assertEqual(deliver_pending(), (0, 0))
+
+    def test_retry_delay_doubles_up_to_cap(self):
+        self.assertEqual(get_retry_delay(1), timedelta(minutes=1))
+        self.assertEqual(get_retry_delay(2), timedelta(minutes=2))
+        self.assertEqual(get_retry_delay(3), timedelta(minutes=4))
+        self.assertEqual(get_retry_delay(20), timedelta(hours=1))
+
+
+def png_upload(name='logo.png', size=(300, 200)):
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class LogoUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.client = Client(enforce_csrf_checks=True)
+
+    def csrf_token(self, url):
+        self.client.get(url)
+        return self.client.cookies['csrftoken'].value
+
+    def sign_in(self):
+        user = User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+        hotel = Hotel.objects.create(user=user, hotel_name='Lakeside Inn', mobile_number='9812345670')
+        self.client.force_login(user)
+        return hotel, self.csrf_token(reverse('update_profile'))
+
+    def test_register_streams_multipart_logo(self):
+        token = self.csrf_token(reverse('register'))
+        response = self.client.post(reverse('register'), {
+            'hotel_name': 'Lakeside Inn',
+            'email': 'owner@example.com',
+            'mobile_number': '9812345670',
+            'password': 'Str0ng!Pass',
+            'confirm_password': 'Str0ng!Pass',
+            'hotel_logo': png_upload(),
+        }, HTTP_X_CSRFTOKEN=token)
+
+        self.assertEqual(response.status_code, 200, response.content)
+        hotel = Hotel.objects.get(user__email='owner@example.com')
+        self.assertTrue(hotel.hotel_logo.name.endswith('.png'))
+        self.assertFalse(hotel.logo_processed)
+
+    def test_register_multipart_checks_csrf(self):
+        self.csrf_token(reverse('register'))
+        response = self.client.post(reverse('register'), {'hotel_name': 'Lakeside Inn'})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Hotel.objects.exists())
+
+    def test_register_rejects_non_image_logo(self):
+        token = self.csrf_token(reverse('register'))
+        response = self.client.post(reverse('register'), {
+            'hotel_name': 'Lakeside Inn',
+            'email': 'owner@example.com',
+            'mobile_number': '9812345670',
+            'password': 'Str0ng!Pass',
+            'confirm_password': 'Str0ng!Pass',
+            'hotel_logo': SimpleUploadedFile('logo.png', b'not an image', content_type='image/png'),
+        }, HTTP_X_CSRFTOKEN=token)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.exists())
+
+    def test_logo_only_upload_sends_one_email(self):
+        hotel, token = self.sign_in()
+
+        response = self.client.post(reverse('upload_logo'), {'hotel_logo': png_upload()}, HTTP_X_CSRFTOKEN=token)
+
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+
+    def test_logo_with_field_changes_sends_one_email(self):
+        hotel, token = self.sign_in()
+
+        # Runs the signal that drops the cached user/hotel pair
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('upload_logo'), {'hotel_logo': png_upload(), 'notify': '0'}, HTTP_X_CSRFTOKEN=token,
+            )
+        self.assertEqual(OutgoingEmail.objects.count(), 0)
+
+        response = self.client.post(reverse('update_profile'), json.dumps({
+            'action': 'update_profile',
+            'hotel_name': 'Lakeside Lodge',
+            'mobile_number': '9812345670',
+        }), content_type='application/json', HTTP_X_CSRFTOKEN=token)
+
+        self.assertIn('Hotel Logo', response.json()['message'])
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+
+    def test_logo_change_is_not_taken_from_the_client(self):
+        hotel, token = self.sign_in()
+        hotel.hotel_logo.save('logo.png', png_upload(), save=True)
+
+        response = self.client.post(reverse('update_profile'), json.dumps({
+            'action': 'update_profile',
+            'hotel_name': 'Lakeside Lodge',
+            'mobile_number': '9812345670',
+            'logo_uploaded': True,
+        }), content_type='application/json', HTTP_X_CSRFTOKEN=token)
+
+        self.assertTrue(response.json()['success'])
+        self.assertNotIn('Hotel Logo', response.json()['message'])
+
+    def test_thumbnails_are_served_once_processed(self):
+        hotel, token = self.sign_in()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('upload_logo'), {'hotel_logo': png_upload()}, HTTP_X_CSRFTOKEN=token)
+        hotel.refresh_from_db()
+        self.assertEqual(hotel.get_logo_thumbnail_url(128), hotel.get_logo_url())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            process_logo(hotel)
+        hotel.refresh_from_db()
+
+        url = hotel.get_logo_thumbnail_url(128)
+        self.assertIn('/thumbs/', url)
+        self.assertIn('_128.webp?v=', url)
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, '_128.webp?v=')
+
+    def test_failing_logo_does_not_starve_new_uploads(self):
+        hotel, token = self.sign_in()
+        hotel.hotel_logo.save('logo.png', SimpleUploadedFile('logo.png', b'not an image'), save=True)
+        other = Hotel.objects.create(
+            user=User.objects.create_user('other', 'other@example.com', 'Str0ng!Pass'),
+            hotel_name='Hillside Inn', mobile_number='9812345671',
+        )
+        other.hotel_logo.save('logo.png', png_upload(), save=True)
+
+        # Only room for one logo per run; the broken one is older
+        for _ in range(MAX_LOGO_ATTEMPTS):
+            with self.assertRaises(Exception):
+                process_logo(hotel)
+            record_logo_failure(hotel)
+            self.assertEqual(list(get_pending_logos(limit=1)), [other])
+
+        self.assertNotIn(hotel, get_pending_logos())
+        hotel.refresh_from_db()
+        self.assertEqual(hotel.logo_attempts, MAX_LOGO_ATTEMPTS)
+
+        # A fresh upload gets a fresh set of attempts
+        self.client.post(reverse('upload_logo'), {'hotel_logo': png_upload()}, HTTP_X_CSRFTOKEN=token)
+        self.assertIn(hotel, get_pending_logos())
+
+
+def locmem_cache(location, **options):
+    return {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': location,
+            'OPTIONS': options,
+        },
+    }
+
+
+class Clock:
+    """Stands in for time.time() in throttling and the LocMem cache"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@override_settings(CACHES=locmem_cache('throttle-tests'), LOGIN_THROTTLE_WINDOW=3600)
+class ThrottlingTests(TestCase):
+    IP = '203.0.113.7'
+
+    def setUp(self):
+        self.addCleanup(caches['default'].clear)
+        self.clock = Clock()
+        patcher = mock.patch('time.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fail_times(self, count, ip=IP):
+        for _ in range(count):
+            last = register_failed_attempt(ip)
+        return last
+
+    def test_lockout_escalation(self):
+        self.assertEqual(
+            [get_lockout_time(attempts) for attempts in (0, 4, 5, 9, 10, 14, 15, 19, 20, 100)],
+            [0, 0, 2, 2, 3, 3, 5, 5, 10, 10],
+        )
+
+    def test_failures_are_counted_per_ip(self):
+        self.assertEqual(self.fail_times(3), 3)
+        self.fail_times(1, ip='198.51.100.1')
+
+        self.assertEqual(get_failed_attempts(self.IP), (3, self.clock.now))
+        self.assertEqual(get_lockout_remaining(self.IP), 0)
+
+    def test_lockout_grows_with_failures(self):
+        self.fail_times(5)
+        self.assertEqual(get_lockout_remaining(self.IP), 120)
+
+        self.clock.now += 30
+        self.assertEqual(get_lockout_remaining(self.IP), 90)
+
+        self.fail_times(5)
+        self.assertEqual(get_lockout_remaining(self.IP), 180)
+        self.fail_times(10)
+        self.assertEqual(get_lockout_remaining(self.IP), 600)
+
+        self.clock.now += 600
+        self.assertEqual(get_lockout_remaining(self.IP), 0)
+
+    def test_counter_expires_after_the_window(self):
+        self.fail_times(4)
+        self.clock.now += 3000
+        # A failure slides the window forward
+        self.assertEqual(self.fail_times(1), 5)
+
+        self.clock.now += 3000
+        self.assertEqual(get_failed_attempts(self.IP)[0], 5)
+
+        self.clock.now += 601
+        self.assertEqual(get_failed_attempts(self.IP), (0, None))
+        self.assertEqual(self.fail_times(1), 1)
+
+    def test_successful_login_clears_the_counter(self):
+        self.fail_times(7)
+        clear_failed_attempts(self.IP)
+        self.assertEqual(get_failed_attempts(self.IP), (0, None))
+        self.assertEqual(get_lockout_remaining(self.IP), 0)
+
+    def test_login_view_answers_429_with_remaining_seconds(self):
+        User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+
+        def attempt(password='wrong'):
+            return self.client.post(
+                reverse('login'), json.dumps({'email': 'owner@example.com', 'password': password}),
+                content_type='application/json', REMOTE_ADDR=self.IP,
+            )
+
+        statuses = [attempt().status_code for _ in range(5)]
+        self.assertEqual(statuses, [401] * 5)
+
+        self.clock.now += 15
+        response = attempt('Str0ng!Pass')
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(response.json()['lockout'])
+        self.assertEqual(response.json()['remaining_seconds'], 105)
+
+        self.clock.now += 105
+        self.assertEqual(attempt('Str0ng!Pass').status_code, 403)  # no hotel profile, but let through
+
+
+@override_settings(CACHES=locmem_cache('otp-tests'), OTP_CACHE_ALIAS='default')
+class OtpStoreTests(TestCase):
+    EMAIL = 'owner@example.com'
+
+    def setUp(self):
+        self.addCleanup(caches['default'].clear)
+        self.clock = Clock()
+        patcher = mock.patch('time.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_record_expires_with_the_otp(self):
+        otp_store.store_otp(self.EMAIL, '123456')
+        self.assertEqual(otp_store.get_otp(self.EMAIL)['otp'], '123456')
+
+        self.clock.now += otp_store.OTP_EXPIRY_SECONDS + 1
+        self.assertIsNone(otp_store.get_otp(self.EMAIL))
+        self.assertFalse(otp_store.mark_verified(self.EMAIL))
+
+    def test_resend_cooldown(self):
+        self.assertEqual(otp_store.get_resend_wait(self.EMAIL), 0)
+        otp_store.store_otp(self.EMAIL, '123456')
+        self.assertEqual(otp_store.get_resend_wait(self.EMAIL), 60)
+
+        self.clock.now += 45
+        self.assertEqual(otp_store.get_resend_wait(self.EMAIL), 15)
+        self.clock.now += 15
+        self.assertEqual(otp_store.get_resend_wait(self.EMAIL), 0)
+
+    def test_attempts_are_counted_up_to_the_limit(self):
+        otp_store.store_otp(self.EMAIL, '123456')
+        counts = [otp_store.register_attempt(self.EMAIL) for _ in range(otp_store.OTP_MAX_ATTEMPTS + 1)]
+        self.assertEqual(counts, [1, 2, 3, 4, 5, 6])
+        self.assertEqual(otp_store.get_attempts(self.EMAIL), 6)
+
+        # A new OTP starts a fresh count
+        otp_store.store_otp(self.EMAIL, '654321')
+        self.assertEqual(otp_store.register_attempt(self.EMAIL), 1)
+
+    def test_attempt_without_an_otp_counts_as_exhausted(self):
+        self.assertEqual(otp_store.register_attempt(self.EMAIL), otp_store.OTP_MAX_ATTEMPTS + 1)
+
+    def test_mark_verified_keeps_the_original_expiry(self):
+        otp_store.store_otp(self.EMAIL, '123456')
+        self.clock.now += 500
+        self.assertTrue(otp_store.mark_verified(self.EMAIL))
+        self.assertTrue(otp_store.get_otp(self.EMAIL)['verified'])
+
+        self.clock.now += 101
+        self.assertIsNone(otp_store.get_otp(self.EMAIL))
+
+    def test_delete_otp_removes_record_and_attempts(self):
+        otp_store.store_otp(self.EMAIL, '123456')
+        otp_store.register_attempt(self.EMAIL)
+        otp_store.delete_otp(self.EMAIL)
+
+        self.assertIsNone(otp_store.get_otp(self.EMAIL))
+        self.assertEqual(otp_store.get_attempts(self.EMAIL), 0)
+
+    def test_verify_view_enforces_the_attempt_limit(self):
+        otp_store.store_otp(self.EMAIL, '123456')
+
+        def verify(otp):
+            return self.client.post(
+                reverse('forgot_password'),
+                json.dumps({'action': 'verify_otp', 'email': self.EMAIL, 'otp': otp}),
+                content_type='application/json',
+            )
+
+        responses = [verify('000000') for _ in range(otp_store.OTP_MAX_ATTEMPTS)]
+        self.assertEqual([response.status_code for response in responses], [400] * 5)
+        self.assertIn('0 attempt(s) remaining', responses[-1].json()['message'])
+
+        # Even the right code is refused once the attempts are used up
+        self.assertEqual(verify('123456').status_code, 429)
+        self.assertIsNone(otp_store.get_otp(self.EMAIL))
+
+    def test_verify_view_accepts_the_right_code(self):
+        otp_store.store_otp(self.EMAIL, '123456')
+        self.assertEqual(self.client.post(
+            reverse('forgot_password'),
+            json.dumps({'action': 'verify_otp', 'email': self.EMAIL, 'otp': '123456'}),
+            content_type='application/json',
+        ).status_code, 200)
+        self.assertTrue(otp_store.get_otp(self.EMAIL)['verified'])
+
+
+def resident_memory():
+    """Current resident set size in bytes (Linux)"""
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+@tag('load')
+class ThrottlingLoadTests(SimpleTestCase):
+    """A credential-stuffing burst from a million distinct IPs"""
+
+    ADDRESSES = 1_000_000
+    SAMPLE_EVERY = 100_000
+    # Headroom for allocator noise once the cache is full
+    MAX_GROWTH_BYTES = 16 * 1024 * 1024
+
+    def test_memory_stays_flat_for_a_million_ips(self):
+        if not os.path.exists('/proc/self/statm'):
+            self.skipTest('Needs /proc to read resident memory')
+
+        with override_settings(CACHES=locmem_cache('throttle-load', MAX_ENTRIES=50_000)):
+            self.addCleanup(caches['default'].clear)
+            samples = []
+            for i in range(self.ADDRESSES):
+                register_failed_attempt(f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}')
+                if (i + 1) % self.SAMPLE_EVERY == 0:
+                    samples.append(resident_memory())
+
+        # The cache is full after the first sample; from then on it evicts
+        self.assertLess(max(samples[1:]) - samples[1], self.MAX_GROWTH_BYTES, samples)
+
+
+@tag('load')
+class UserLookupLoadTests(TestCase):
+    """Email and username lookups against a million seeded users"""
+
+    USERS = 1_000_000
+    LOOKUPS = 200
+    MAX_LOOKUP_MS = 5.0
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO auth_user (password, is_superuser, username, first_name, last_name, email, "
+                "is_staff, is_active, date_joined) "
+                "SELECT '!', false, 'user' || i, '', '', 'user' || i || '@example.com', false, true, now() "
+                "FROM generate_series(1, %s) AS i",
+                [cls.USERS],
+            )
+            cursor.execute('ANALYZE auth_user')
+
+    def average_ms(self, lookup):
+        began = time.perf_counter()
+        for i in range(self.LOOKUPS):
+            lookup(i)
+        return (time.perf_counter() - began) * 1000 / self.LOOKUPS
+
+    def test_login_lookup_uses_the_email_index(self):
+        plan = User.objects.filter(email__iexact='User500000@Example.com').explain()
+        self.assertIn('auth_user_email_upper_idx', plan)
+
+        elapsed = self.average_ms(
+            lambda i: User.objects.filter(email__iexact=f'USER{i * 4999 + 1}@example.com').first()
+        )
+        self.assertLess(elapsed, self.MAX_LOOKUP_MS)
+
+    def test_generate_username_is_one_indexed_query(self):
+        plan = User.objects.filter(username__istartswith='user500000').explain()
+        self.assertIn('auth_user_username_upper_idx', plan)
+
+        self.assertEqual(generate_username('user500000@example.com'), 'user5000001')
+        elapsed = self.average_ms(lambda i: generate_username(f'user{i * 4999 + 1}@example.com'))
+        self.assertLess(elapsed, self.MAX_LOOKUP_MS)
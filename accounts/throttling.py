@@ -0,0 +1,86 @@
+"""
+Login throttling backed by Django's cache framework.
+
+Failed attempts are counted per client IP with atomic cache increments.
+Every failure pushes the expiry of the counter forward (sliding window),
+so idle entries are evicted by the cache itself instead of piling up in
+process memory.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+KEY_PREFIX = 'login_throttle'
+
+
+def get_lockout_time(attempts):
+    """Get lockout time in minutes based on failed attempts"""
+    if attempts < 5:
+        return 0
+    elif attempts < 10:
+        return 2
+    elif attempts < 15:
+        return 3
+    elif attempts < 20:
+        return 5
+    else:
+        return 10
+
+
+def _cache():
+    return caches[getattr(settings, 'LOGIN_THROTTLE_CACHE_ALIAS', 'default')]
+
+
+def _window():
+    return getattr(settings, 'LOGIN_THROTTLE_WINDOW', 3600)
+
+
+def _keys(client_ip):
+    return f'{KEY_PREFIX}:count:{client_ip}', f'{KEY_PREFIX}:last:{client_ip}'
+
+
+def get_failed_attempts(client_ip):
+    """Return (count, last_attempt_timestamp) for a client IP"""
+    count_key, last_key = _keys(client_ip)
+    values = _cache().get_many([count_key, last_key])
+    return values.get(count_key, 0), values.get(last_key)
+
+
+def get_lockout_remaining(client_ip):
+    """Return seconds left on the current lockout, or 0 if not locked out"""
+    count, last_attempt = get_failed_attempts(client_ip)
+    lockout_minutes = get_lockout_time(count)
+
+    if lockout_minutes == 0 or last_attempt is None:
+        return 0
+
+    remaining = int(last_attempt + lockout_minutes * 60 - time.time())
+    return max(remaining, 0)
+
+
+def register_failed_attempt(client_ip):
+    """Record a failed login and return the new attempt count"""
+    cache = _cache()
+    window = _window()
+    count_key, last_key = _keys(client_ip)
+
+    cache.add(count_key, 0, window)
+    try:
+        count = cache.incr(count_key)
+    except ValueError:
+        # Key expired between add() and incr()
+        cache.set(count_key, 1, window)
+        count = 1
+
+    # Slide the window forward on every failure
+    cache.touch(count_key, window)
+    cache.set(last_key, time.time(), window)
+    return count
+
+
+def clear_failed_attempts(client_ip):
+    """Forget failed attempts after a successful login"""
+    _cache().delete_many(list(_keys(client_ip)))
@@ -4,39 +4,31 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
-from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.csrf import csrf_protect, csrf_exempt
 from django.core.files.base import ContentFile
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
 from django.conf import settings
 from .models import Hotel
+from .throttling import (
+    get_lockout_time,
+    get_lockout_remaining,
+    register_failed_attempt,
+    clear_failed_attempts,
+)
+from . import otp as otp_store
+from .outbox import queue_email
+from .emails import render_email
+from .logos import LogoUploadHandler, LOGO_CONTENT_TYPES, MAX_LOGO_SIZE, MAX_LOGO_REQUEST_SIZE
+from PIL import Image
 import json
 import re
 import base64
 import random
 import string
-from datetime import datetime, timedelta
+from datetime import datetime
 
-# Rate limiting storage (use Redis/Cache in production)
-login_attempts = {}
-
-# OTP storage (use Redis/Cache in production)
-otp_storage = {}
-
-
-def get_lockout_time(attempts):
-    """Get lockout time in minutes based on failed attempts"""
-    if attempts < 5:
-        return 0
-    elif attempts < 10:
-        return 2
-    elif attempts < 15:
-        return 3
-    elif attempts < 20:
-        return 5
-    else:
-        return 10
+# Session key upload_logo uses to hand its email over to update_profile
+DEFERRED_LOGO_NOTICE_KEY = 'deferred_logo_notice'
 
 
 def get_client_ip(request):
@@ -54,6 +46,25 @@ def generate_otp(length=6):
     return ''.join(random.choices(string.digits, k=length))
 
 
+def generate_username(email):
+    """Pick a free username from the email's local part using one query"""
+    base_username = email.split('@')[0]
+    # One indexed prefix scan instead of probing name, name1, name2, ...
+    taken = {
+        name.lower()
+        for name in User.objects.filter(
+            username__istartswith=base_username
+        ).values_list('username', flat=True)
+    }
+
+    username = base_username
+    counter = 1
+    while username.lower() in taken:
+        username = f"{base_username}{counter}"
+        counter += 1
+    return username
+
+
 def send_welcome_email(user, hotel, password):
     """Send welcome email to newly registered hotel"""
     try:
@@ -68,18 +79,9 @@ def send_welcome_email(user, hotel, password):
             'current_year': datetime.now().year,
         }
         
-        html_content = render_to_string('accounts/welcome_email.html', context)
-        text_content = strip_tags(html_content)
-        
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.EMAIL_HOST_USER,
-            to=[user.email]
-        )
+        text_content, html_content = render_email('accounts/welcome_email', context)
         
-        email.attach_alternative(html_content, "text/html")
-        email.send(fail_silently=False)
+        queue_email(subject, text_content, html_content, [user.email])
         
         return True
     except Exception as e:
@@ -96,22 +98,13 @@ def send_otp_email(email, otp, hotel_name=None):
             'otp': otp,
             'hotel_name': hotel_name or 'User',
             'email': email,
-            'expiry_minutes': 10,
+            'expiry_minutes': otp_store.OTP_EXPIRY_SECONDS // 60,
             'current_year': datetime.now().year,
         }
         
-        html_content = render_to_string('accounts/otp_email.html', context)
-        text_content = strip_tags(html_content)
+        text_content, html_content = render_email('accounts/otp_email', context)
         
-        email_msg = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.EMAIL_HOST_USER,
-            to=[email]
-        )
-        
-        email_msg.attach_alternative(html_content, "text/html")
-        email_msg.send(fail_silently=False)
+        queue_email(subject, text_content, html_content, [email])
         
         return True
     except Exception as e:
@@ -132,18 +125,9 @@ def send_password_changed_email(user, hotel_name):
             'current_year': datetime.now().year,
         }
         
-        html_content = render_to_string('accounts/password_changed_email.html', context)
-        text_content = strip_tags(html_content)
-        
-        email_msg = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.EMAIL_HOST_USER,
-            to=[user.email]
-        )
+        text_content, html_content = render_email('accounts/password_changed_email', context)
         
-        email_msg.attach_alternative(html_content, "text/html")
-        email_msg.send(fail_silently=False)
+        queue_email(subject, text_content, html_content, [user.email])
         
         return True
     except Exception as e:
@@ -171,25 +155,18 @@ def login_view(request):
             password = data.get('password', '')
             
             client_ip = get_client_ip(request)
-            current_time = datetime.now()
             
             # Check rate limiting
-            if client_ip in login_attempts:
-                attempt_data = login_attempts[client_ip]
-                lockout_minutes = get_lockout_time(attempt_data['count'])
-                
-                if lockout_minutes > 0:
-                    lockout_until = attempt_data['last_attempt'] + timedelta(minutes=lockout_minutes)
-                    if current_time < lockout_until:
-                        remaining = int((lockout_until - current_time).total_seconds())
-                        mins = remaining // 60
-                        secs = remaining % 60
-                        return JsonResponse({
-                            'success': False,
-                            'message': f'Too many failed attempts. Please wait {mins}m {secs}s.',
-                            'lockout': True,
-                            'remaining_seconds': remaining
-                        }, status=429)
+            remaining = get_lockout_remaining(client_ip)
+            if remaining > 0:
+                mins = remaining // 60
+                secs = remaining % 60
+                return JsonResponse({
+                    'success': False,
+                    'message': f'Too many failed attempts. Please wait {mins}m {secs}s.',
+                    'lockout': True,
+                    'remaining_seconds': remaining
+                }, status=429)
             
             # Validate email
             if not email:
@@ -216,11 +193,7 @@ def login_view(request):
                 user_obj = User.objects.get(email__iexact=email)
                 username_to_auth = user_obj.username
             except User.DoesNotExist:
-                if client_ip not in login_attempts:
-                    login_attempts[client_ip] = {'count': 0, 'last_attempt': current_time}
-                
-                login_attempts[client_ip]['count'] += 1
-                login_attempts[client_ip]['last_attempt'] = current_time
+                register_failed_attempt(client_ip)
                 
                 return JsonResponse({
                     'success': False,
@@ -245,8 +218,7 @@ def login_view(request):
                 
                 login(request, user)
                 
-                if client_ip in login_attempts:
-                    del login_attempts[client_ip]
+                clear_failed_attempts(client_ip)
                 
                 return JsonResponse({
                     'success': True,
@@ -254,13 +226,7 @@ def login_view(request):
                     'redirect': '/dashboard/'
                 })
             else:
-                if client_ip not in login_attempts:
-                    login_attempts[client_ip] = {'count': 0, 'last_attempt': current_time}
-                
-                login_attempts[client_ip]['count'] += 1
-                login_attempts[client_ip]['last_attempt'] = current_time
-                
-                attempts_count = login_attempts[client_ip]['count']
+                attempts_count = register_failed_attempt(client_ip)
                 attempts_until_lockout = 5 - (attempts_count % 5)
                 if attempts_until_lockout == 0:
                     attempts_until_lockout = 5
@@ -292,11 +258,28 @@ def login_view(request):
 # #############################################################
 # REGISTER VIEW
 # #############################################################
-@csrf_protect
+@csrf_exempt
 @require_http_methods(["GET", "POST"])
 def register_view(request):
     """Handle registration page and user/hotel creation"""
     
+    # A multipart form streams the logo like upload_logo_view; the
+    # handlers are swapped in before anything reads the body, so the CSRF
+    # check runs in _register instead of the middleware
+    size_limit = None
+    if request.method == 'POST' and request.content_type == 'multipart/form-data':
+        if _logo_request_too_large(request):
+            return JsonResponse({
+                'success': False,
+                'message': 'Logo file is too large. Maximum size is 2MB.'
+            }, status=413)
+        size_limit = LogoUploadHandler(request)
+        request.upload_handlers = [size_limit, TemporaryFileUploadHandler(request)]
+    return _register(request, size_limit)
+
+
+@csrf_protect
+def _register(request, size_limit):
     if request.method == 'GET':
         if request.user.is_authenticated:
             return redirect('dashboard')
@@ -304,7 +287,15 @@ def register_view(request):
     
     if request.method == 'POST':
         try:
-            data = json.loads(request.body)
+            if size_limit is None:
+                data = json.loads(request.body)
+            else:
+                data = request.POST
+                if size_limit.too_large:
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'Logo file is too large. Maximum size is 2MB.'
+                    }, status=413)
             hotel_logo_data = data.get('hotel_logo', '')
             hotel_name = data.get('hotel_name', '').strip()
             email = data.get('email', '').strip().lower()
@@ -481,7 +472,19 @@ def register_view(request):
             
             # ===== LOGO VALIDATION (Optional) =====
             logo_file = None
-            if hotel_logo_data:
+            uploaded_logo = request.FILES.get('hotel_logo') if size_limit else None
+            if uploaded_logo is not None:
+                try:
+                    ext = check_uploaded_logo(uploaded_logo)
+                except ValueError as e:
+                    return JsonResponse({
+                        'success': False,
+                        'message': str(e)
+                    }, status=400)
+                logo_file = uploaded_logo
+                logo_file.name = f'logo.{ext}'
+            
+            elif hotel_logo_data:
                 try:
                     if 'base64,' in hotel_logo_data:
                         format_part, imgstr = hotel_logo_data.split('base64,')
@@ -500,8 +503,15 @@ def register_view(request):
                                 'message': 'Invalid logo format. Please use PNG, JPG, GIF, or WEBP.'
                             }, status=400)
                         
+                        # Reject on the encoded length before decoding anything
+                        if len(imgstr) * 3 // 4 > MAX_LOGO_SIZE:
+                            return JsonResponse({
+                                'success': False,
+                                'message': 'Logo file is too large. Maximum size is 2MB.'
+                            }, status=400)
+                        
                         decoded_file = base64.b64decode(imgstr)
-                        if len(decoded_file) > 2 * 1024 * 1024:
+                        if len(decoded_file) > MAX_LOGO_SIZE:
                             return JsonResponse({
                                 'success': False,
                                 'message': 'Logo file is too large. Maximum size is 2MB.'
@@ -516,14 +526,7 @@ def register_view(request):
                     }, status=400)
             
             # ===== CREATE USER =====
-            email_username = email.split('@')[0]
-            base_username = email_username
-            username = base_username
-            counter = 1
-            
-            while User.objects.filter(username__iexact=username).exists():
-                username = f"{base_username}{counter}"
-                counter += 1
+            username = generate_username(email)
             
             user = User.objects.create_user(
                 username=username,
@@ -620,28 +623,16 @@ def forgot_password_view(request):
                     })
                 
                 # Check rate limiting for OTP
-                client_ip = get_client_ip(request)
-                otp_key = f"otp_{email}"
-                
-                if otp_key in otp_storage:
-                    last_sent = otp_storage[otp_key].get('last_sent')
-                    if last_sent and (datetime.now() - last_sent).total_seconds() < 60:
-                        remaining = 60 - int((datetime.now() - last_sent).total_seconds())
-                        return JsonResponse({
-                            'success': False,
-                            'message': f'Please wait {remaining} seconds before requesting a new OTP.'
-                        }, status=429)
+                remaining = otp_store.get_resend_wait(email)
+                if remaining > 0:
+                    return JsonResponse({
+                        'success': False,
+                        'message': f'Please wait {remaining} seconds before requesting a new OTP.'
+                    }, status=429)
                 
                 # Generate and store OTP
                 otp = generate_otp(6)
-                otp_storage[otp_key] = {
-                    'otp': otp,
-                    'email': email,
-                    'created_at': datetime.now(),
-                    'last_sent': datetime.now(),
-                    'attempts': 0,
-                    'verified': False
-                }
+                otp_store.store_otp(email, otp)
                 
                 # Send OTP email
                 email_sent = send_otp_email(email, otp, hotel_name)
@@ -668,27 +659,19 @@ def forgot_password_view(request):
                         'message': 'Email and OTP are required.'
                     }, status=400)
                 
-                otp_key = f"otp_{email}"
+                # Expired OTPs are evicted by the store itself (10 minutes)
+                otp_data = otp_store.get_otp(email)
                 
-                if otp_key not in otp_storage:
+                if otp_data is None:
                     return JsonResponse({
                         'success': False,
                         'message': 'OTP has expired. Please request a new one.'
                     }, status=400)
                 
-                otp_data = otp_storage[otp_key]
-                
-                # Check if OTP is expired (10 minutes)
-                if (datetime.now() - otp_data['created_at']).total_seconds() > 600:
-                    del otp_storage[otp_key]
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'OTP has expired. Please request a new one.'
-                    }, status=400)
-                
-                # Check attempts
-                if otp_data['attempts'] >= 5:
-                    del otp_storage[otp_key]
+                # Count the attempt before comparing so parallel guesses can't share one
+                attempts = otp_store.register_attempt(email)
+                if attempts > otp_store.OTP_MAX_ATTEMPTS:
+                    otp_store.delete_otp(email)
                     return JsonResponse({
                         'success': False,
                         'message': 'Too many failed attempts. Please request a new OTP.'
@@ -696,15 +679,18 @@ def forgot_password_view(request):
                 
                 # Verify OTP
                 if otp_data['otp'] != otp:
-                    otp_storage[otp_key]['attempts'] += 1
-                    remaining_attempts = 5 - otp_storage[otp_key]['attempts']
+                    remaining_attempts = otp_store.OTP_MAX_ATTEMPTS - attempts
                     return JsonResponse({
                         'success': False,
                         'message': f'Invalid OTP. {remaining_attempts} attempt(s) remaining.'
                     }, status=400)
                 
                 # Mark as verified
-                otp_storage[otp_key]['verified'] = True
+                if not otp_store.mark_verified(email):
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'OTP has expired. Please request a new one.'
+                    }, status=400)
                 
                 return JsonResponse({
                     'success': True,
@@ -725,17 +711,15 @@ def forgot_password_view(request):
                         'message': 'Session expired. Please start over.'
                     }, status=400)
                 
-                otp_key = f"otp_{email}"
-                
                 # Verify OTP session
-                if otp_key not in otp_storage:
+                otp_data = otp_store.get_otp(email)
+                
+                if otp_data is None:
                     return JsonResponse({
                         'success': False,
                         'message': 'Session expired. Please start over.'
                     }, status=400)
                 
-                otp_data = otp_storage[otp_key]
-                
                 if not otp_data.get('verified'):
                     return JsonResponse({
                         'success': False,
@@ -818,7 +802,7 @@ def forgot_password_view(request):
                 user.save()
                 
                 # Clean up OTP storage
-                del otp_storage[otp_key]
+                otp_store.delete_otp(email)
                 
                 # Send password changed email
                 send_password_changed_email(user, hotel_name)
@@ -876,27 +860,16 @@ def resend_otp_view(request):
             })
         
         # Check rate limiting
-        otp_key = f"otp_{email}"
-        
-        if otp_key in otp_storage:
-            last_sent = otp_storage[otp_key].get('last_sent')
-            if last_sent and (datetime.now() - last_sent).total_seconds() < 60:
-                remaining = 60 - int((datetime.now() - last_sent).total_seconds())
-                return JsonResponse({
-                    'success': False,
-                    'message': f'Please wait {remaining} seconds before requesting a new OTP.'
-                }, status=429)
+        remaining = otp_store.get_resend_wait(email)
+        if remaining > 0:
+            return JsonResponse({
+                'success': False,
+                'message': f'Please wait {remaining} seconds before requesting a new OTP.'
+            }, status=429)
         
         # Generate new OTP
         otp = generate_otp(6)
-        otp_storage[otp_key] = {
-            'otp': otp,
-            'email': email,
-            'created_at': datetime.now(),
-            'last_sent': datetime.now(),
-            'attempts': 0,
-            'verified': False
-        }
+        otp_store.store_otp(email, otp)
         
         # Send OTP email
         email_sent = send_otp_email(email, otp, hotel_name)
@@ -1035,12 +1008,20 @@ def update_profile_view(request):
                         updated_fields.append('Mobile Number')
                 
                 # ===== LOGO HANDLING =====
+                # Left by upload_logo when it deferred its email to this call
+                had_logo = request.session.pop(DEFERRED_LOGO_NOTICE_KEY, None)
+                
                 if remove_logo and hotel.hotel_logo:
                     old_values['hotel_logo'] = 'Previous Logo'
                     new_values['hotel_logo'] = 'Removed'
                     hotel.hotel_logo.delete(save=False)
                     updated_fields.append('Hotel Logo (Removed)')
                 
+                elif had_logo is not None and hotel.hotel_logo:
+                    old_values['hotel_logo'] = 'Previous Logo' if had_logo else 'No Logo'
+                    new_values['hotel_logo'] = 'New Logo Uploaded'
+                    updated_fields.append('Hotel Logo')
+                
                 elif hotel_logo_data:
                     try:
                         if 'base64,' in hotel_logo_data:
@@ -1060,8 +1041,15 @@ def update_profile_view(request):
                                     'message': 'Invalid logo format. Please use PNG, JPG, GIF, or WEBP.'
                                 }, status=400)
                             
+                            # Reject on the encoded length before decoding anything
+                            if len(imgstr) * 3 // 4 > MAX_LOGO_SIZE:
+                                return JsonResponse({
+                                    'success': False,
+                                    'message': 'Logo file is too large. Maximum size is 2MB.'
+                                }, status=400)
+                            
                             decoded_file = base64.b64decode(imgstr)
-                            if len(decoded_file) > 2 * 1024 * 1024:
+                            if len(decoded_file) > MAX_LOGO_SIZE:
                                 return JsonResponse({
                                     'success': False,
                                     'message': 'Logo file is too large. Maximum size is 2MB.'
@@ -1073,6 +1061,8 @@ def update_profile_view(request):
                             
                             logo_file = ContentFile(decoded_file, name=f'logo_{user.id}.{ext}')
                             hotel.hotel_logo.save(logo_file.name, logo_file, save=False)
+                            hotel.logo_processed = False
+                            hotel.logo_attempts = 0
                             
                             old_values['hotel_logo'] = 'Previous Logo' if hotel.hotel_logo else 'No Logo'
                             new_values['hotel_logo'] = 'New Logo Uploaded'
@@ -1298,6 +1288,112 @@ def update_profile_view(request):
             }, status=500)
 
 
+# ===== UPLOAD LOGO VIEW =====
+@login_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def upload_logo_view(request):
+    """Stream a multipart logo upload to storage without buffering it"""
+    
+    if _logo_request_too_large(request):
+        return JsonResponse({
+            'success': False,
+            'message': 'Logo file is too large. Maximum size is 2MB.'
+        }, status=413)
+    
+    # Upload handlers must be swapped in before anything reads the body,
+    # so the CSRF check runs in the inner view instead of the middleware
+    size_limit = LogoUploadHandler(request)
+    request.upload_handlers = [size_limit, TemporaryFileUploadHandler(request)]
+    return _save_uploaded_logo(request, size_limit)
+
+
+def _logo_request_too_large(request):
+    """Refuse oversize uploads before reading any of the body"""
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    return content_length > MAX_LOGO_REQUEST_SIZE
+
+
+def check_uploaded_logo(logo):
+    """Return the logo's file extension, or raise ValueError with a message for the user"""
+    ext = LOGO_CONTENT_TYPES.get(logo.content_type)
+    if ext is None:
+        raise ValueError('Invalid logo format. Please use PNG, JPG, GIF, or WEBP.')
+    try:
+        Image.open(logo).verify()
+        logo.seek(0)
+    except Exception:
+        raise ValueError('Invalid logo file. Please try again.')
+    return ext
+
+
+@csrf_protect
+def _save_uploaded_logo(request, size_limit):
+    try:
+        user = request.user
+        hotel = user.hotel
+        logo = request.FILES.get('hotel_logo')
+        
+        if size_limit.too_large:
+            return JsonResponse({
+                'success': False,
+                'message': 'Logo file is too large. Maximum size is 2MB.'
+            }, status=413)
+        
+        if logo is None:
+            return JsonResponse({
+                'success': False,
+                'message': 'Please choose a logo to upload.'
+            }, status=400)
+        
+        try:
+            ext = check_uploaded_logo(logo)
+        except ValueError as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=400)
+        
+        had_logo = bool(hotel.hotel_logo)
+        if had_logo:
+            hotel.hotel_logo.delete(save=False)
+        
+        # Thumbnails are generated later by process_hotel_logos
+        hotel.hotel_logo.save(f'logo_{user.id}.{ext}', logo, save=False)
+        hotel.logo_processed = False
+        hotel.logo_attempts = 0
+        hotel.save()
+        
+        # notify=0: the page is about to save other profile fields, and
+        # that update_profile call sends one email covering the logo too
+        if request.POST.get('notify') == '0':
+            request.session[DEFERRED_LOGO_NOTICE_KEY] = had_logo
+        else:
+            send_profile_updated_email(
+                user,
+                hotel.hotel_name,
+                ['Hotel Logo'],
+                {'hotel_logo': 'Previous Logo' if had_logo else 'No Logo'},
+                {'hotel_logo': 'New Logo Uploaded'}
+            )
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Logo uploaded successfully!',
+            'logo_url': hotel.get_logo_url()
+        })
+        
+    except Exception as e:
+        print(f"Logo upload error: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'message': 'An error occurred. Please try again.'
+        }, status=500)
+
+
 def send_profile_updated_email(user, hotel_name, updated_fields, old_values, new_values):
     """Send profile updated email notification"""
     try:
@@ -1314,18 +1410,9 @@ def send_profile_updated_email(user, hotel_name, updated_fields, old_values, new
             'current_year': datetime.now().year,
         }
         
-        html_content = render_to_string('accounts/profile_updated_email.html', context)
-        text_content = strip_tags(html_content)
-        
-        email_msg = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.EMAIL_HOST_USER,
-            to=[user.email]
-        )
+        text_content, html_content = render_email('accounts/profile_updated_email', context)
         
-        email_msg.attach_alternative(html_content, "text/html")
-        email_msg.send(fail_silently=False)
+        queue_email(subject, text_content, html_content, [user.email])
         
         return True
     except Exception as e:
@@ -1347,32 +1434,16 @@ def send_email_changed_notification(user, hotel_name, old_email, new_email):
             'current_year': datetime.now().year,
         }
         
-        html_content = render_to_string('accounts/email_changed_notification.html', context)
-        text_content = strip_tags(html_content)
+        text_content, html_content = render_email('accounts/email_changed_notification', context)
         
         # Send to new email
-        email_msg = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.EMAIL_HOST_USER,
-            to=[new_email]
-        )
-        email_msg.attach_alternative(html_content, "text/html")
-        email_msg.send(fail_silently=False)
+        queue_email(subject, text_content, html_content, [new_email])
         
         # Send to old email as security notification
         context['is_old_email'] = True
-        html_content_old = render_to_string('accounts/email_changed_notification.html', context)
-        text_content_old = strip_tags(html_content_old)
+        text_content_old, html_content_old = render_email('accounts/email_changed_notification', context)
         
-        email_msg_old = EmailMultiAlternatives(
-            subject='⚠️ Your Bookly Email Address Was Changed',
-            body=text_content_old,
-            from_email=settings.EMAIL_HOST_USER,
-            to=[old_email]
-        )
-        email_msg_old.attach_alternative(html_content_old, "text/html")
-        email_msg_old.send(fail_silently=False)
+        queue_email('⚠️ Your Bookly Email Address Was Changed', text_content_old, html_content_old, [old_email])
         
         return True
     except Exception as e:
@@ -0,0 +1,220 @@
+"""
+Invoice exports for accounting.
+
+The CSV export is a generator over a server-side cursor
+(``.iterator(chunk_size=...)``) that writes one row at a time into a
+StreamingHttpResponse, so memory stays flat whatever the date range. Under
+ASGI the view streams an async generator fed from the same cursor one
+chunk at a time. Text cells that a spreadsheet would run as a formula are
+prefixed with a quote.
+
+Invoice PDFs are rendered once and kept on disk under INVOICE_PDF_DIR, named
+by a hash of everything printed on them. An invoice is frozen at its
+``last_line``, so a repeat download is served straight from the file, and
+anything that changes the printed content gets a new file.
+"""
+
+import csv
+import hashlib
+import os
+import tempfile
+from datetime import datetime, time
+from itertools import islice
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .models import FolioLine, Invoice
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+except ImportError:
+    canvas = None
+
+
+EXPORT_CHUNK_SIZE = 2000
+# Bump when the PDF layout changes so cached files are re-rendered
+PDF_LAYOUT_VERSION = '1'
+
+CSV_HEADER = [
+    'Invoice', 'Issued At', 'Guest', 'Room', 'Check In', 'Check Out',
+    'Total Charges', 'Total Payments', 'Balance Due',
+]
+
+
+# Cells starting with these are run as formulas by spreadsheet apps
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class PDFUnavailable(Exception):
+    """reportlab is not installed"""
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def invoices_between(hotel, start, end):
+    """Invoices issued from `start` up to (not including) `end`"""
+    return Invoice.objects.filter(
+        hotel=hotel,
+        issued_at__gte=_day_start(start),
+        issued_at__lt=_day_start(end),
+    ).order_by('issued_at', 'id')
+
+
+def _csv_rows(invoices):
+    return invoices.values_list(
+        'number', 'issued_at', 'folio__booking__guest_name', 'folio__booking__room__number',
+        'folio__booking__stay', 'total_charges', 'total_payments', 'balance_due',
+    )
+
+
+def _csv_text(value):
+    """Quote a text cell so a spreadsheet shows it instead of evaluating it"""
+    if value and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _csv_row(writer, row):
+    number, issued_at, guest_name, room, stay, charges, payments, balance = row
+    return writer.writerow([
+        _csv_text(number),
+        timezone.localtime(issued_at).strftime('%Y-%m-%d %H:%M'),
+        _csv_text(guest_name),
+        _csv_text(room),
+        stay.lower if stay else '',
+        stay.upper if stay else '',
+        charges,
+        payments,
+        balance,
+    ])
+
+
+def stream_invoices_csv(invoices):
+    """Yield CSV lines for `invoices` without materializing the queryset"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for row in _csv_rows(invoices).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield _csv_row(writer, row)
+
+
+async def astream_invoices_csv(invoices):
+    """
+    The same lines from an async generator, for ASGI. Django would read a
+    sync iterator into a list before sending it under ASGI; this one fetches
+    a chunk at a time in a worker thread and sends it as it goes.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    rows = _csv_rows(invoices).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    next_chunk = sync_to_async(lambda: list(islice(rows, EXPORT_CHUNK_SIZE)))
+    while chunk := await next_chunk():
+        for row in chunk:
+            yield _csv_row(writer, row)
+
+
+def invoice_lines(invoice):
+    """The folio lines an invoice covers, oldest first"""
+    lines = FolioLine.objects.filter(folio_id=invoice.folio_id)
+    if invoice.last_line_id is None:
+        lines = lines.none()
+    else:
+        lines = lines.filter(id__lte=invoice.last_line_id)
+    return lines.order_by('id').values_list('business_date', 'description', 'amount')
+
+
+def invoice_pdf_digest(invoice):
+    """Hash of everything printed on the invoice"""
+    booking = invoice.folio.booking
+    digest = hashlib.sha256()
+    for value in (
+        PDF_LAYOUT_VERSION, invoice.hotel.hotel_name, invoice.number, invoice.issued_at.isoformat(),
+        booking.guest_name, booking.room.number, booking.check_in, booking.check_out,
+        invoice.total_charges, invoice.total_payments, invoice.balance_due,
+    ):
+        digest.update(f'{value}\x1f'.encode())
+    for line in invoice_lines(invoice).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        digest.update('\x1f'.join(str(value) for value in line).encode() + b'\x1e')
+    return digest.hexdigest()
+
+
+def _render_invoice_pdf(invoice, output):
+    booking = invoice.folio.booking
+    width, height = A4
+    margin = 50
+    pdf = canvas.Canvas(output, pagesize=A4)
+    pdf.setTitle(invoice.number)
+
+    def new_page():
+        pdf.setFont('Helvetica-Bold', 14)
+        pdf.drawString(margin, height - margin, invoice.hotel.hotel_name)
+        pdf.setFont('Helvetica', 10)
+        pdf.drawRightString(width - margin, height - margin, f'Invoice {invoice.number}')
+        pdf.drawRightString(
+            width - margin, height - margin - 14, timezone.localtime(invoice.issued_at).strftime('%Y-%m-%d')
+        )
+        return height - margin - 40
+
+    y = new_page()
+    pdf.drawString(margin, y, f'Guest: {booking.guest_name}')
+    pdf.drawString(margin, y - 14, f'Room {booking.room.number}: {booking.check_in} to {booking.check_out}')
+    y -= 44
+
+    for business_date, description, amount in invoice_lines(invoice).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        if y < margin + 60:
+            pdf.showPage()
+            y = new_page()
+        pdf.drawString(margin, y, str(business_date))
+        pdf.drawString(margin + 80, y, description[:70])
+        pdf.drawRightString(width - margin, y, f'{amount:,.2f}')
+        y -= 14
+
+    if y < margin + 60:
+        pdf.showPage()
+        y = new_page()
+    y -= 10
+    pdf.setFont('Helvetica-Bold', 10)
+    for label, value in (
+        ('Total Charges', invoice.total_charges),
+        ('Total Payments', invoice.total_payments),
+        ('Balance Due', invoice.balance_due),
+    ):
+        pdf.drawString(width - margin - 200, y, label)
+        pdf.drawRightString(width - margin, y, f'{value:,.2f}')
+        y -= 14
+    pdf.save()
+
+
+def get_invoice_pdf(invoice):
+    """Path of the invoice's PDF, rendering it only if not already on disk"""
+    if canvas is None:
+        raise PDFUnavailable('PDF export requires reportlab to be installed.')
+
+    directory = Path(settings.INVOICE_PDF_DIR) / str(invoice.hotel_id)
+    path = directory / f'{invoice_pdf_digest(invoice)}.pdf'
+    if path.exists():
+        return path
+
+    directory.mkdir(parents=True, exist_ok=True)
+    # Written beside the target and renamed, so readers never see half a file
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.pdf.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            _render_invoice_pdf(invoice, output)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return path
@@ -0,0 +1,167 @@
+"""
+Posting to folios.
+
+Every change to a folio is a new FolioLine plus a single UPDATE of the
+folio's cached totals inside the same transaction, so the cached balance
+can be read in O(1) and is never out of step with a committed ledger.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from accounts.models import Hotel
+from reports.rollups import record_lines
+from .models import Folio, FolioLine, Invoice
+
+
+class FolioClosed(Exception):
+    """Lines cannot be posted to a closed folio"""
+
+
+def open_folio(booking):
+    """Return the booking's folio, creating it on first use"""
+    folio, _ = Folio.objects.get_or_create(booking=booking, defaults={'hotel_id': booking.hotel_id})
+    return folio
+
+
+def _post(folio, kind, amount, description, category, business_date=None, user=None, reverses=None):
+    amount = Decimal(amount).quantize(Decimal('0.01'))
+    with transaction.atomic():
+        folio = Folio.objects.select_for_update().get(pk=folio.pk)
+        if folio.status == Folio.STATUS_CLOSED:
+            raise FolioClosed(f'Folio #{folio.pk} is closed.')
+
+        line = FolioLine.objects.create(
+            folio=folio,
+            kind=kind,
+            category=category,
+            description=description,
+            amount=amount,
+            business_date=business_date or timezone.localdate(),
+            reverses=reverses,
+            posted_by=user,
+        )
+
+        totals = {
+            'balance': F('balance') + amount,
+            'line_count': F('line_count') + 1,
+            'updated_at': timezone.now(),
+        }
+        if kind == FolioLine.KIND_PAYMENT:
+            totals['total_payments'] = F('total_payments') - amount
+        else:
+            totals['total_charges'] = F('total_charges') + amount
+        Folio.objects.filter(pk=folio.pk).update(**totals)
+        record_lines(folio.hotel_id, [line])
+    return line
+
+
+def post_charge(folio, amount, description, category='other', business_date=None, user=None):
+    """Add a charge (positive amount) to the folio"""
+    if Decimal(amount) <= 0:
+        raise ValueError('Charge amount must be positive.')
+    return _post(folio, FolioLine.KIND_CHARGE, amount, description, category, business_date, user)
+
+
+def post_payment(folio, amount, description='Payment', business_date=None, user=None):
+    """Record a payment (positive amount) against the folio"""
+    if Decimal(amount) <= 0:
+        raise ValueError('Payment amount must be positive.')
+    return _post(folio, FolioLine.KIND_PAYMENT, -Decimal(amount), description, 'payment', business_date, user)
+
+
+def reverse_line(line, reason, user=None):
+    """Cancel out a posted line with an opposite adjustment"""
+    kind = FolioLine.KIND_PAYMENT if line.kind == FolioLine.KIND_PAYMENT else FolioLine.KIND_ADJUSTMENT
+    return _post(
+        line.folio,
+        kind,
+        -line.amount,
+        f'Reversal: {reason}',
+        line.category,
+        user=user,
+        reverses=line,
+    )
+
+
+def close_folio(folio):
+    with transaction.atomic():
+        Folio.objects.filter(pk=folio.pk, status=Folio.STATUS_OPEN).update(
+            status=Folio.STATUS_CLOSED, closed_at=timezone.now(), updated_at=timezone.now()
+        )
+    folio.refresh_from_db()
+    return folio
+
+
+def issue_invoice(folio, user=None):
+    """Freeze the folio's current totals into a numbered invoice"""
+    with transaction.atomic():
+        # Serializes numbering per hotel
+        Hotel.objects.select_for_update().filter(pk=folio.hotel_id).first()
+        folio = Folio.objects.select_for_update().get(pk=folio.pk)
+        sequence = Invoice.objects.filter(hotel_id=folio.hotel_id).count() + 1
+        return Invoice.objects.create(
+            hotel_id=folio.hotel_id,
+            folio=folio,
+            number=f'INV-{sequence:06d}',
+            last_line=folio.lines.order_by('-id').first(),
+            total_charges=folio.total_charges,
+            total_payments=folio.total_payments,
+            balance_due=folio.balance,
+            issued_by=user,
+        )
+
+
+def _zero():
+    return Value(Decimal('0.00'), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def ledger_totals():
+    """
+    Folios annotated with totals recomputed from the ledger (one GROUP BY
+    query), for comparison with their cached columns.
+    """
+    zero = _zero()
+    payment = Q(lines__kind=FolioLine.KIND_PAYMENT)
+    return Folio.objects.annotate(
+        ledger_balance=Coalesce(Sum('lines__amount'), zero),
+        ledger_charges=Coalesce(Sum('lines__amount', filter=~payment), zero),
+        ledger_payments=Coalesce(-Sum('lines__amount', filter=payment), zero),
+        ledger_count=Count('lines'),
+    )
+
+
+def find_drifted_folios():
+    """Folios whose cached totals disagree with their ledger"""
+    return ledger_totals().exclude(
+        balance=F('ledger_balance'),
+        total_charges=F('ledger_charges'),
+        total_payments=F('ledger_payments'),
+        line_count=F('ledger_count'),
+    )
+
+
+def repair_folio_totals(folio_ids):
+    """Overwrite cached totals from the ledger with one UPDATE"""
+    lines = FolioLine.objects.filter(folio=OuterRef('pk')).order_by().values('folio')
+    payments = lines.filter(kind=FolioLine.KIND_PAYMENT)
+    charges = lines.exclude(kind=FolioLine.KIND_PAYMENT)
+
+    def total(queryset, expression):
+        return Subquery(queryset.annotate(total=expression).values('total'))
+
+    with transaction.atomic():
+        ids = list(
+            Folio.objects.select_for_update().filter(pk__in=list(folio_ids)).values_list('pk', flat=True)
+        )
+        return Folio.objects.filter(pk__in=ids).update(
+            balance=Coalesce(total(lines, Sum('amount')), _zero()),
+            total_charges=Coalesce(total(charges, Sum('amount')), _zero()),
+            total_payments=Coalesce(-total(payments, Sum('amount')), _zero()),
+            line_count=Coalesce(total(lines, Count('id')), Value(0, output_field=IntegerField())),
+            updated_at=timezone.now(),
+        )
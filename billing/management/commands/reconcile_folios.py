@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from billing.ledger import find_drifted_folios, repair_folio_totals
+
+
+class Command(BaseCommand):
+    help = 'Verify cached folio totals against the charge ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotel', type=int, help='Only check this hotel id')
+        parser.add_argument('--fix', action='store_true', help='Rewrite drifted totals from the ledger')
+
+    def handle(self, *args, **options):
+        began = time.monotonic()
+        drifted = find_drifted_folios()
+        if options['hotel']:
+            drifted = drifted.filter(hotel_id=options['hotel'])
+
+        rows = list(drifted.values(
+            'id', 'balance', 'ledger_balance', 'total_charges', 'ledger_charges',
+            'total_payments', 'ledger_payments', 'line_count', 'ledger_count',
+        ))
+        for row in rows:
+            self.stdout.write(
+                f'Folio #{row["id"]}: balance {row["balance"]} vs ledger {row["ledger_balance"]}, '
+                f'charges {row["total_charges"]} vs {row["ledger_charges"]}, '
+                f'payments {row["total_payments"]} vs {row["ledger_payments"]}, '
+                f'lines {row["line_count"]} vs {row["ledger_count"]}'
+            )
+
+        elapsed = time.monotonic() - began
+        if not rows:
+            self.stdout.write(self.style.SUCCESS(f'All folio totals match the ledger ({elapsed:.2f}s)'))
+            return
+
+        if options['fix']:
+            fixed = repair_folio_totals(row['id'] for row in rows)
+            self.stdout.write(self.style.WARNING(f'Repaired {fixed} folio(s)'))
+            return
+
+        raise CommandError(f'{len(rows)} folio(s) disagree with the ledger; rerun with --fix to repair')
@@ -0,0 +1,96 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from billing.models import NightAuditRun
+from billing.night_audit import AUDIT_CHUNK_SIZE, run_hotel_audit
+from bookings.models import Booking
+
+
+def _setup_worker():
+    django.setup()
+
+
+def _audit_hotel(hotel_id, business_date, chunk_size):
+    try:
+        run = run_hotel_audit(hotel_id, business_date, chunk_size)
+        return hotel_id, run.bookings_posted, run.lines_posted, ''
+    except Exception as e:
+        return hotel_id, 0, 0, str(e)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Post the night's room and tax charges for every in-house booking"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Business date to audit (YYYY-MM-DD); defaults to yesterday')
+        parser.add_argument('--hotel', type=int, help='Only audit this hotel id')
+        parser.add_argument('--workers', type=int, default=min(8, os.cpu_count() or 1),
+                            help='Hotels audited in parallel')
+        parser.add_argument('--chunk-size', type=int, default=AUDIT_CHUNK_SIZE,
+                            help='Bookings posted per transaction')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                business_date = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('--date must be in YYYY-MM-DD format')
+        else:
+            business_date = timezone.localdate() - timedelta(days=1)
+
+        hotels = Booking.objects.filter(status=Booking.STATUS_CHECKED_IN, stay__contains=business_date)
+        if options['hotel']:
+            hotels = hotels.filter(hotel_id=options['hotel'])
+        done = NightAuditRun.objects.filter(
+            business_date=business_date, status=NightAuditRun.STATUS_COMPLETED
+        ).values('hotel_id')
+        hotel_ids = list(hotels.exclude(hotel_id__in=done).order_by().values_list('hotel_id', flat=True).distinct())
+
+        if not hotel_ids:
+            self.stdout.write(self.style.SUCCESS(f'Night audit for {business_date}: nothing to post'))
+            return
+
+        began = time.monotonic()
+        results = []
+        if options['workers'] > 1 and len(hotel_ids) > 1:
+            # Forked workers must not share the parent's connection
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=_setup_worker) as pool:
+                futures = [
+                    pool.submit(_audit_hotel, hotel_id, business_date, options['chunk_size'])
+                    for hotel_id in hotel_ids
+                ]
+                for future in as_completed(futures):
+                    results.append(self.report(future.result()))
+        else:
+            for hotel_id in hotel_ids:
+                results.append(self.report(_audit_hotel(hotel_id, business_date, options['chunk_size'])))
+
+        elapsed = time.monotonic() - began
+        failed = [hotel_id for hotel_id, *_, error in results if error]
+        bookings = sum(result[1] for result in results)
+        lines = sum(result[2] for result in results)
+        self.stdout.write(
+            f'Night audit for {business_date}: {len(results) - len(failed)} hotel(s), {bookings} booking(s), '
+            f'{lines} line(s) in {elapsed:.2f}s ({bookings / elapsed if elapsed else 0:.0f} bookings/s)'
+        )
+        if failed:
+            raise CommandError(f'{len(failed)} hotel(s) failed; rerun to resume: {failed}')
+        self.stdout.write(self.style.SUCCESS('Night audit complete'))
+
+    def report(self, result):
+        hotel_id, bookings, lines, error = result
+        if error:
+            self.stderr.write(f'  Hotel #{hotel_id}: failed - {error}')
+        else:
+            self.stdout.write(f'  Hotel #{hotel_id}: {bookings} booking(s), {lines} line(s)')
+        return result
@@ -0,0 +1,96 @@
+# Generated by Django 6.0 on 2026-10-18 06:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0004_auth_user_upper_indexes'),
+        ('bookings', '0002_booking_groups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Folio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('closed', 'Closed')], default='open', max_length=10)),
+                ('total_charges', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_payments', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('line_count', models.PositiveIntegerField(default=0)),
+                ('opened_at', models.DateTimeField(auto_now_add=True)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('booking', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='folio', to='bookings.booking')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='folios', to='accounts.hotel')),
+            ],
+            options={
+                'verbose_name': 'Folio',
+                'verbose_name_plural': 'Folios',
+                'ordering': ['-opened_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FolioLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('charge', 'Charge'), ('payment', 'Payment'), ('adjustment', 'Adjustment')], max_length=12)),
+                ('category', models.CharField(choices=[('room', 'Room'), ('food', 'Food & Beverage'), ('room_service', 'Room Service'), ('minibar', 'Minibar'), ('laundry', 'Laundry'), ('tax', 'Tax'), ('payment', 'Payment'), ('other', 'Other')], default='other', max_length=20)),
+                ('description', models.CharField(max_length=255)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('business_date', models.DateField()),
+                ('posted_at', models.DateTimeField(auto_now_add=True)),
+                ('folio', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lines', to='billing.folio')),
+                ('posted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('reverses', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='reversed_by', to='billing.folioline')),
+            ],
+            options={
+                'verbose_name': 'Folio Line',
+                'verbose_name_plural': 'Folio Lines',
+                'ordering': ['folio', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.CharField(max_length=30)),
+                ('total_charges', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('total_payments', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('balance_due', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('issued_at', models.DateTimeField(auto_now_add=True)),
+                ('folio', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='invoices', to='billing.folio')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invoices', to='accounts.hotel')),
+                ('issued_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('last_line', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='billing.folioline')),
+            ],
+            options={
+                'verbose_name': 'Invoice',
+                'verbose_name_plural': 'Invoices',
+                'ordering': ['-issued_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='folio',
+            index=models.Index(fields=['hotel', 'status'], name='folio_hotel_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='folioline',
+            index=models.Index(fields=['folio', 'kind'], name='folio_line_kind_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='folioline',
+            index=models.Index(fields=['business_date'], name='folio_line_business_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(fields=('hotel', 'number'), name='unique_invoice_number_per_hotel'),
+        ),
+    ]
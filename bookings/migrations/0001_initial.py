@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-18 06:30
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.operations
+import django.contrib.postgres.fields.ranges
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0004_auth_user_upper_indexes'),
+        ('rooms', '0001_initial'),
+    ]
+
+    operations = [
+        # Lets the exclusion constraint combine `room =` with `stay &&`
+        django.contrib.postgres.operations.BtreeGistExtension(),
+        migrations.CreateModel(
+            name='Booking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stay', django.contrib.postgres.fields.ranges.DateRangeField()),
+                ('status', models.CharField(choices=[('confirmed', 'Confirmed'), ('checked_in', 'Checked In'), ('checked_out', 'Checked Out'), ('cancelled', 'Cancelled')], default='confirmed', max_length=12)),
+                ('guest_name', models.CharField(max_length=200)),
+                ('guest_email', models.EmailField(blank=True, max_length=254)),
+                ('guest_phone', models.CharField(blank=True, max_length=20)),
+                ('adults', models.PositiveSmallIntegerField(default=1)),
+                ('children', models.PositiveSmallIntegerField(default=0)),
+                ('nightly_rate', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='accounts.hotel')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='bookings', to='rooms.room')),
+            ],
+            options={
+                'verbose_name': 'Booking',
+                'verbose_name_plural': 'Bookings',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['hotel', 'status'], name='booking_hotel_status_idx')],
+                'constraints': [django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status', 'cancelled'), _negated=True), expressions=[('room', '='), ('stay', '&&')], name='exclude_overlapping_room_stays')],
+            },
+        ),
+    ]
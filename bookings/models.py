@@ -1,3 +1,89 @@
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
 from django.db import models
+from accounts.models import Hotel
+from rooms.models import Room
 
-# Create your models here.
+
+class BookingGroup(models.Model):
+    """A block of rooms reserved together, e.g. by a tour operator"""
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='booking_groups')
+    name = models.CharField(max_length=200)
+    contact_name = models.CharField(max_length=200, blank=True)
+    contact_email = models.EmailField(blank=True)
+    contact_phone = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Booking Group'
+        verbose_name_plural = 'Booking Groups'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.name} ({self.hotel})'
+
+
+class Booking(models.Model):
+    STATUS_CONFIRMED = 'confirmed'
+    STATUS_CHECKED_IN = 'checked_in'
+    STATUS_CHECKED_OUT = 'checked_out'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_CONFIRMED, 'Confirmed'),
+        (STATUS_CHECKED_IN, 'Checked In'),
+        (STATUS_CHECKED_OUT, 'Checked Out'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='bookings')
+    room = models.ForeignKey(Room, on_delete=models.PROTECT, related_name='bookings')
+    group = models.ForeignKey(
+        BookingGroup, on_delete=models.SET_NULL, related_name='bookings', blank=True, null=True
+    )
+    # Nights occupied: [check_in, check_out)
+    stay = DateRangeField()
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_CONFIRMED)
+    guest_name = models.CharField(max_length=200)
+    guest_email = models.EmailField(blank=True)
+    guest_phone = models.CharField(max_length=20, blank=True)
+    adults = models.PositiveSmallIntegerField(default=1)
+    children = models.PositiveSmallIntegerField(default=0)
+    nightly_rate = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Booking'
+        verbose_name_plural = 'Bookings'
+        ordering = ['-created_at']
+        constraints = [
+            # The database rejects a second live booking of the same room
+            # for any overlapping night (GiST index, needs btree_gist).
+            ExclusionConstraint(
+                name='exclude_overlapping_room_stays',
+                expressions=[
+                    ('room', RangeOperators.EQUAL),
+                    ('stay', RangeOperators.OVERLAPS),
+                ],
+                condition=~models.Q(status='cancelled'),
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['hotel', 'status'], name='booking_hotel_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.guest_name} - Room {self.room.number} ({self.check_in} to {self.check_out})'
+
+    @property
+    def check_in(self):
+        return self.stay.lower
+
+    @property
+    def check_out(self):
+        return self.stay.upper
+
+    @property
+    def nights(self):
+        return (self.check_out - self.check_in).days
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('group/', views.group_booking_view, name='group_booking'),
+]
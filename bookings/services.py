@@ -0,0 +1,236 @@
+"""
+Booking engine.
+
+Room-level double booking is prevented by the exclusion constraint on
+Booking (see bookings/models.py): PostgreSQL checks the new stay against the
+GiST index in the same INSERT, so two front-desk clerks racing for one room
+cannot both win and nothing has to be locked or scanned in Python. The
+room-type availability calendar (rooms.availability) is updated in the same
+transaction, and so are the occupancy rollups (reports.rollups).
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import Exists, OuterRef
+
+from reports.rollups import record_stay
+from rooms.availability import RoomUnavailable, release, reserve, stay_nights
+from rooms.models import Room
+from .models import Booking, BookingGroup
+
+
+OVERLAP_CONSTRAINT = 'exclude_overlapping_room_stays'
+
+MAX_GROUP_ROOMS = 250
+GROUP_BOOKING_RETRIES = 3
+
+# Bookings that still hold nights on the calendar
+LIVE_STATUSES = (Booking.STATUS_CONFIRMED, Booking.STATUS_CHECKED_IN)
+
+
+class BookingConflict(Exception):
+    """The room (or room type) is already taken for part of the stay"""
+
+
+def _validate_stay(check_in, check_out):
+    if check_out <= check_in:
+        raise ValueError('Check-out must be after check-in.')
+
+
+def _is_overlap(error):
+    return OVERLAP_CONSTRAINT in str(error)
+
+
+def create_booking(room, check_in, check_out, **details):
+    """Book `room` for [check_in, check_out) or raise BookingConflict"""
+    _validate_stay(check_in, check_out)
+    try:
+        with transaction.atomic():
+            booking = Booking.objects.create(
+                hotel_id=room.hotel_id,
+                room=room,
+                stay=DateRange(check_in, check_out),
+                **details
+            )
+            reserve(room.room_type_id, check_in, check_out)
+            record_stay(room.hotel_id, check_in, check_out)
+    except IntegrityError as e:
+        if _is_overlap(e):
+            raise BookingConflict(f'Room {room.number} is already booked for these dates.') from e
+        raise
+    except RoomUnavailable as e:
+        raise BookingConflict(f'No {room.room_type.name} rooms left for these dates.') from e
+    return booking
+
+
+def cancel_booking(booking):
+    """Cancel a confirmed or checked-in booking and give its nights back to the calendar"""
+    with transaction.atomic():
+        booking = Booking.objects.select_for_update().select_related('room').get(pk=booking.pk)
+        if booking.status == Booking.STATUS_CANCELLED:
+            return booking
+        if booking.status not in LIVE_STATUSES:
+            raise ValueError(f'A {booking.get_status_display().lower()} booking cannot be cancelled.')
+        booking.status = Booking.STATUS_CANCELLED
+        booking.save(update_fields=['status', 'updated_at'])
+        release(booking.room.room_type_id, booking.check_in, booking.check_out)
+        record_stay(booking.hotel_id, booking.check_in, booking.check_out, sign=-1)
+    return booking
+
+
+def reschedule_booking(booking, check_in, check_out, room=None):
+    """Move a confirmed or checked-in booking to new dates and/or another room"""
+    _validate_stay(check_in, check_out)
+    try:
+        with transaction.atomic():
+            booking = Booking.objects.select_for_update().select_related('room').get(pk=booking.pk)
+            if booking.status not in LIVE_STATUSES:
+                raise ValueError(f'A {booking.get_status_display().lower()} booking cannot be rescheduled.')
+            old_room_type_id = booking.room.room_type_id
+            release(old_room_type_id, booking.check_in, booking.check_out)
+            record_stay(booking.hotel_id, booking.check_in, booking.check_out, sign=-1)
+
+            if room is not None:
+                booking.room = room
+            booking.stay = DateRange(check_in, check_out)
+            booking.save(update_fields=['room', 'stay', 'updated_at'])
+            reserve(booking.room.room_type_id, check_in, check_out)
+            record_stay(booking.hotel_id, check_in, check_out)
+    except IntegrityError as e:
+        if _is_overlap(e):
+            raise BookingConflict(f'Room {booking.room.number} is already booked for these dates.') from e
+        raise
+    except RoomUnavailable as e:
+        raise BookingConflict('No rooms of that type left for these dates.') from e
+    return booking
+
+
+def count_booked_rooms(room_type_ids, start, end):
+    """
+    Return {(room_type_id, night): booked rooms} for live bookings in
+    [start, end), as expected by rooms.availability.rebuild_calendar().
+    """
+    booked = Counter()
+    bookings = (
+        Booking.objects
+        .filter(room__room_type_id__in=list(room_type_ids), stay__overlap=DateRange(start, end))
+        .exclude(status=Booking.STATUS_CANCELLED)
+        .values_list('room__room_type_id', 'stay')
+    )
+    for room_type_id, stay in bookings.iterator(chunk_size=2000):
+        for night in stay_nights(max(stay.lower, start), min(stay.upper, end)):
+            booked[room_type_id, night] += 1
+    return dict(booked)
+
+
+def _live_overlaps(stay):
+    return Booking.objects.filter(stay__overlap=stay).exclude(status=Booking.STATUS_CANCELLED)
+
+
+def _allocate_block(hotel, stay, room_ids, blocks):
+    """
+    Pick rooms for a group in a couple of set-based queries.
+
+    Returns (rooms to book, {room_id: (room number, failure reason)},
+    [unfilled block counts]).
+    """
+    failures = {}
+    rooms = {
+        room.id: room
+        for room in Room.objects.filter(hotel=hotel, id__in=room_ids, is_active=True)
+    }
+    for room_id in room_ids:
+        if room_id not in rooms:
+            failures[room_id] = (None, 'not_found')
+
+    taken = set(_live_overlaps(stay).filter(room_id__in=list(rooms)).values_list('room_id', flat=True))
+    for room_id in taken:
+        failures[room_id] = (rooms[room_id].number, 'unavailable')
+    selected = [room for room_id, room in rooms.items() if room_id not in taken]
+
+    # "N rooms of type X": free rooms of that type not already picked
+    shortfalls = []
+    picked = {room.id for room in selected}
+    for block in blocks:
+        free = list(
+            Room.objects
+            .filter(hotel=hotel, room_type_id=block['room_type'], is_active=True)
+            .exclude(id__in=picked)
+            .filter(~Exists(_live_overlaps(stay).filter(room=OuterRef('pk'))))
+            .order_by('number')[:block['count']]
+        )
+        selected.extend(free)
+        picked.update(room.id for room in free)
+        if len(free) < block['count']:
+            shortfalls.append({
+                'room_type': block['room_type'],
+                'requested': block['count'],
+                'allocated': len(free),
+            })
+    return selected, failures, shortfalls
+
+
+def create_group_booking(hotel, check_in, check_out, group, room_ids=(), blocks=(),
+                         allow_partial=True, **details):
+    """
+    Reserve a block of rooms in one transaction.
+
+    `room_ids` names specific rooms; `blocks` asks for any free rooms of a
+    type as [{'room_type': id, 'count': n}]. Availability of the whole block
+    is checked with set-based queries and the bookings are inserted with one
+    bulk_create. If another booking lands between the check and the insert
+    the exclusion constraint rejects the batch and the allocation is retried.
+
+    Returns (BookingGroup or None, per-room results, unfilled blocks).
+    """
+    _validate_stay(check_in, check_out)
+    stay = DateRange(check_in, check_out)
+    room_ids = list(dict.fromkeys(room_ids))
+
+    for attempt in range(GROUP_BOOKING_RETRIES):
+        rooms, failures, shortfalls = _allocate_block(hotel, stay, room_ids, blocks)
+        if (failures or shortfalls) and not allow_partial:
+            return None, _group_results(rooms, failures, {}, booked=False), shortfalls
+        if not rooms:
+            return None, _group_results(rooms, failures, {}, booked=False), shortfalls
+
+        try:
+            with transaction.atomic():
+                booking_group = BookingGroup.objects.create(hotel=hotel, **group)
+                bookings = Booking.objects.bulk_create([
+                    Booking(hotel=hotel, room=room, group=booking_group, stay=stay, **details)
+                    for room in rooms
+                ])
+                for room_type_id, count in Counter(room.room_type_id for room in rooms).items():
+                    reserve(room_type_id, check_in, check_out, rooms=count)
+                record_stay(hotel.id, check_in, check_out, rooms=len(bookings))
+        except IntegrityError as e:
+            if _is_overlap(e) and attempt < GROUP_BOOKING_RETRIES - 1:
+                continue
+            if _is_overlap(e):
+                raise BookingConflict('Rooms in this block were booked concurrently, please retry.') from e
+            raise
+        except RoomUnavailable as e:
+            raise BookingConflict('Not enough rooms of a requested type for these dates.') from e
+
+        booked = {booking.room_id: booking for booking in bookings}
+        return booking_group, _group_results(rooms, failures, booked, booked=True), shortfalls
+
+
+def _group_results(rooms, failures, bookings, booked):
+    results = [
+        {
+            'room_id': room.id,
+            'room_number': room.number,
+            'status': 'booked' if booked else 'available',
+            'booking_id': bookings[room.id].id if booked else None,
+        }
+        for room in rooms
+    ]
+    results.extend(
+        {'room_id': room_id, 'room_number': number, 'status': reason, 'booking_id': None}
+        for room_id, (number, reason) in failures.items()
+    )
+    return results
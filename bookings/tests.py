@@ -1,3 +1,159 @@
-from django.test import TestCase
+import json
+import threading
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from accounts.models import Hotel
+from reports.models import HotelStatsRollup
+from reports.rollups import DAY
+from rooms.models import Room, RoomType, RoomTypeAvailability
+from .models import Booking
+from .services import BookingConflict, cancel_booking, create_booking, reschedule_booking
+
+
+CHECK_IN = date(2030, 5, 1)
+CHECK_OUT = date(2030, 5, 4)
+
+
+def make_rooms(count=2):
+    user = User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+    hotel = Hotel.objects.create(user=user, hotel_name='Lakeside Inn', mobile_number='9812345670')
+    room_type = RoomType.objects.create(hotel=hotel, name='Deluxe')
+    return [Room.objects.create(hotel=hotel, room_type=room_type, number=str(101 + i)) for i in range(count)]
+
+
+def booked_nights(room_type):
+    return list(
+        RoomTypeAvailability.objects.filter(room_type=room_type).order_by('date').values_list('booked_rooms', flat=True)
+    )
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    RACERS = 8
+
+    def test_only_one_parallel_reservation_wins(self):
+        room = make_rooms()[0]
+        start = threading.Barrier(self.RACERS)
+        outcomes = []
+
+        def book(i):
+            try:
+                start.wait()
+                create_booking(room, CHECK_IN, CHECK_OUT, guest_name=f'Guest {i}')
+                outcomes.append('booked')
+            except BookingConflict:
+                outcomes.append('conflict')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=(i,)) for i in range(self.RACERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ['booked'] + ['conflict'] * (self.RACERS - 1))
+        self.assertEqual(Booking.objects.filter(room=room).count(), 1)
+        # Losers rolled back their calendar and rollup changes too
+        self.assertEqual(booked_nights(room.room_type), [1, 1, 1])
+        self.assertEqual(
+            list(HotelStatsRollup.objects.filter(period=DAY).order_by('period_start').values_list('rooms_sold', flat=True)),
+            [1, 1, 1],
+        )
+
+
+class RescheduleTests(TestCase):
+    def setUp(self):
+        self.room, self.other_room = make_rooms()
+        self.booking = create_booking(self.room, CHECK_IN, CHECK_OUT, guest_name='Guest')
+
+    def test_moves_nights_on_the_calendar(self):
+        reschedule_booking(self.booking, date(2030, 5, 2), date(2030, 5, 5), room=self.other_room)
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.room, self.other_room)
+        self.assertEqual(booked_nights(self.room.room_type), [0, 1, 1, 1])
+
+    def test_conflicting_move_is_rejected(self):
+        create_booking(self.other_room, CHECK_IN, CHECK_OUT, guest_name='Other guest')
+
+        with self.assertRaises(BookingConflict):
+            reschedule_booking(self.booking, CHECK_IN, CHECK_OUT, room=self.other_room)
+
+        self.assertEqual(booked_nights(self.room.room_type), [2, 2, 2])
+
+    def test_cancelled_booking_cannot_be_rescheduled(self):
+        cancel_booking(self.booking)
+
+        with self.assertRaisesMessage(ValueError, 'cancelled booking'):
+            reschedule_booking(self.booking, date(2030, 6, 1), date(2030, 6, 3))
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.check_in, CHECK_IN)
+        self.assertEqual(booked_nights(self.room.room_type), [0, 0, 0])
+
+    def test_checked_out_booking_cannot_be_rescheduled(self):
+        Booking.objects.filter(pk=self.booking.pk).update(status=Booking.STATUS_CHECKED_OUT)
+
+        with self.assertRaisesMessage(ValueError, 'checked out booking'):
+            reschedule_booking(self.booking, date(2030, 6, 1), date(2030, 6, 3))
+        self.assertEqual(booked_nights(self.room.room_type), [1, 1, 1])
+
+
+class CancelTests(TestCase):
+    def setUp(self):
+        self.room = make_rooms(1)[0]
+        self.booking = create_booking(self.room, CHECK_IN, CHECK_OUT, guest_name='Guest')
+
+    def test_cancel_releases_nights_once(self):
+        cancel_booking(self.booking)
+        cancel_booking(self.booking)
+
+        self.assertEqual(booked_nights(self.room.room_type), [0, 0, 0])
+        self.assertEqual(
+            list(HotelStatsRollup.objects.filter(period=DAY).values_list('rooms_sold', flat=True)), [0, 0, 0],
+        )
+
+    def test_checked_out_booking_cannot_be_cancelled(self):
+        Booking.objects.filter(pk=self.booking.pk).update(status=Booking.STATUS_CHECKED_OUT)
+
+        with self.assertRaisesMessage(ValueError, 'checked out booking'):
+            cancel_booking(self.booking)
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, Booking.STATUS_CHECKED_OUT)
+        self.assertEqual(booked_nights(self.room.room_type), [1, 1, 1])
+        self.assertEqual(
+            list(HotelStatsRollup.objects.filter(period=DAY).values_list('rooms_sold', flat=True)), [1, 1, 1],
+        )
+
+
+class GroupBookingViewTests(TestCase):
+    def setUp(self):
+        self.rooms = make_rooms(2)
+        self.client.force_login(self.rooms[0].hotel.user)
+
+    def post(self, **data):
+        payload = {
+            'group_name': 'Tour', 'check_in': '2030-05-01', 'check_out': '2030-05-03',
+            'rooms': [room.pk for room in self.rooms], **data,
+        }
+        return self.client.post(reverse('group_booking'), json.dumps(payload), content_type='application/json')
+
+    def test_allow_partial_must_be_boolean(self):
+        for value in ['false', 0, 'yes', None]:
+            response = self.post(allow_partial=value)
+            self.assertEqual(response.status_code, 400, value)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_allow_partial_false_is_honoured(self):
+        create_booking(self.rooms[0], CHECK_IN, CHECK_OUT, guest_name='Walk-in')
+
+        response = self.post(allow_partial=False, check_in='2030-05-01', check_out='2030-05-03')
+
+        self.assertFalse(response.json()['success'])
+        self.assertEqual(Booking.objects.count(), 1)
@@ -1,3 +1,133 @@
-from django.shortcuts import render
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.http import require_http_methods
+from datetime import date
+from decimal import Decimal, InvalidOperation
+import json
 
-# Create your views here.
+from .services import MAX_GROUP_ROOMS, BookingConflict, create_group_booking
+
+
+def _parse_ids(values):
+    return [int(value) for value in values]
+
+
+# #############################################################
+# GROUP BOOKING VIEW
+# #############################################################
+@login_required
+@csrf_protect
+@require_http_methods(["POST"])
+def group_booking_view(request):
+    """Reserve a block of rooms for a group in one request"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'No hotel profile found. Please contact support.'
+        }, status=403)
+
+    try:
+        data = json.loads(request.body)
+        check_in = date.fromisoformat(data.get('check_in', ''))
+        check_out = date.fromisoformat(data.get('check_out', ''))
+        room_ids = _parse_ids(data.get('rooms', []))
+        blocks = [
+            {'room_type': int(block['room_type']), 'count': int(block['count'])}
+            for block in data.get('blocks', [])
+        ]
+        nightly_rate = Decimal(str(data.get('nightly_rate') or 0))
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid request format.'
+        }, status=400)
+    except (AttributeError, TypeError, ValueError, KeyError, InvalidOperation):
+        return JsonResponse({
+            'success': False,
+            'message': 'Please provide valid dates, rooms and blocks.'
+        }, status=400)
+
+    allow_partial = data.get('allow_partial', True)
+    if not isinstance(allow_partial, bool):
+        return JsonResponse({
+            'success': False,
+            'message': 'allow_partial must be true or false.'
+        }, status=400)
+
+    group_name = str(data.get('group_name', '')).strip()
+    guest_name = str(data.get('guest_name', '')).strip() or group_name
+    requested = len(room_ids) + sum(block['count'] for block in blocks)
+
+    if not group_name:
+        return JsonResponse({
+            'success': False,
+            'message': 'Group name is required.'
+        }, status=400)
+
+    if check_out <= check_in:
+        return JsonResponse({
+            'success': False,
+            'message': 'Check-out must be after check-in.'
+        }, status=400)
+
+    if requested == 0 or any(block['count'] < 1 for block in blocks):
+        return JsonResponse({
+            'success': False,
+            'message': 'Please choose at least one room.'
+        }, status=400)
+
+    if requested > MAX_GROUP_ROOMS:
+        return JsonResponse({
+            'success': False,
+            'message': f'A group booking can reserve at most {MAX_GROUP_ROOMS} rooms.'
+        }, status=400)
+
+    try:
+        booking_group, results, shortfalls = create_group_booking(
+            hotel,
+            check_in,
+            check_out,
+            group={
+                'name': group_name,
+                'contact_name': str(data.get('contact_name', '')).strip(),
+                'contact_email': str(data.get('contact_email', '')).strip(),
+                'contact_phone': str(data.get('contact_phone', '')).strip(),
+            },
+            room_ids=room_ids,
+            blocks=blocks,
+            allow_partial=allow_partial,
+            guest_name=guest_name,
+            guest_email=str(data.get('contact_email', '')).strip(),
+            guest_phone=str(data.get('contact_phone', '')).strip(),
+            nightly_rate=nightly_rate,
+        )
+    except BookingConflict as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=409)
+    except Exception as e:
+        print(f"Group booking error: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'message': 'An error occurred. Please try again.'
+        }, status=500)
+
+    booked = sum(1 for result in results if result['status'] == 'booked')
+    if booking_group is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'The requested rooms are not all available for these dates.',
+            'results': results,
+            'unfilled_blocks': shortfalls,
+        }, status=409)
+
+    return JsonResponse({
+        'success': True,
+        'message': f'Booked {booked} of {requested} room(s) for {group_name}.',
+        'group_id': booking_group.id,
+        'results': results,
+        'unfilled_blocks': shortfalls,
+    })
@@ -0,0 +1,17 @@
+"""
+Template context shared by every page.
+"""
+
+
+def hotel(request):
+    """Expose the signed-in user's hotel as `hotel` (None when absent)"""
+
+    def get_hotel():
+        # Templates call this lazily, so anonymous pages never touch the
+        # session. HotelUserBackend loads the hotel with the user, no query.
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return None
+        return getattr(user, 'hotel', None)
+
+    return {'hotel': get_hotel}
@@ -0,0 +1,128 @@
+"""
+Responsive derivatives for the marketing images under ``static/``.
+
+``build_responsive_images`` writes AVIF/WEBP copies at several widths
+into ``static/responsive`` with content-hashed names, plus a manifest
+that the ``responsive_image`` template tag reads to emit ``<picture>``
+markup. Without a manifest the tag falls back to the original file.
+"""
+
+import hashlib
+import json
+import os
+import re
+from io import BytesIO
+
+from django.conf import settings
+from PIL import Image, features
+
+
+RESPONSIVE_IMAGE_SOURCES = [
+    'Logo/WithoutBg.png',
+    'Base/Complete Hotel Management Solution.png',
+    'Base/Effortless Room Booking.png',
+    'Base/Smooth Guest Experience.png',
+    'Base/Inventory & Purchase Management.png',
+]
+
+RESPONSIVE_IMAGE_WIDTHS = (480, 960, 1440)
+
+RESPONSIVE_IMAGE_FORMATS = {
+    'avif': {'format': 'AVIF', 'quality': 55},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+}
+
+OUTPUT_DIR = 'responsive'
+MANIFEST_NAME = 'manifest.json'
+
+_manifest_cache = {'mtime': None, 'data': {}}
+
+
+def get_source_root():
+    return settings.STATICFILES_DIRS[0]
+
+
+def get_manifest_path():
+    return os.path.join(get_source_root(), OUTPUT_DIR, MANIFEST_NAME)
+
+
+def get_supported_formats():
+    return {
+        ext: options for ext, options in RESPONSIVE_IMAGE_FORMATS.items()
+        if features.check(ext)
+    }
+
+
+def _slugify_name(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def build_variants(source_path):
+    """Write all width/format variants for one source image and return its manifest entry"""
+    source_root = get_source_root()
+    full_path = os.path.join(source_root, source_path)
+
+    with open(full_path, 'rb') as f:
+        data = f.read()
+
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    image = Image.open(BytesIO(data))
+    image.load()
+    width, height = image.size
+
+    entry = {
+        'width': width,
+        'height': height,
+        'bytes': len(data),
+        'variants': {},
+    }
+
+    output_dir = os.path.join(source_root, OUTPUT_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Never upscale; always include one variant no wider than the source
+    widths = [w for w in RESPONSIVE_IMAGE_WIDTHS if w < width] or [width]
+
+    for ext, options in get_supported_formats().items():
+        variants = []
+        for target_width in widths:
+            name = f'{OUTPUT_DIR}/{_slugify_name(source_path)}.{digest}.{target_width}w.{ext}'
+            output_path = os.path.join(source_root, name)
+
+            if not os.path.exists(output_path):
+                target_height = round(height * target_width / width)
+                resized = image.resize((target_width, target_height), Image.LANCZOS)
+                resized.save(output_path, **options)
+
+            variants.append({
+                'width': target_width,
+                'name': name,
+                'bytes': os.path.getsize(output_path),
+            })
+        entry['variants'][ext] = variants
+
+    return entry
+
+
+def write_manifest(manifest):
+    path = get_manifest_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def load_manifest():
+    """Return the responsive image manifest, re-reading it when the file changes"""
+    path = get_manifest_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+
+    if _manifest_cache['mtime'] != mtime:
+        with open(path) as f:
+            _manifest_cache['data'] = json.load(f)
+        _manifest_cache['mtime'] = mtime
+
+    return _manifest_cache['data']
@@ -0,0 +1,79 @@
+import os
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.images import (
+    OUTPUT_DIR,
+    RESPONSIVE_IMAGE_SOURCES,
+    build_variants,
+    get_source_root,
+    write_manifest,
+)
+
+
+TAG_PATTERN = re.compile(r"""{%\s*responsive_image\s+['"]([^'"]+)['"]""")
+
+
+def format_size(num_bytes):
+    return f'{num_bytes / 1024 / 1024:.2f} MB' if num_bytes >= 1024 * 1024 else f'{num_bytes / 1024:.0f} KB'
+
+
+class Command(BaseCommand):
+    help = 'Generate AVIF/WEBP width variants for marketing images and report bytes saved'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clean', action='store_true', help='Remove stale variants first')
+
+    def handle(self, *args, **options):
+        output_dir = os.path.join(get_source_root(), OUTPUT_DIR)
+        if options['clean'] and os.path.isdir(output_dir):
+            for name in os.listdir(output_dir):
+                os.remove(os.path.join(output_dir, name))
+
+        manifest = {}
+        for source in RESPONSIVE_IMAGE_SOURCES:
+            if not os.path.exists(os.path.join(get_source_root(), source)):
+                self.stderr.write(f'Skipping missing image: {source}')
+                continue
+
+            entry = build_variants(source)
+            manifest[source] = entry
+
+            largest = {ext: variants[-1]['bytes'] for ext, variants in entry['variants'].items()}
+            summary = ', '.join(f'{ext} {format_size(size)}' for ext, size in largest.items())
+            self.stdout.write(f'{source}: {format_size(entry["bytes"])} -> {summary}')
+
+        write_manifest(manifest)
+        self.report_pages(manifest)
+
+    def report_pages(self, manifest):
+        """Bytes saved per template, assuming the widest variant of the best format"""
+        self.stdout.write('')
+        self.stdout.write('Bytes saved per page:')
+
+        for template_dir in settings.TEMPLATES[0]['DIRS']:
+            for root, _, files in os.walk(template_dir):
+                for name in sorted(files):
+                    if not name.endswith('.html'):
+                        continue
+
+                    path = os.path.join(root, name)
+                    with open(path, encoding='utf-8') as f:
+                        sources = set(TAG_PATTERN.findall(f.read()))
+
+                    original = optimized = 0
+                    for source in sources & manifest.keys():
+                        entry = manifest[source]
+                        original += entry['bytes']
+                        best = min(variants[-1]['bytes'] for variants in entry['variants'].values())
+                        optimized += best
+
+                    if original:
+                        saved = original - optimized
+                        self.stdout.write(
+                            f'  {os.path.relpath(path, template_dir)}: '
+                            f'{format_size(original)} -> {format_size(optimized)} '
+                            f'(saved {format_size(saved)}, {saved / original:.0%})'
+                        )
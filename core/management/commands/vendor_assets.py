@@ -0,0 +1,313 @@
+import json
+import os
+import re
+import urllib.error
+import urllib.request
+from io import BytesIO
+from urllib.parse import quote_plus, urljoin
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.vendor import (
+    AGUSTINA_CSS_URL,
+    EXTRA_LUCIDE_ICONS,
+    GOOGLE_FONT_SUBSETS,
+    GOOGLE_FONTS,
+    LUCIDE_VERSION,
+    REMIXICON_VERSION,
+    VENDOR_DIR,
+    get_vendor_root,
+    write_manifest,
+)
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:
+    font_subset = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# A modern browser UA makes Google Fonts serve WOFF2
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/126.0 Safari/537.36'
+)
+
+# Faces worth preloading: body text and the main heading weight
+PRELOAD_FACES = {('Inter', '400'), ('Poppins', '700')}
+
+BASIC_LATIN = 'U+0020-007E,U+00A0-00FF,U+2013-2014,U+2018-201D,U+2022,U+2026,U+20AC'
+
+LUCIDE_PATTERNS = [
+    re.compile(r'data-lucide="([a-z0-9-]+)"'),
+    re.compile(r"""data-lucide['"],\s*['"]([a-z0-9-]+)['"]"""),
+]
+REMIXICON_CLASS_PATTERN = re.compile(r'\bri-[a-z0-9-]+')
+FONT_WEIGHT_PATTERN = re.compile(r'font-weight:\s*(\d{3}|bold|normal)')
+GOOGLE_FACE_PATTERN = re.compile(r'/\*\s*([\w-]+)\s*\*/\s*(@font-face\s*\{.*?\})', re.S)
+CSS_RULE_PATTERN = re.compile(r'([^{}]+)\{([^{}]*)\}')
+CSS_URL_PATTERN = re.compile(r'url\((["\']?)([^)"\']+)\1\)')
+ICON_RULE_PATTERN = re.compile(r'^\.(ri-[a-z0-9-]+):{1,2}before$')
+CONTENT_CODEPOINT_PATTERN = re.compile(r'content:\s*["\']\\([0-9a-fA-F]+)["\']')
+
+LUCIDE_SHIM = """/* lucide-static@%(version)s: %(count)d icons used by Bookly. Generated by `manage.py vendor_assets`. */
+(function () {
+    var icons = %(icons)s;
+
+    function classesFor(name, existing) {
+        var extra = (existing || '').split(/\\s+/).filter(function (c) {
+            return c && c !== 'lucide' && c.indexOf('lucide-') !== 0;
+        });
+        return ['lucide', 'lucide-' + name].concat(extra).join(' ');
+    }
+
+    function createIcons() {
+        document.querySelectorAll('[data-lucide]').forEach(function (element) {
+            var name = element.getAttribute('data-lucide');
+            if (!icons[name]) {
+                return;
+            }
+            var template = document.createElement('template');
+            template.innerHTML = icons[name];
+            var svg = template.content.firstElementChild;
+            Array.prototype.forEach.call(element.attributes, function (attr) {
+                if (attr.name !== 'class') {
+                    svg.setAttribute(attr.name, attr.value);
+                }
+            });
+            svg.setAttribute('class', classesFor(name, element.getAttribute('class')));
+            element.parentNode.replaceChild(svg, element);
+        });
+    }
+
+    window.lucide = { icons: icons, createIcons: createIcons };
+})();
+"""
+
+
+def fetch(url):
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def parse_declarations(block):
+    return dict(
+        (key.strip(), value.strip())
+        for key, _, value in (part.partition(':') for part in block.split(';'))
+        if value
+    )
+
+
+class Command(BaseCommand):
+    help = 'Download, pin and subset the fonts and icons used by the templates into static/vendor'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-subset', action='store_true', help='Keep full font files')
+
+    def handle(self, *args, **options):
+        self.subset = font_subset is not None and not options['no_subset']
+        if font_subset is None and not options['no_subset']:
+            self.stderr.write('fontTools is not installed; fonts will not be subset')
+
+        self.flavor = 'woff2' if brotli is not None else 'woff'
+        self.root = get_vendor_root()
+        os.makedirs(os.path.join(self.root, 'fonts'), exist_ok=True)
+        os.makedirs(os.path.join(self.root, 'remixicon'), exist_ok=True)
+        os.makedirs(os.path.join(self.root, 'lucide'), exist_ok=True)
+
+        sources = self.read_sources()
+
+        try:
+            fonts_css, preload = self.vendor_google_fonts(sources)
+            fonts_css += self.vendor_agustina()
+            remixicon_css = self.vendor_remixicon(sources)
+            lucide_js = self.vendor_lucide(sources)
+        except urllib.error.URLError as e:
+            raise CommandError(f'Download failed: {e}')
+
+        self.write('fonts/fonts.css', fonts_css.encode('utf-8'))
+
+        write_manifest({
+            'fonts_css': f'{VENDOR_DIR}/fonts/fonts.css',
+            'preload': preload,
+            'remixicon_css': remixicon_css,
+            'lucide_js': lucide_js,
+        })
+        self.stdout.write(self.style.SUCCESS(f'Vendored assets written to {self.root}'))
+
+    def write(self, name, data):
+        with open(os.path.join(self.root, name), 'wb') as f:
+            f.write(data)
+        return f'{VENDOR_DIR}/{name}'
+
+    def read_sources(self):
+        """Concatenate every template, script and stylesheet that may reference fonts or icons"""
+        roots = list(settings.TEMPLATES[0]['DIRS']) + list(settings.STATICFILES_DIRS)
+        texts = []
+        for root in roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d != VENDOR_DIR]
+                for name in filenames:
+                    if name.endswith(('.html', '.js', '.css')):
+                        with open(os.path.join(dirpath, name), encoding='utf-8', errors='ignore') as f:
+                            texts.append(f.read())
+        return '\n'.join(texts)
+
+    def subset_font(self, data, unicodes):
+        if not self.subset:
+            return data, None
+
+        options = font_subset.Options()
+        options.flavor = self.flavor
+        font = font_subset.load_font(BytesIO(data), options)
+        subsetter = font_subset.Subsetter(options)
+        subsetter.populate(unicodes=unicodes)
+        subsetter.subset(font)
+
+        output = BytesIO()
+        font_subset.save_font(font, output, options)
+        return output.getvalue(), self.flavor
+
+    # ----- Google Fonts -----
+
+    def used_weights(self, sources):
+        weights = {400}
+        for value in FONT_WEIGHT_PATTERN.findall(sources):
+            weights.add({'normal': 400, 'bold': 700}.get(value) or int(value))
+        return weights
+
+    def vendor_google_fonts(self, sources):
+        weights = self.used_weights(sources)
+        families = []
+        for family, available in GOOGLE_FONTS.items():
+            keep = [w for w in available if w in weights] or [available[0]]
+            families.append(f'family={quote_plus(family)}:wght@{";".join(map(str, keep))}')
+
+        url = 'https://fonts.googleapis.com/css2?' + '&'.join(families) + '&display=swap'
+        css = fetch(url).decode('utf-8')
+
+        faces, preload, downloaded = [], [], {}
+        for subset, face in GOOGLE_FACE_PATTERN.findall(css):
+            if subset not in GOOGLE_FONT_SUBSETS:
+                continue
+
+            declarations = parse_declarations(face[face.index('{') + 1:-1])
+            family = declarations['font-family'].strip('\'"')
+            weight = declarations['font-weight']
+            remote = CSS_URL_PATTERN.search(declarations['src']).group(2)
+
+            # Variable fonts share one file across weights
+            if remote not in downloaded:
+                name = f'{family.lower().replace(" ", "-")}-{weight}-{subset}.woff2'
+                downloaded[remote] = name
+                self.write(f'fonts/{name}', fetch(remote))
+            name = downloaded[remote]
+
+            faces.append(face.replace(remote, name))
+            if (family, weight) in PRELOAD_FACES:
+                preload.append(f'{VENDOR_DIR}/fonts/{name}')
+
+        return '\n'.join(faces) + '\n', sorted(set(preload))
+
+    # ----- Agustina -----
+
+    def vendor_agustina(self):
+        css = fetch(AGUSTINA_CSS_URL).decode('utf-8')
+        faces = []
+        for selector, block in CSS_RULE_PATTERN.findall(css):
+            if selector.strip() != '@font-face':
+                continue
+
+            declarations = parse_declarations(block)
+            remote = urljoin(AGUSTINA_CSS_URL, CSS_URL_PATTERN.search(declarations['src']).group(2))
+            data, flavor = self.subset_font(fetch(remote), font_subset.parse_unicodes(BASIC_LATIN) if self.subset else None)
+
+            extension = flavor or os.path.splitext(remote)[1].lstrip('.') or 'woff'
+            name = f'agustina.{extension}'
+            self.write(f'fonts/{name}', data)
+
+            faces.append(
+                '@font-face {\n'
+                f"  font-family: {declarations['font-family']};\n"
+                f"  font-style: {declarations.get('font-style', 'normal')};\n"
+                f"  font-weight: {declarations.get('font-weight', '400')};\n"
+                '  font-display: swap;\n'
+                f"  src: url({name}) format('{extension}');\n"
+                '}'
+            )
+            break
+
+        return '\n'.join(faces) + '\n'
+
+    # ----- Remix Icon -----
+
+    def vendor_remixicon(self, sources):
+        base_url = f'https://cdn.jsdelivr.net/npm/remixicon@{REMIXICON_VERSION}/fonts/'
+        css = fetch(base_url + 'remixicon.css').decode('utf-8')
+        used = set(REMIXICON_CLASS_PATTERN.findall(sources))
+
+        rules, codepoints = [], []
+        for selector, block in CSS_RULE_PATTERN.findall(css):
+            selector = selector.strip()
+            if selector.startswith('/*'):
+                selector = selector.split('*/')[-1].strip()
+
+            if selector == '@font-face':
+                rules.append(
+                    '@font-face {\n'
+                    '  font-family: "remixicon";\n'
+                    '  font-display: swap;\n'
+                    '  src: url("remixicon.woff2") format("woff2");\n'
+                    '}'
+                )
+                continue
+
+            icon = ICON_RULE_PATTERN.match(selector)
+            if icon and icon.group(1) not in used:
+                continue
+
+            if icon:
+                match = CONTENT_CODEPOINT_PATTERN.search(block)
+                if match:
+                    codepoints.append(int(match.group(1), 16))
+            rules.append(f'{selector} {{{block.strip()}}}')
+
+        font = fetch(base_url + 'remixicon.woff2')
+        if self.subset and codepoints and brotli is not None:
+            font, _ = self.subset_font(font, codepoints)
+
+        self.write('remixicon/remixicon.woff2', font)
+        self.stdout.write(f'Remix Icon: kept {len(codepoints)} icons')
+        return self.write('remixicon/remixicon.css', '\n'.join(rules).encode('utf-8'))
+
+    # ----- Lucide -----
+
+    def vendor_lucide(self, sources):
+        names = set(EXTRA_LUCIDE_ICONS)
+        for pattern in LUCIDE_PATTERNS:
+            names.update(pattern.findall(sources))
+
+        icons = {}
+        for name in sorted(names):
+            url = f'https://unpkg.com/lucide-static@{LUCIDE_VERSION}/icons/{name}.svg'
+            try:
+                svg = fetch(url).decode('utf-8')
+            except urllib.error.HTTPError:
+                self.stderr.write(f'Lucide icon not found: {name}')
+                continue
+            svg = re.sub(r'<!--.*?-->', '', svg, flags=re.S)
+            icons[name] = re.sub(r'>\s+<', '><', svg).strip()
+
+        script = LUCIDE_SHIM % {
+            'version': LUCIDE_VERSION,
+            'count': len(icons),
+            'icons': json.dumps(icons, indent=4, sort_keys=True),
+        }
+        self.stdout.write(f'Lucide: {len(icons)} icons')
+        return self.write('lucide/lucide-icons.js', script.encode('utf-8'))
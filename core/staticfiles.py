@@ -0,0 +1,71 @@
+"""
+In-process static file serving for deployments without a CDN or proxy.
+
+Serves files collected by ``CompressedManifestStaticFilesStorage``,
+preferring the precompressed ``.br``/``.gz`` sibling the client accepts.
+Content-hashed files are marked immutable so repeat visits never
+revalidate them.
+"""
+
+import mimetypes
+import os
+import posixpath
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=3600'
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+@lru_cache(maxsize=1)
+def get_hashed_names():
+    """Names of all content-hashed files listed in the static manifest"""
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', None) or {}
+    return frozenset(hashed_files.values())
+
+
+def serve_static(request, path):
+    """Serve a collected static file with precompression and cache headers"""
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404('Invalid path')
+
+    if not os.path.isfile(full_path):
+        raise Http404('File not found')
+
+    stat = os.stat(full_path)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type, _ = mimetypes.guess_type(full_path)
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+    serve_path, content_encoding = full_path, None
+    for encoding, suffix in ENCODINGS:
+        if encoding in accept_encoding and os.path.isfile(full_path + suffix):
+            serve_path, content_encoding = full_path + suffix, encoding
+            break
+
+    response = FileResponse(open(serve_path, 'rb'), content_type=content_type or 'application/octet-stream')
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Vary'] = 'Accept-Encoding'
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+
+    if path in get_hashed_names():
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response['Cache-Control'] = DEFAULT_CACHE_CONTROL
+
+    return response
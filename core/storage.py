@@ -0,0 +1,114 @@
+"""
+Static files storage for production builds.
+
+On top of Django's manifest storage (content-hashed names), collectstatic
+also minifies CSS/JS before hashing, points byte-identical assets at one
+hashed copy so browsers fetch it once, and writes ``.gz``/``.br`` siblings
+that ``core.staticfiles.serve_static`` can hand out directly.
+"""
+
+import gzip
+import hashlib
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.ico', '.xml', '.map')
+MIN_COMPRESS_SIZE = 256
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+
+
+def minify_css(text):
+    if rcssmin is not None:
+        return rcssmin.cssmin(text)
+    # Conservative fallback: drop comments, indentation and blank lines
+    text = CSS_COMMENT_RE.sub('', text)
+    return '\n'.join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def minify_js(text):
+    if rjsmin is not None:
+        return rjsmin.jsmin(text)
+    # No safe stdlib JS minifier; leave the source as-is
+    return text
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def _save(self, name, content):
+        if not self._is_minified(name):
+            if name.endswith('.css'):
+                content = self._minified(content, minify_css)
+            elif name.endswith('.js'):
+                content = self._minified(content, minify_js)
+        return super()._save(name, content)
+
+    def _is_minified(self, name):
+        return '.min.' in name
+
+    def _minified(self, content, minifier):
+        content.seek(0)
+        raw = content.read()
+        text = raw.decode('utf-8') if isinstance(raw, bytes) else raw
+        return ContentFile(minifier(text).encode('utf-8'))
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+
+        if dry_run:
+            return
+
+        self.deduplicate()
+        self.save_manifest()
+
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.write_compressed(hashed_name)
+
+    def deduplicate(self):
+        """Point every byte-identical asset at a single hashed file"""
+        by_digest = {}
+        for name in sorted(self.hashed_files):
+            hashed_name = self.hashed_files[name]
+            if not self.exists(hashed_name):
+                continue
+            with self.open(hashed_name) as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            canonical = by_digest.setdefault(digest, hashed_name)
+            self.hashed_files[name] = canonical
+
+    def write_compressed(self, hashed_name):
+        with self.open(hashed_name) as f:
+            data = f.read()
+
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+
+        variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data, quality=11)))
+
+        for suffix, compressed in variants:
+            if len(compressed) >= len(data):
+                continue
+            target = hashed_name + suffix
+            if self.exists(target):
+                self.delete(target)
+            self._save(target, ContentFile(compressed))
@@ -0,0 +1,46 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from core.images import load_manifest
+
+
+register = template.Library()
+
+MIME_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+}
+
+
+@register.simple_tag
+def responsive_image(path, alt='', css_class='', sizes='100vw', loading='lazy'):
+    """Render a <picture> with AVIF/WEBP srcsets, falling back to the original image"""
+    entry = load_manifest().get(path)
+    fetch_priority = 'high' if loading == 'eager' else 'auto'
+
+    if entry is None:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async" fetchpriority="{}">',
+            static(path), alt, css_class, loading, fetch_priority,
+        )
+
+    sources = format_html_join(
+        '',
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (
+                MIME_TYPES[ext],
+                ', '.join(f'{static(v["name"])} {v["width"]}w' for v in variants),
+                sizes,
+            )
+            for ext, variants in entry['variants'].items() if ext in MIME_TYPES
+        ),
+    )
+
+    return format_html(
+        '<picture>{}<img src="{}" alt="{}" class="{}" width="{}" height="{}" '
+        'loading="{}" decoding="async" fetchpriority="{}"></picture>',
+        sources, static(path), alt, css_class, entry['width'], entry['height'],
+        loading, fetch_priority,
+    )
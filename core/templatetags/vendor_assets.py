@@ -0,0 +1,22 @@
+from django import template
+
+from core.vendor import LUCIDE_VERSION, REMIXICON_VERSION, load_manifest
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def get_vendor_manifest():
+    """Manifest of self-hosted fonts/icons, empty until vendor_assets has run"""
+    return load_manifest()
+
+
+@register.simple_tag
+def lucide_version():
+    return LUCIDE_VERSION
+
+
+@register.simple_tag
+def remixicon_version():
+    return REMIXICON_VERSION
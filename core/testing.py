@@ -0,0 +1,39 @@
+"""
+Helpers shared by the apps' tests.
+"""
+
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+
+
+# Tag for slow load tests and benchmarks, run with `manage.py test --tag load`
+LOAD_TAG = 'load'
+
+
+class TestRunner(DiscoverRunner):
+    """Leaves out tests tagged `load` unless they are asked for with --tag"""
+
+    def __init__(self, tags=None, exclude_tags=None, **kwargs):
+        exclude_tags = set(exclude_tags or ())
+        if LOAD_TAG not in (tags or ()):
+            exclude_tags.add(LOAD_TAG)
+        super().__init__(tags=tags, exclude_tags=exclude_tags, **kwargs)
+
+
+class QueryCountMixin:
+    """TestCase mixin for pinning the number of queries a code path runs"""
+
+    @contextmanager
+    def assertMaxQueries(self, limit, using=DEFAULT_DB_ALIAS):
+        """Fail when the block runs more than `limit` queries, listing them"""
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > limit:
+            queries = '\n'.join(
+                f'{i}. {query["sql"]}' for i, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f'{executed} queries executed, at most {limit} expected:\n{queries}')
@@ -1,3 +1,107 @@
-from django.test import TestCase
+import re
+import shutil
+import tempfile
+from pathlib import Path
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.backends import get_cached_user
+from accounts.models import Hotel
+from .testing import QueryCountMixin
+
+
+def file_cache(location):
+    return {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        },
+    }
+
+
+class DashboardQueryTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+        self.hotel = Hotel.objects.create(user=self.user, hotel_name='Lakeside Inn', mobile_number='9812345670')
+        self.client.force_login(self.user)
+
+    def use_shared_cache(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        shared = override_settings(CACHES=file_cache(location))
+        shared.enable()
+        self.addCleanup(shared.disable)
+        self.addCleanup(caches['default'].clear)
+
+    def test_uncached_dashboard(self):
+        # Session, user with hotel, KPI rollups
+        with self.assertMaxQueries(3):
+            response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Lakeside Inn')
+
+    def test_warm_dashboard_with_shared_cache(self):
+        self.use_shared_cache()
+        self.client.get(reverse('dashboard'))
+
+        # Session, KPI rollups
+        with self.assertMaxQueries(2):
+            response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Lakeside Inn')
+
+    def test_local_cache_is_not_used_for_users(self):
+        get_cached_user(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_deactivated_user_is_signed_out(self):
+        self.use_shared_cache()
+        self.client.get(reverse('dashboard'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_password_change_ends_other_sessions(self):
+        self.use_shared_cache()
+        self.client.get(reverse('dashboard'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('N3w!Passw0rd')
+            self.user.save()
+
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_hotel_change_is_seen_on_next_request(self):
+        self.use_shared_cache()
+        self.client.get(reverse('dashboard'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hotel.hotel_name = 'Lakeside Lodge'
+            self.hotel.save()
+
+        self.assertContains(self.client.get(reverse('dashboard')), 'Lakeside Lodge')
+
+
+class StaticReferenceTests(SimpleTestCase):
+    STATIC_TAG_RE = re.compile(r"""{%\s*(?:static|responsive_image)\s+['"]([^'"]+)['"]""")
+
+    def test_templates_only_reference_shipped_files(self):
+        # The manifest storage refuses to render a page naming a missing file
+        missing = []
+        for directory in settings.TEMPLATES[0]['DIRS']:
+            for template in Path(directory).rglob('*.html'):
+                for name in self.STATIC_TAG_RE.findall(template.read_text()):
+                    if finders.find(name) is None:
+                        missing.append(f'{template.relative_to(directory)}: {name}')
+        self.assertEqual(missing, [])
@@ -0,0 +1,65 @@
+"""
+Self-hosted fonts and icon assets.
+
+``vendor_assets`` downloads pinned copies of the web fonts and icon sets
+the templates use into ``static/vendor``, trimmed to the weights, glyphs
+and icons actually referenced, and records them in a manifest. The
+``includes/vendor_assets.html`` partial reads that manifest and falls
+back to the pinned CDN URLs until the command has been run.
+"""
+
+import json
+import os
+
+from django.conf import settings
+
+
+GOOGLE_FONTS = {
+    'Inter': (400, 500, 600, 700, 800, 900),
+    'Poppins': (600, 700, 800, 900),
+    'Kaushan Script': (400,),
+}
+GOOGLE_FONT_SUBSETS = ('latin',)
+
+AGUSTINA_CSS_URL = 'https://fonts.cdnfonts.com/css/agustina'
+
+REMIXICON_VERSION = '4.5.0'
+LUCIDE_VERSION = '0.460.0'
+
+# Icons picked at runtime from JS variables, which a markup scan cannot see
+EXTRA_LUCIDE_ICONS = ('eye', 'eye-off', 'alert-circle', 'alert-triangle', 'check-circle')
+
+VENDOR_DIR = 'vendor'
+MANIFEST_NAME = 'manifest.json'
+
+_manifest_cache = {'mtime': None, 'data': {}}
+
+
+def get_vendor_root():
+    return os.path.join(settings.STATICFILES_DIRS[0], VENDOR_DIR)
+
+
+def get_manifest_path():
+    return os.path.join(get_vendor_root(), MANIFEST_NAME)
+
+
+def write_manifest(manifest):
+    os.makedirs(get_vendor_root(), exist_ok=True)
+    with open(get_manifest_path(), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def load_manifest():
+    """Return the vendored asset manifest, or {} if assets are not vendored"""
+    path = get_manifest_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+
+    if _manifest_cache['mtime'] != mtime:
+        with open(path) as f:
+            _manifest_cache['data'] = json.load(f)
+        _manifest_cache['mtime'] = mtime
+
+    return _manifest_cache['data']
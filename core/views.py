@@ -2,6 +2,8 @@ from django.http import HttpResponse
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 
+from reports.rollups import dashboard_kpis
+
 
 
 
@@ -16,9 +18,8 @@ def index_page(request):
 # #############################################################
 @login_required(login_url='/accounts/login/')
 def dashboard_page(request):
-    """Dashboard page - requires login"""
-    context = {
-        'user': request.user,
-        'hotel': getattr(request.user, 'hotel', None)
-    }
-    return render(request, 'dashboard/index.html', context)
\ No newline at end of file
+    """Dashboard page - requires login (hotel comes from core.context_processors)"""
+    hotel = getattr(request.user, 'hotel', None)
+    return render(request, 'dashboard/index.html', {
+        'kpis': dashboard_kpis(hotel) if hotel else None,
+    })
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Find and merge duplicate guest profiles.
+
+Candidates are "blocked" on normalized keys first: only guests of the same
+hotel sharing a normalized email or phone number are ever compared, and the
+pairwise name comparison runs inside each (small) block. Blocks are read
+with keyset pagination over the (hotel, key) indexes so memory stays
+bounded however large the guest table is.
+"""
+
+from difflib import SequenceMatcher
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Guest
+from .normalize import normalize_email, normalize_name, normalize_phone
+from .signals import guests_merging
+
+
+BLOCK_KEYS = ('email_key', 'phone_key')
+NAME_MATCH_THRESHOLD = 0.85
+# Larger blocks are usually shared contacts (agencies, front-desk phone)
+MAX_BLOCK_SIZE = 50
+# Blank fields on the surviving profile are filled from its duplicates
+MERGE_FIELDS = ['email', 'phone', 'id_type', 'id_number', 'nationality', 'date_of_birth', 'address']
+
+
+def backfill_keys(after_id=0, batch_size=2000):
+    """
+    Fill email_key/phone_key for rows written without save() (bulk imports).
+
+    Yields (last id, rows scanned) per chunk.
+    """
+    pending = Guest.objects.filter(
+        (Q(email_key='') & ~Q(email='')) | (Q(phone_key='') & ~Q(phone=''))
+    )
+    while True:
+        chunk = list(
+            pending
+            .filter(id__gt=after_id)
+            .order_by('id')
+            .only('id', 'email', 'phone', 'email_key', 'phone_key')[:batch_size]
+        )
+        if not chunk:
+            return
+
+        changed = []
+        for guest in chunk:
+            keys = normalize_email(guest.email), normalize_phone(guest.phone)
+            if keys != (guest.email_key, guest.phone_key):
+                guest.email_key, guest.phone_key = keys
+                changed.append(guest)
+        Guest.objects.bulk_update(changed, ['email_key', 'phone_key'])
+
+        after_id = chunk[-1].id
+        yield after_id, len(chunk)
+
+
+def iter_blocks(key_field, after=(0, ''), hotel_id=None, page_size=500):
+    """Yield (hotel_id, key, size) for every key shared by 2+ guests of a hotel"""
+    guests = Guest.objects.exclude(**{key_field: ''})
+    if hotel_id:
+        guests = guests.filter(hotel_id=hotel_id)
+
+    while True:
+        last_hotel, last_key = after
+        page = list(
+            guests
+            .filter(Q(hotel_id__gt=last_hotel) | Q(hotel_id=last_hotel, **{f'{key_field}__gt': last_key}))
+            .values('hotel_id', key_field)
+            .annotate(size=Count('id'))
+            .filter(size__gt=1)
+            .order_by('hotel_id', key_field)[:page_size]
+        )
+        if not page:
+            return
+        for row in page:
+            yield row['hotel_id'], row[key_field], row['size']
+        after = (page[-1]['hotel_id'], page[-1][key_field])
+
+
+def names_match(a, b, threshold=NAME_MATCH_THRESHOLD):
+    return a == b or SequenceMatcher(None, a, b).ratio() >= threshold
+
+
+def find_duplicates(guests, threshold=NAME_MATCH_THRESHOLD):
+    """
+    Cluster a block of guests by name similarity.
+
+    Returns lists of 2+ guests, oldest first (the survivor).
+    """
+    names = [normalize_name(guest.full_name) for guest in guests]
+    parent = list(range(len(guests)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(guests)):
+        for j in range(i + 1, len(guests)):
+            if find(i) != find(j) and names_match(names[i], names[j], threshold):
+                parent[find(j)] = find(i)
+
+    clusters = {}
+    for i, guest in enumerate(guests):
+        clusters.setdefault(find(i), []).append(guest)
+    return [
+        sorted(cluster, key=lambda guest: guest.id)
+        for cluster in clusters.values()
+        if len(cluster) > 1
+    ]
+
+
+def merge_guests(survivor, duplicates):
+    """Point every reference at `survivor`, keep the best data, drop the rest"""
+    duplicate_ids = [guest.id for guest in duplicates]
+
+    with transaction.atomic():
+        # Referrals and the like rebuild their own rows first
+        guests_merging.send(sender=Guest, survivor=survivor, duplicates=duplicates)
+
+        # Anything with a ForeignKey to Guest follows the survivor
+        for relation in Guest._meta.related_objects:
+            if relation.one_to_many:
+                relation.related_model._base_manager.filter(
+                    **{f'{relation.field.name}__in': duplicate_ids}
+                ).update(**{relation.field.name: survivor})
+
+        for field in MERGE_FIELDS:
+            if not getattr(survivor, field):
+                for guest in duplicates:
+                    if getattr(guest, field):
+                        setattr(survivor, field, getattr(guest, field))
+                        break
+
+        notes = [survivor.notes] + [guest.notes for guest in duplicates]
+        survivor.notes = '\n\n'.join(dict.fromkeys(note.strip() for note in notes if note.strip()))
+        survivor.save()
+
+        Guest.objects.filter(id__in=duplicate_ids).delete()
+    return len(duplicate_ids)
@@ -0,0 +1,110 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from guests.dedupe import (
+    BLOCK_KEYS,
+    MAX_BLOCK_SIZE,
+    NAME_MATCH_THRESHOLD,
+    backfill_keys,
+    find_duplicates,
+    iter_blocks,
+    merge_guests,
+)
+from guests.models import Guest, GuestDedupeCheckpoint
+
+
+class Command(BaseCommand):
+    help = 'Normalize guest contact details and merge duplicate guest profiles in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotel', type=int, help='Only dedupe this hotel id')
+        parser.add_argument('--batch-size', type=int, default=200, help='Blocks merged per transaction')
+        parser.add_argument('--threshold', type=float, default=NAME_MATCH_THRESHOLD,
+                            help='Minimum name similarity (0-1) to treat guests as duplicates')
+        parser.add_argument('--max-block-size', type=int, default=MAX_BLOCK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Report duplicates without merging')
+        parser.add_argument('--restart', action='store_true', help='Ignore checkpoints from an interrupted run')
+
+    def handle(self, *args, **options):
+        if options['restart']:
+            GuestDedupeCheckpoint.objects.all().delete()
+
+        self.started = time.monotonic()
+        self.scanned = 0
+        self.merged = 0
+
+        if not options['dry_run']:
+            self.backfill()
+        for key_field in BLOCK_KEYS:
+            self.dedupe(key_field, options)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {self.scanned} row(s) scanned, {self.merged} duplicate(s) '
+            f'{"found" if options["dry_run"] else "merged"}, {self.rate()}'
+        ))
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return f'{self.scanned / elapsed if elapsed else 0:.0f} rows/s'
+
+    def backfill(self):
+        checkpoint, _ = GuestDedupeCheckpoint.objects.get_or_create(stage='keys')
+        for last_id, scanned in backfill_keys(after_id=checkpoint.last_id):
+            self.scanned += scanned
+            checkpoint.last_id = last_id
+            checkpoint.save(update_fields=['last_id', 'updated_at'])
+        checkpoint.delete()
+        self.stdout.write(f'Normalized keys: {self.scanned} row(s), {self.rate()}')
+
+    def dedupe(self, key_field, options):
+        dry_run = options['dry_run']
+        # Dry runs always scan everything and leave checkpoints alone
+        checkpoint = None
+        after = (0, '')
+        if not dry_run:
+            checkpoint, _ = GuestDedupeCheckpoint.objects.get_or_create(stage=key_field)
+            after = (checkpoint.last_id, checkpoint.last_key)
+        blocks = iter_blocks(key_field, after=after, hotel_id=options['hotel'])
+
+        skipped = 0
+        while True:
+            batch = []
+            for block in blocks:
+                batch.append(block)
+                if len(batch) >= options['batch_size']:
+                    break
+            if not batch:
+                break
+
+            with transaction.atomic():
+                for hotel_id, key, size in batch:
+                    if size > options['max_block_size']:
+                        skipped += 1
+                        continue
+                    guests = list(Guest.objects.filter(hotel_id=hotel_id, **{key_field: key}).order_by('id'))
+                    self.scanned += len(guests)
+                    for survivor, *duplicates in find_duplicates(guests, options['threshold']):
+                        if dry_run:
+                            self.merged += len(duplicates)
+                            self.stdout.write(
+                                f'  {key_field}={key}: #{survivor.id} {survivor.full_name} <- '
+                                + ', '.join(f'#{guest.id} {guest.full_name}' for guest in duplicates)
+                            )
+                        else:
+                            self.merged += merge_guests(survivor, duplicates)
+
+                if checkpoint:
+                    checkpoint.last_id, checkpoint.last_key = batch[-1][:2]
+                    checkpoint.save(update_fields=['last_id', 'last_key', 'updated_at'])
+
+            self.stdout.write(f'{key_field}: {self.scanned} row(s) scanned, {self.merged} merged, {self.rate()}')
+
+        # A finished pass starts from the beginning next time
+        if checkpoint:
+            checkpoint.delete()
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f'{key_field}: skipped {skipped} block(s) larger than {options["max_block_size"]} guests'
+            ))
@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-18 06:31
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.db.models.deletion
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0004_auth_user_upper_indexes'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.CreateModel(
+            name='Guest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('full_name', models.CharField(editable=False, max_length=301)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('phone_digits', models.CharField(blank=True, editable=False, max_length=20)),
+                ('id_type', models.CharField(blank=True, choices=[('passport', 'Passport'), ('national_id', 'National ID'), ('driving_license', 'Driving License'), ('other', 'Other')], max_length=20)),
+                ('id_number', models.CharField(blank=True, max_length=50)),
+                ('nationality', models.CharField(blank=True, max_length=100)),
+                ('date_of_birth', models.DateField(blank=True, null=True)),
+                ('address', models.TextField(blank=True)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='guests', to='accounts.hotel')),
+            ],
+            options={
+                'verbose_name': 'Guest',
+                'verbose_name_plural': 'Guests',
+                'ordering': ['full_name', 'id'],
+                'indexes': [models.Index(fields=['hotel', 'full_name', 'id'], name='guest_hotel_name_idx'), django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('full_name', models.TextField())), name='gin_trgm_ops'), name='guest_name_trgm_idx'), django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('id_number', models.TextField())), name='gin_trgm_ops'), name='guest_id_number_trgm_idx'), django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('phone_digits', models.TextField())), name='gin_trgm_ops'), name='guest_phone_trgm_idx')],
+            },
+        ),
+    ]
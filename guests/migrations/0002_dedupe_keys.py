@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-18 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_auth_user_upper_indexes'),
+        ('guests', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GuestDedupeCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=20, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('last_key', models.CharField(blank=True, max_length=254)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Guest Dedupe Checkpoint',
+                'verbose_name_plural': 'Guest Dedupe Checkpoints',
+            },
+        ),
+        migrations.AddField(
+            model_name='guest',
+            name='email_key',
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='guest',
+            name='phone_key',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='guest',
+            index=models.Index(fields=['hotel', 'email_key'], name='guest_email_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guest',
+            index=models.Index(fields=['hotel', 'phone_key'], name='guest_phone_key_idx'),
+        ),
+    ]
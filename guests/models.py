@@ -1,3 +1,86 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Cast, Upper
+from accounts.models import Hotel
+from .normalize import normalize_email, normalize_phone
+import re
 
-# Create your models here.
+
+def trigram_index(field, name):
+    """
+    GIN trigram index on UPPER(field::text), the exact expression Django
+    emits for `__icontains` on PostgreSQL, so type-ahead filters can use it.
+    """
+    return GinIndex(
+        OpClass(Upper(Cast(field, models.TextField())), name='gin_trgm_ops'),
+        name=name,
+    )
+
+
+class Guest(models.Model):
+    ID_TYPE_CHOICES = [
+        ('passport', 'Passport'),
+        ('national_id', 'National ID'),
+        ('driving_license', 'Driving License'),
+        ('other', 'Other'),
+    ]
+
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='guests')
+    first_name = models.CharField(max_length=150)
+    last_name = models.CharField(max_length=150, blank=True)
+    # Kept in sync by save(); searched and sorted on
+    full_name = models.CharField(max_length=301, editable=False)
+    email = models.EmailField(blank=True)
+    phone = models.CharField(max_length=20, blank=True)
+    phone_digits = models.CharField(max_length=20, blank=True, editable=False)
+    # Normalized contact details, the blocking keys for dedupe_guests
+    email_key = models.CharField(max_length=254, blank=True, editable=False)
+    phone_key = models.CharField(max_length=20, blank=True, editable=False)
+    id_type = models.CharField(max_length=20, choices=ID_TYPE_CHOICES, blank=True)
+    id_number = models.CharField(max_length=50, blank=True)
+    nationality = models.CharField(max_length=100, blank=True)
+    date_of_birth = models.DateField(blank=True, null=True)
+    address = models.TextField(blank=True)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Guest'
+        verbose_name_plural = 'Guests'
+        ordering = ['full_name', 'id']
+        indexes = [
+            # Keyset pagination order within a hotel
+            models.Index(fields=['hotel', 'full_name', 'id'], name='guest_hotel_name_idx'),
+            trigram_index('full_name', 'guest_name_trgm_idx'),
+            trigram_index('id_number', 'guest_id_number_trgm_idx'),
+            trigram_index('phone_digits', 'guest_phone_trgm_idx'),
+            models.Index(fields=['hotel', 'email_key'], name='guest_email_key_idx'),
+            models.Index(fields=['hotel', 'phone_key'], name='guest_phone_key_idx'),
+        ]
+
+    def __str__(self):
+        return self.full_name
+
+    def save(self, *args, **kwargs):
+        self.full_name = f'{self.first_name} {self.last_name}'.strip()
+        self.phone_digits = re.sub(r'\D', '', self.phone)
+        self.email_key = normalize_email(self.email)
+        self.phone_key = normalize_phone(self.phone)
+        super().save(*args, **kwargs)
+
+
+class GuestDedupeCheckpoint(models.Model):
+    """Where dedupe_guests stopped, so an interrupted run can resume"""
+    stage = models.CharField(max_length=20, unique=True)
+    # Guest id for the key backfill, hotel id for the blocking passes
+    last_id = models.BigIntegerField(default=0)
+    last_key = models.CharField(max_length=254, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Guest Dedupe Checkpoint'
+        verbose_name_plural = 'Guest Dedupe Checkpoints'
+
+    def __str__(self):
+        return f'{self.stage}: {self.last_id} {self.last_key!r}'
@@ -0,0 +1,35 @@
+"""
+Canonical forms of guest contact details, used as dedupe blocking keys.
+"""
+
+import re
+import unicodedata
+
+
+# Trailing digits kept from a phone number, dropping country/trunk prefixes
+PHONE_KEY_DIGITS = 10
+
+
+def normalize_email(email):
+    """Lowercase, trim and drop any +tag from the local part"""
+    email = (email or '').strip().lower()
+    if '@' not in email:
+        return ''
+    local, _, domain = email.rpartition('@')
+    local = local.split('+', 1)[0]
+    return f'{local}@{domain}' if local and domain else ''
+
+
+def normalize_phone(phone):
+    """Digits only, without country code, e.g. '+977 (98) 0123-4567' -> '9801234567'"""
+    digits = re.sub(r'\D', '', phone or '')
+    if len(digits) < 7:
+        return ''
+    return digits[-PHONE_KEY_DIGITS:]
+
+
+def normalize_name(name):
+    """Accent-free, lowercase, token-sorted name for fuzzy comparison"""
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch)).lower()
+    return ' '.join(sorted(re.findall(r'[a-z0-9]+', name)))
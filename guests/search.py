@@ -0,0 +1,64 @@
+"""
+Type-ahead guest search.
+
+Filters run against the trigram GIN indexes on Guest (name, ID number,
+phone digits). Pages are fetched with keyset pagination on
+(full_name, id): the cursor carries the last row of the previous page, so
+page N costs the same as page 1 instead of scanning and discarding OFFSET
+rows.
+"""
+
+import re
+
+from django.core import signing
+from django.db.models import Q
+
+from .models import Guest
+
+
+SEARCH_PAGE_SIZE = 20
+# pg_trgm cannot use the index for patterns shorter than one trigram
+MIN_QUERY_LENGTH = 3
+
+CURSOR_SALT = 'guests.search.cursor'
+
+
+class InvalidCursor(Exception):
+    """The pagination cursor was not issued by search_guests()"""
+
+
+def encode_cursor(full_name, pk):
+    return signing.dumps([full_name, pk], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor):
+    try:
+        full_name, pk = signing.loads(cursor, salt=CURSOR_SALT)
+        return str(full_name), int(pk)
+    except (signing.BadSignature, TypeError, ValueError) as e:
+        raise InvalidCursor(str(e)) from e
+
+
+def search_guests(hotel, query, cursor=None, limit=SEARCH_PAGE_SIZE):
+    """Return (guests, next_cursor) for a search term within one hotel"""
+    query = query.strip()
+    matches = Q(full_name__icontains=query) | Q(id_number__icontains=query)
+    digits = re.sub(r'\D', '', query)
+    if len(digits) >= MIN_QUERY_LENGTH:
+        matches |= Q(phone_digits__icontains=digits)
+
+    guests = Guest.objects.filter(hotel=hotel).filter(matches)
+    if cursor:
+        last_name, last_pk = decode_cursor(cursor)
+        guests = guests.filter(Q(full_name__gt=last_name) | Q(full_name=last_name, pk__gt=last_pk))
+
+    page = list(
+        guests
+        .order_by('full_name', 'id')
+        .only('id', 'full_name', 'email', 'phone', 'id_type', 'id_number', 'nationality')[:limit + 1]
+    )
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1].full_name, page[-1].pk)
+    return page, next_cursor
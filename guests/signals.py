@@ -0,0 +1,11 @@
+"""
+Signals for apps that keep their own references to guests.
+"""
+
+from django.dispatch import Signal
+
+
+# Sent by merge_guests() before references move to the survivor, with
+# `survivor` and `duplicates`. Receivers fold in rows the generic ForeignKey
+# update cannot (one-to-one fields, unique constraints, derived counters).
+guests_merging = Signal()
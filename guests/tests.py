@@ -1,3 +1,132 @@
-from django.test import TestCase
+import statistics
+import time
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, tag
+from django.urls import reverse
+
+from accounts.models import Hotel
+from .models import Guest
+from .search import SEARCH_PAGE_SIZE
+
+
+# Names are built from syllables, so most trigrams are as selective as in real data
+SYLLABLES = [
+    'a', 'bi', 'cha', 'de', 'dha', 'ga', 'hi', 'ja', 'ka', 'ki', 'la', 'ma', 'mi', 'na', 'ni',
+    'pa', 'ra', 'ri', 'sa', 'si', 'su', 'ta', 'ti', 'u', 'va', 'ya', 'yo', 'zo', 'ren', 'son',
+]
+# One guest in twenty, the worst case for a type-ahead term
+COMMON_SURNAME = 'Sharma'
+
+
+@tag('load')
+class GuestSearchLoadTests(TestCase):
+    """
+    Type-ahead search with a million guest profiles on file: 40 hotels with
+    25,000 guests each, searched by one front desk.
+    """
+
+    HOTELS = 40
+    GUESTS = 1_000_000
+    SAMPLES = 25
+    MAX_MEDIAN_MS = 20.0
+    # A term matching a cluster late in name order walks much of the hotel's list
+    MAX_WORST_MS = 150.0
+
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create(
+            User(username=f'owner{i}', email=f'owner{i}@example.com') for i in range(cls.HOTELS)
+        )
+        hotels = Hotel.objects.bulk_create(
+            Hotel(user=user, hotel_name=f'Hotel {i}', mobile_number='9812345670') for i, user in enumerate(users)
+        )
+        cls.user, cls.hotel = users[0], hotels[0]
+        with connection.cursor() as cursor:
+            # Plain rows: Guest.save() would fill the derived columns one at a time
+            cursor.execute(
+                """
+                INSERT INTO guests_guest (
+                    hotel_id, first_name, last_name, full_name, email, phone, phone_digits,
+                    email_key, phone_key, id_type, id_number, nationality, address, notes,
+                    created_at, updated_at
+                )
+                SELECT hotel_id, first_name, last_name, first_name || ' ' || last_name,
+                       '', phone, phone, '', phone, 'passport', id_number, '', '', '', now(), now()
+                FROM (
+                    -- Guest j of each hotel
+                    SELECT hotels[1 + i %% cardinality(hotels)] AS hotel_id,
+                           initcap(s[1 + j %% 30] || s[1 + j / 30 %% 30]) AS first_name,
+                           CASE WHEN j %% 20 = 0 THEN %(common)s
+                                ELSE initcap(s[1 + j / 900 %% 30] || s[1 + j * 7 %% 30] || s[1 + j * 13 %% 29])
+                           END AS last_name,
+                           -- Scattered like real numbers, not a running sequence
+                           '98' || lpad((i::bigint * 69621 %% 99999989)::text, 8, '0') AS phone,
+                           'P' || lpad((i::bigint * 48271 %% 99999989)::text, 8, '0') AS id_number
+                    FROM generate_series(1, %(count)s) AS i,
+                         LATERAL (SELECT i / %(hotel_count)s AS j) AS guest,
+                         (SELECT %(syllables)s::text[] AS s, %(hotels)s::int[] AS hotels) AS seed
+                ) AS rows
+                """,
+                {
+                    'count': cls.GUESTS, 'hotels': [hotel.pk for hotel in hotels], 'hotel_count': cls.HOTELS,
+                    'syllables': SYLLABLES, 'common': COMMON_SURNAME,
+                },
+            )
+            # What autovacuum does for a live table: merge the GIN pending lists
+            for index in ('guest_name_trgm_idx', 'guest_id_number_trgm_idx', 'guest_phone_trgm_idx'):
+                cursor.execute('SELECT gin_clean_pending_list(%s::regclass)', [index])
+            cursor.execute('ANALYZE guests_guest')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def search(self, query, cursor=None):
+        params = {'q': query}
+        if cursor:
+            params['cursor'] = cursor
+        began = time.perf_counter()
+        response = self.client.get(reverse('guest_search'), params)
+        elapsed_ms = (time.perf_counter() - began) * 1000
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertLessEqual(len(data['results']), SEARCH_PAGE_SIZE)
+        return data, elapsed_ms
+
+    def queries(self):
+        """What a front desk types: names, fragments, ID and phone numbers"""
+        guests = list(Guest.objects.filter(hotel=self.hotel).order_by('id'))
+        for guest in guests[::len(guests) // self.SAMPLES][:self.SAMPLES]:
+            phone = f'{guest.phone[:3]}-{guest.phone[3:7]}-{guest.phone[7:]}'
+            yield guest.full_name, 'full_name', guest.full_name
+            yield guest.first_name, 'full_name', guest.first_name
+            yield guest.last_name[:4], 'full_name', guest.last_name[:4]
+            yield guest.id_number, 'id_number', guest.id_number
+            yield phone, 'phone', guest.phone
+
+    def test_type_ahead_latency(self):
+        queries = list(self.queries())
+        # Warm the cache the way a day of searching would
+        for query, _, _ in queries:
+            self.search(query)
+
+        timings = []
+        for query, field, value in queries:
+            data, elapsed_ms = self.search(query)
+            timings.append((elapsed_ms, query))
+            self.assertTrue(data['results'], query)
+            self.assertTrue(all(value.upper() in result[field].upper() for result in data['results']), query)
+
+        self.assertLess(statistics.median(elapsed for elapsed, _ in timings), self.MAX_MEDIAN_MS)
+        self.assertLess(max(timings)[0], self.MAX_WORST_MS, max(timings))
+
+    def test_common_surname_pages(self):
+        data, _ = self.search(COMMON_SURNAME)
+        timings = []
+        for _ in range(50):
+            data, elapsed_ms = self.search(COMMON_SURNAME, data['next_cursor'])
+            timings.append(elapsed_ms)
+            self.assertEqual(len(data['results']), SEARCH_PAGE_SIZE)
+        # Page 50 costs the same as page 1
+        self.assertLess(statistics.median(timings), self.MAX_MEDIAN_MS)
@@ -1,3 +1,55 @@
-from django.shortcuts import render
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_http_methods
 
-# Create your views here.
+from .search import MIN_QUERY_LENGTH, SEARCH_PAGE_SIZE, InvalidCursor, search_guests
+
+
+# #############################################################
+# GUEST SEARCH VIEW
+# #############################################################
+@login_required
+@require_http_methods(["GET"])
+def guest_search_view(request):
+    """Type-ahead search over the hotel's guests by name, phone or ID number"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'No hotel profile found. Please contact support.'
+        }, status=403)
+
+    query = request.GET.get('q', '').strip()
+    if len(query) < MIN_QUERY_LENGTH:
+        return JsonResponse({
+            'success': True,
+            'results': [],
+            'next_cursor': None,
+        })
+
+    try:
+        guests, next_cursor = search_guests(
+            hotel, query, cursor=request.GET.get('cursor') or None, limit=SEARCH_PAGE_SIZE
+        )
+    except InvalidCursor:
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid page cursor.'
+        }, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'results': [
+            {
+                'id': guest.id,
+                'full_name': guest.full_name,
+                'email': guest.email,
+                'phone': guest.phone,
+                'id_type': guest.id_type,
+                'id_number': guest.id_number,
+                'nationality': guest.nationality,
+            }
+            for guest in guests
+        ],
+        'next_cursor': next_cursor,
+    })
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ReferralsConfig(AppConfig):
     name = 'referrals'
+
+    def ready(self):
+        from . import signals  # noqa: F401
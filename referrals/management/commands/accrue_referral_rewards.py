@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from referrals.models import Referral
+from referrals.rewards import ACCRUAL_CHUNK_SIZE, DEFAULT_LOOKBACK_DAYS, accrue_hotel_rewards
+
+
+class Command(BaseCommand):
+    help = 'Accrue referral rewards for completed stays and refresh the referrer leaderboards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotel', type=int, help='Only accrue for this hotel id')
+        parser.add_argument('--date', type=date.fromisoformat,
+                            help='Last check-out date to include (YYYY-MM-DD), default today')
+        parser.add_argument('--lookback-days', type=int, default=DEFAULT_LOOKBACK_DAYS,
+                            help='Also pick up stays that ended this many days earlier')
+        parser.add_argument('--chunk-size', type=int, default=ACCRUAL_CHUNK_SIZE,
+                            help='Bookings handled per batch')
+
+    def handle(self, *args, **options):
+        until = options['date'] or timezone.localdate()
+        hotels = Referral.objects.order_by().values_list('hotel_id', flat=True).distinct()
+        if options['hotel']:
+            hotels = hotels.filter(hotel_id=options['hotel'])
+
+        total = 0
+        for hotel_id in sorted(hotels):
+            scanned, created = accrue_hotel_rewards(
+                hotel_id, until, options['lookback_days'], options['chunk_size'],
+            )
+            total += created
+            self.stdout.write(f'  Hotel #{hotel_id}: {scanned} stay(s) checked, {created} reward(s) accrued')
+
+        self.stdout.write(self.style.SUCCESS(f'Referral rewards accrued through {until}: {total}'))
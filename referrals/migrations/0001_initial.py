@@ -0,0 +1,88 @@
+# Generated by Django 6.0 on 2026-10-18 06:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0004_auth_user_upper_indexes'),
+        ('bookings', '0002_booking_groups'),
+        ('guests', '0002_dedupe_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Referral',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referrals', to='accounts.hotel')),
+                ('referred', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='referral', to='guests.guest')),
+                ('referrer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referrals_made', to='guests.guest')),
+            ],
+            options={
+                'verbose_name': 'Referral',
+                'verbose_name_plural': 'Referrals',
+                'ordering': ['-created_at'],
+                'constraints': [models.CheckConstraint(condition=models.Q(('referrer', models.F('referred')), _negated=True), name='referral_not_self')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReferralPath',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_descendants', to='guests.guest')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_ancestors', to='guests.guest')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_paths', to='accounts.hotel')),
+            ],
+            options={
+                'verbose_name': 'Referral Path',
+                'verbose_name_plural': 'Referral Paths',
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='referral_path_desc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_referral_path')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReferralReward',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.PositiveSmallIntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('accrued_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_rewards', to='bookings.booking')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_rewards', to='accounts.hotel')),
+                ('referrer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referral_rewards', to='guests.guest')),
+            ],
+            options={
+                'verbose_name': 'Referral Reward',
+                'verbose_name_plural': 'Referral Rewards',
+                'ordering': ['-accrued_at'],
+                'indexes': [models.Index(fields=['hotel', 'accrued_at'], name='referral_reward_hotel_idx')],
+                'constraints': [models.UniqueConstraint(fields=('referrer', 'booking'), name='unique_referral_reward')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReferrerStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('direct_referrals', models.PositiveIntegerField(default=0)),
+                ('network_size', models.PositiveIntegerField(default=0)),
+                ('rewarded_bookings', models.PositiveIntegerField(default=0)),
+                ('total_rewards', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='referrer_stats', to='accounts.hotel')),
+                ('referrer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='referrer_stats', to='guests.guest')),
+            ],
+            options={
+                'verbose_name': 'Referrer Stats',
+                'verbose_name_plural': 'Referrer Stats',
+                'indexes': [models.Index(fields=['hotel', '-total_rewards'], name='referrer_stats_rewards_idx'), models.Index(fields=['hotel', '-direct_referrals'], name='referrer_stats_referrals_idx'), models.Index(fields=['hotel', '-network_size'], name='referrer_stats_network_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,102 @@
 from django.db import models
+from accounts.models import Hotel
+from bookings.models import Booking
+from guests.models import Guest
 
-# Create your models here.
+
+class Referral(models.Model):
+    """A guest introduced to the hotel by another guest"""
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='referrals')
+    referrer = models.ForeignKey(Guest, on_delete=models.CASCADE, related_name='referrals_made')
+    # A guest has at most one referrer
+    referred = models.OneToOneField(Guest, on_delete=models.CASCADE, related_name='referral')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Referral'
+        verbose_name_plural = 'Referrals'
+        ordering = ['-created_at']
+        constraints = [
+            models.CheckConstraint(
+                condition=~models.Q(referrer=models.F('referred')), name='referral_not_self',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.referrer} referred {self.referred}'
+
+
+class ReferralPath(models.Model):
+    """
+    Closure table over Referral: one row per (ancestor, descendant) pair at
+    every depth, so a guest's whole referral chain or network is one
+    indexed query.
+    """
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='referral_paths')
+    ancestor = models.ForeignKey(Guest, on_delete=models.CASCADE, related_name='referral_descendants')
+    descendant = models.ForeignKey(Guest, on_delete=models.CASCADE, related_name='referral_ancestors')
+    # 1 = direct referrer, 2 = the referrer's referrer, ...
+    depth = models.PositiveSmallIntegerField()
+    # When the chain was completed; bookings made earlier are not attributed
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Referral Path'
+        verbose_name_plural = 'Referral Paths'
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='unique_referral_path'),
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'depth'], name='referral_path_desc_idx'),
+        ]
+
+
+class ReferralReward(models.Model):
+    """A referrer's share of a referred guest's completed stay"""
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='referral_rewards')
+    referrer = models.ForeignKey(Guest, on_delete=models.CASCADE, related_name='referral_rewards')
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='referral_rewards')
+    level = models.PositiveSmallIntegerField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    accrued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Referral Reward'
+        verbose_name_plural = 'Referral Rewards'
+        ordering = ['-accrued_at']
+        constraints = [
+            models.UniqueConstraint(fields=['referrer', 'booking'], name='unique_referral_reward'),
+        ]
+        indexes = [
+            models.Index(fields=['hotel', 'accrued_at'], name='referral_reward_hotel_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.referrer} - {self.amount} (booking #{self.booking_id})'
+
+
+class ReferrerStats(models.Model):
+    """
+    Leaderboard row per referrer. Referral counts move when links are
+    added; reward totals are refreshed by accrue_referral_rewards.
+    """
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='referrer_stats')
+    referrer = models.OneToOneField(Guest, on_delete=models.CASCADE, related_name='referrer_stats')
+    direct_referrals = models.PositiveIntegerField(default=0)
+    # Everyone below the referrer at any depth
+    network_size = models.PositiveIntegerField(default=0)
+    rewarded_bookings = models.PositiveIntegerField(default=0)
+    total_rewards = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Referrer Stats'
+        verbose_name_plural = 'Referrer Stats'
+        indexes = [
+            models.Index(fields=['hotel', '-total_rewards'], name='referrer_stats_rewards_idx'),
+            models.Index(fields=['hotel', '-direct_referrals'], name='referrer_stats_referrals_idx'),
+            models.Index(fields=['hotel', '-network_size'], name='referrer_stats_network_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.referrer}: {self.direct_referrals} referral(s), {self.total_rewards}'
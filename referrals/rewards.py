@@ -0,0 +1,144 @@
+"""
+Batched referral reward accrual.
+
+Completed (checked-out) stays are matched to guest profiles by normalized
+email. Each referrer up the guest's chain then earns a share of the room
+revenue, at REFERRAL_REWARD_RATES[level - 1]. A chain only counts if it
+existed when the booking was made.
+
+Work is done per hotel in chunks of bookings. Each chunk costs three
+reads: bookings, guests by email key, and closure-table paths for all of
+them. It inserts its rewards with one bulk_create and refreshes the
+affected referrers' leaderboard totals with one UPDATE. Rewards are unique
+per (referrer, booking) and totals are recomputed rather than
+incremented, so re-running a window is safe.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from bookings.models import Booking
+from guests.models import Guest
+from guests.normalize import normalize_email
+from .models import ReferralPath, ReferralReward, ReferrerStats
+
+
+ACCRUAL_CHUNK_SIZE = 1000
+DEFAULT_LOOKBACK_DAYS = 30
+CENTS = Decimal('0.01')
+
+
+def get_reward_rates():
+    """Reward share per level, nearest referrer first"""
+    rates = getattr(settings, 'REFERRAL_REWARD_RATES', '')
+    return [Decimal(rate.strip()) for rate in rates.split(',') if rate.strip()]
+
+
+def completed_stays(hotel_id, since, until):
+    """Checked-out bookings ending in [since, until] that have no rewards yet"""
+    return (
+        Booking.objects
+        .filter(
+            hotel_id=hotel_id,
+            status=Booking.STATUS_CHECKED_OUT,
+            stay__endswith__gte=since,
+            stay__endswith__lte=until,
+        )
+        .exclude(guest_email='')
+        .exclude(Exists(ReferralReward.objects.filter(booking=OuterRef('pk'))))
+        .select_related('room__room_type')
+        .order_by('id')
+    )
+
+
+def _guests_by_email(hotel_id, bookings):
+    """{email key: guest id}, the oldest profile when duplicates remain"""
+    keys = {normalize_email(booking.guest_email) for booking in bookings} - {''}
+    guests = {}
+    rows = (
+        Guest.objects
+        .filter(hotel_id=hotel_id, email_key__in=keys)
+        .order_by('-id')
+        .values_list('email_key', 'id')
+    )
+    for key, guest_id in rows:
+        guests[key] = guest_id
+    return guests
+
+
+def accrue_chunk(hotel_id, bookings, rates):
+    """Accrue rewards for one chunk; returns the number of rewards created"""
+    guests = _guests_by_email(hotel_id, bookings)
+    if not guests:
+        return 0
+
+    chains = {}
+    paths = (
+        ReferralPath.objects
+        .filter(descendant_id__in=guests.values(), depth__lte=len(rates))
+        .values_list('descendant_id', 'ancestor_id', 'depth', 'created_at')
+    )
+    for descendant, ancestor, depth, linked_at in paths:
+        chains.setdefault(descendant, []).append((ancestor, depth, linked_at))
+    if not chains:
+        return 0
+
+    rewards = []
+    for booking in bookings:
+        chain = chains.get(guests.get(normalize_email(booking.guest_email)))
+        if not chain:
+            continue
+        rate = booking.nightly_rate or booking.room.room_type.base_rate
+        revenue = rate * (booking.check_out - booking.check_in).days
+        for referrer, depth, linked_at in chain:
+            amount = (revenue * rates[depth - 1]).quantize(CENTS)
+            if linked_at <= booking.created_at and amount > 0:
+                rewards.append(ReferralReward(
+                    hotel_id=hotel_id, referrer_id=referrer, booking=booking, level=depth, amount=amount,
+                ))
+    if not rewards:
+        return 0
+
+    with transaction.atomic():
+        ReferralReward.objects.bulk_create(rewards, batch_size=1000, ignore_conflicts=True)
+
+        # Recompute rather than add, so a re-run never double counts
+        refresh_reward_totals({reward.referrer_id for reward in rewards})
+    return len(rewards)
+
+
+def refresh_reward_totals(referrer_ids):
+    """Recount rewarded bookings and total rewards for `referrer_ids`"""
+    earned = ReferralReward.objects.filter(referrer=OuterRef('referrer')).order_by().values('referrer')
+    return ReferrerStats.objects.filter(referrer_id__in=referrer_ids).update(
+        rewarded_bookings=Coalesce(Subquery(earned.annotate(total=Count('id')).values('total')), Value(0)),
+        total_rewards=Coalesce(Subquery(earned.annotate(total=Sum('amount')).values('total')), Value(0)),
+        updated_at=timezone.now(),
+    )
+
+
+def accrue_hotel_rewards(hotel_id, until=None, lookback_days=DEFAULT_LOOKBACK_DAYS,
+                         chunk_size=ACCRUAL_CHUNK_SIZE):
+    """Accrue rewards for stays that ended in the lookback window; returns (bookings, rewards)"""
+    rates = get_reward_rates()
+    if not rates:
+        return 0, 0
+
+    until = until or timezone.localdate()
+    bookings = completed_stays(hotel_id, until - timedelta(days=lookback_days), until)
+    scanned = created = 0
+    last_id = 0
+    while True:
+        chunk = list(bookings.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+        scanned += len(chunk)
+        created += accrue_chunk(hotel_id, chunk, rates)
+    return scanned, created
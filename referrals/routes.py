@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.add_referral_view, name='add_referral'),
+    path('leaderboard/', views.leaderboard_view, name='referral_leaderboard'),
+    path('guests/<int:guest_id>/chain/', views.referral_chain_view, name='referral_chain'),
+]
@@ -0,0 +1,244 @@
+"""
+Referral graph.
+
+Links are stored twice: as Referral rows (who referred whom) and in the
+ReferralPath closure table, which holds every (ancestor, descendant) pair
+with its depth. Adding a link inserts the cross product of the referrer's
+ancestors and the new guest's descendants in one bulk_create. After that,
+"who referred the booker, and who referred them" is one indexed query on
+descendant, and a referrer's network is one query on ancestor. Nothing
+walks the tree one level at a time.
+
+Writes to a hotel's graph are serialised by locking its Hotel row, so two
+concurrent links cannot close a cycle. Links are only ever added one at a
+time, so the counters are moved by F() deltas; removing or merging guests
+cuts the paths that ran through them and recounts the counters from the
+graph.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from accounts.models import Hotel
+from guests.models import Guest
+from .models import Referral, ReferralPath, ReferralReward, ReferrerStats
+from .rewards import refresh_reward_totals
+
+
+# Each order is backed by an index on (hotel, field)
+LEADERBOARD_ORDERS = {
+    'rewards': '-total_rewards',
+    'referrals': '-direct_referrals',
+    'network': '-network_size',
+}
+
+
+class InvalidReferral(Exception):
+    """The link would be a self-referral, a cycle, cross-hotel or a second referrer"""
+
+
+def add_referral(referrer, referred):
+    """Record that `referrer` introduced `referred` and extend the closure table"""
+    if referrer.hotel_id != referred.hotel_id:
+        raise InvalidReferral('Both guests must belong to the same hotel.')
+    if referrer.pk == referred.pk:
+        raise InvalidReferral('A guest cannot refer themselves.')
+
+    hotel_id = referrer.hotel_id
+    with transaction.atomic():
+        Hotel.objects.select_for_update().get(pk=hotel_id)
+
+        if Referral.objects.filter(referred=referred).exists():
+            raise InvalidReferral(f'{referred} already has a referrer.')
+        if ReferralPath.objects.filter(ancestor=referred, descendant=referrer).exists():
+            raise InvalidReferral(f'{referred} is already above {referrer} in the referral chain.')
+
+        referral = Referral.objects.create(hotel_id=hotel_id, referrer=referrer, referred=referred)
+
+        # (guest id, distance) above the referrer and below the new guest, themselves included
+        ancestors = [(referrer.pk, 0)] + list(
+            ReferralPath.objects.filter(descendant=referrer).values_list('ancestor_id', 'depth')
+        )
+        descendants = [(referred.pk, 0)] + list(
+            ReferralPath.objects.filter(ancestor=referred).values_list('descendant_id', 'depth')
+        )
+        ReferralPath.objects.bulk_create([
+            ReferralPath(hotel_id=hotel_id, ancestor_id=ancestor, descendant_id=descendant, depth=up + down + 1)
+            for ancestor, up in ancestors
+            for descendant, down in descendants
+        ], batch_size=1000)
+
+        ancestor_ids = [ancestor for ancestor, _ in ancestors]
+        ReferrerStats.objects.bulk_create(
+            [ReferrerStats(hotel_id=hotel_id, referrer_id=ancestor) for ancestor in ancestor_ids],
+            ignore_conflicts=True,
+        )
+        ReferrerStats.objects.filter(referrer_id=referrer.pk).update(direct_referrals=F('direct_referrals') + 1)
+        ReferrerStats.objects.filter(referrer_id__in=ancestor_ids).update(
+            network_size=F('network_size') + len(descendants)
+        )
+    return referral
+
+
+def refresh_referrer_stats(referrer_ids):
+    """Recount direct referrals and network size for `referrer_ids` from the graph"""
+    referrals = Referral.objects.filter(referrer=OuterRef('referrer')).order_by().values('referrer')
+    network = ReferralPath.objects.filter(ancestor=OuterRef('referrer')).order_by().values('ancestor')
+    return ReferrerStats.objects.filter(referrer_id__in=referrer_ids).update(
+        direct_referrals=Coalesce(Subquery(referrals.annotate(total=Count('id')).values('total')), Value(0)),
+        network_size=Coalesce(Subquery(network.annotate(total=Count('id')).values('total')), Value(0)),
+        updated_at=timezone.now(),
+    )
+
+
+def _cut(guest_id):
+    """Delete a guest's links and every path through them; returns their ancestors"""
+    ancestor_ids = list(ReferralPath.objects.filter(descendant_id=guest_id).values_list('ancestor_id', flat=True))
+    descendant_ids = list(ReferralPath.objects.filter(ancestor_id=guest_id).values_list('descendant_id', flat=True))
+    # Each guest has one referrer, so these paths all pass through the guest
+    if ancestor_ids and descendant_ids:
+        ReferralPath.objects.filter(ancestor_id__in=ancestor_ids, descendant_id__in=descendant_ids).delete()
+    ReferralPath.objects.filter(Q(ancestor_id=guest_id) | Q(descendant_id=guest_id)).delete()
+    Referral.objects.filter(Q(referrer_id=guest_id) | Q(referred_id=guest_id)).delete()
+    return ancestor_ids
+
+
+def remove_from_graph(guest):
+    """
+    Take a guest out of the referral graph, e.g. before it is deleted.
+
+    Their referrer loses them, the guests they referred are left without a
+    referrer, and every path that ran through them is cut. The ancestors'
+    counters are recounted. Returns the ids of those ancestors.
+    """
+    if not ReferralPath.objects.filter(Q(ancestor=guest) | Q(descendant=guest)).exists():
+        return []
+
+    with transaction.atomic():
+        Hotel.objects.select_for_update().get(pk=guest.hotel_id)
+        ancestor_ids = _cut(guest.pk)
+        refresh_referrer_stats(ancestor_ids)
+    return ancestor_ids
+
+
+def merge_into_graph(survivor, duplicates):
+    """
+    Fold the duplicates' place in the referral graph into `survivor`.
+
+    Called before duplicate guest profiles are merged and deleted. The merged
+    guest keeps the survivor's referrer (else the first duplicate's referrer
+    that does not close a cycle) and takes over everyone the duplicates
+    referred. Paths are rebuilt; chains that already existed keep their
+    original link time, so rewards still only count stays booked after the
+    chain existed. The duplicates' rewards move to the survivor unless it
+    already has one for that booking, and every counter the merge touches
+    is recounted. Afterwards no referral row points at a duplicate.
+    """
+    nodes = [survivor.pk] + [guest.pk for guest in duplicates]
+    duplicate_ids = nodes[1:]
+    merged = {guest_id: survivor.pk for guest_id in nodes}
+
+    def key(ancestor, descendant):
+        return merged.get(ancestor, ancestor), merged.get(descendant, descendant)
+
+    with transaction.atomic():
+        Hotel.objects.select_for_update().get(pk=survivor.hotel_id)
+
+        links = list(
+            Referral.objects
+            .filter(Q(referrer_id__in=nodes) | Q(referred_id__in=nodes))
+            .values_list('referrer_id', 'referred_id', 'created_at')
+        )
+        has_rewards = ReferralReward.objects.filter(referrer_id__in=duplicate_ids).exists()
+        if not links and not has_rewards:
+            ReferrerStats.objects.filter(referrer_id__in=duplicate_ids).delete()
+            return
+
+        parents = {referred: referrer for referrer, referred, _ in links if referred in merged and referrer not in merged}
+        candidates = [parents[guest_id] for guest_id in nodes if guest_id in parents]
+        children = [referred for referrer, referred, _ in links if referrer in merged and referred not in merged]
+
+        # When each surviving chain first existed, keyed by its merged ends
+        above = set(ReferralPath.objects.filter(descendant_id__in=nodes).values_list('ancestor_id', flat=True))
+        below = set(ReferralPath.objects.filter(ancestor_id__in=nodes).values_list('descendant_id', flat=True))
+        linked_at = {}
+        for referrer, referred, created_at in links:
+            link = ('link', *key(referrer, referred))
+            linked_at[link] = min(created_at, linked_at.get(link, created_at))
+        old_paths = ReferralPath.objects.filter(
+            ancestor_id__in=above | set(nodes), descendant_id__in=below | set(nodes),
+        ).values_list('ancestor_id', 'descendant_id', 'created_at')
+        for ancestor, descendant, created_at in old_paths:
+            path = ('path', *key(ancestor, descendant))
+            linked_at[path] = min(created_at, linked_at.get(path, created_at))
+
+        for guest_id in nodes:
+            _cut(guest_id)
+
+        guests = Guest.objects.in_bulk(children + candidates)
+        for child in children:
+            add_referral(survivor, guests[child])
+        for candidate in candidates:
+            try:
+                add_referral(guests[candidate], survivor)
+                break
+            except InvalidReferral:
+                # The duplicate's referrer is now below the merged guest
+                continue
+
+        new_links = list(Referral.objects.filter(Q(referrer=survivor) | Q(referred=survivor)))
+        for link in new_links:
+            link.created_at = linked_at.get(('link', link.referrer_id, link.referred_id), link.created_at)
+        Referral.objects.bulk_update(new_links, ['created_at'])
+
+        new_above = set(ReferralPath.objects.filter(descendant=survivor).values_list('ancestor_id', flat=True))
+        new_below = set(ReferralPath.objects.filter(ancestor=survivor).values_list('descendant_id', flat=True))
+        new_paths = [
+            path for path in ReferralPath.objects.filter(
+                ancestor_id__in=new_above | {survivor.pk}, descendant_id__in=new_below | {survivor.pk},
+            )
+            if ('path', path.ancestor_id, path.descendant_id) in linked_at
+        ]
+        for path in new_paths:
+            path.created_at = linked_at['path', path.ancestor_id, path.descendant_id]
+        ReferralPath.objects.bulk_update(new_paths, ['created_at'], batch_size=1000)
+
+        # One reward per (referrer, booking): the survivor's, else the first duplicate's
+        rewarded = set(ReferralReward.objects.filter(referrer=survivor).values_list('booking_id', flat=True))
+        clashes = []
+        for reward_id, booking_id in (
+            ReferralReward.objects.filter(referrer_id__in=duplicate_ids).order_by('id').values_list('id', 'booking_id')
+        ):
+            if booking_id in rewarded:
+                clashes.append(reward_id)
+            rewarded.add(booking_id)
+        ReferralReward.objects.filter(id__in=clashes).delete()
+        ReferralReward.objects.filter(referrer_id__in=duplicate_ids).update(referrer=survivor)
+
+        ReferrerStats.objects.filter(referrer_id__in=duplicate_ids).delete()
+        if rewarded:
+            ReferrerStats.objects.bulk_create(
+                [ReferrerStats(hotel_id=survivor.hotel_id, referrer=survivor)], ignore_conflicts=True,
+            )
+        refresh_referrer_stats(above | new_above | {survivor.pk})
+        refresh_reward_totals([survivor.pk])
+
+
+def referral_chain(guest, max_depth=None):
+    """The guest's referrers nearest first, as (guest id, depth) pairs"""
+    paths = ReferralPath.objects.filter(descendant=guest)
+    if max_depth is not None:
+        paths = paths.filter(depth__lte=max_depth)
+    return list(paths.order_by('depth').values_list('ancestor_id', 'depth'))
+
+
+def leaderboard(hotel, order='rewards', limit=20):
+    """Top referrers read straight from ReferrerStats"""
+    return (
+        ReferrerStats.objects
+        .filter(hotel=hotel)
+        .select_related('referrer')
+        .order_by(LEADERBOARD_ORDERS[order])[:limit]
+    )
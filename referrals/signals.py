@@ -0,0 +1,22 @@
+"""
+Keep the referral graph and its counters in step when guests are deleted
+or merged.
+"""
+
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from guests.models import Guest
+from guests.signals import guests_merging
+from .services import merge_into_graph, remove_from_graph
+
+
+@receiver(pre_delete, sender=Guest)
+def guest_deleted(sender, instance, **kwargs):
+    # Before the cascade, while the guest's paths still show who is above them
+    remove_from_graph(instance)
+
+
+@receiver(guests_merging, sender=Guest)
+def guests_merged(sender, survivor, duplicates, **kwargs):
+    merge_into_graph(survivor, duplicates)
@@ -1,3 +1,157 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import Hotel
+from bookings.services import create_booking
+from guests.dedupe import merge_guests
+from guests.models import Guest
+from rooms.models import Room, RoomType
+from .models import Referral, ReferralPath, ReferralReward, ReferrerStats
+from .services import add_referral, referral_chain, refresh_referrer_stats
+
+
+class ReferralGraphTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+        self.hotel = Hotel.objects.create(user=user, hotel_name='Lakeside Inn', mobile_number='9812345670')
+
+    def guest(self, name):
+        return Guest.objects.create(hotel=self.hotel, first_name=name, email=f'{name.lower()}@example.com')
+
+    def stats(self, guest):
+        row = ReferrerStats.objects.filter(referrer=guest).first()
+        return (row.direct_referrals, row.network_size) if row else None
+
+    def build_tree(self):
+        """ann -> bob -> cat -> dan, and ann -> eve"""
+        ann, bob, cat, dan, eve = (self.guest(name) for name in ['Ann', 'Bob', 'Cat', 'Dan', 'Eve'])
+        add_referral(ann, bob)
+        add_referral(bob, cat)
+        add_referral(cat, dan)
+        add_referral(ann, eve)
+        return ann, bob, cat, dan, eve
+
+    def test_counters_follow_new_links(self):
+        ann, bob, cat, dan, eve = self.build_tree()
+
+        self.assertEqual(self.stats(ann), (2, 4))
+        self.assertEqual(self.stats(bob), (1, 2))
+        self.assertEqual(self.stats(cat), (1, 1))
+        self.assertEqual(referral_chain(dan), [(cat.pk, 1), (bob.pk, 2), (ann.pk, 3)])
+
+    def test_deleting_a_guest_cuts_the_chain_and_recounts(self):
+        ann, bob, cat, dan, eve = self.build_tree()
+
+        cat.delete()
+
+        self.assertEqual(self.stats(ann), (2, 2))
+        self.assertEqual(self.stats(bob), (0, 0))
+        self.assertEqual(referral_chain(dan), [])
+        self.assertFalse(Referral.objects.filter(referred=dan).exists())
+        self.assertFalse(ReferralPath.objects.filter(descendant=dan).exists())
+
+    def test_deleting_a_leaf_and_a_root(self):
+        ann, bob, cat, dan, eve = self.build_tree()
+
+        Guest.objects.filter(pk__in=[eve.pk, ann.pk]).delete()
+
+        self.assertIsNone(self.stats(ann))
+        self.assertEqual(self.stats(bob), (1, 2))
+        self.assertEqual(referral_chain(dan), [(cat.pk, 1), (bob.pk, 2)])
+        # Bob can be referred again now that Ann is gone
+        add_referral(self.guest('Fay'), bob)
+        self.assertEqual(referral_chain(dan)[-1][1], 3)
+
+    def test_refresh_repairs_drifted_counters(self):
+        ann, bob, cat, dan, eve = self.build_tree()
+        ReferrerStats.objects.update(direct_referrals=99, network_size=99)
+
+        refresh_referrer_stats([ann.pk, bob.pk, cat.pk])
+
+        self.assertEqual([self.stats(g) for g in (ann, bob, cat)], [(2, 4), (1, 2), (1, 1)])
+
+    def test_deleting_the_hotel(self):
+        self.build_tree()
+
+        self.hotel.delete()
+
+        self.assertFalse(ReferralPath.objects.exists())
+        self.assertFalse(ReferrerStats.objects.exists())
+
+
+class MergeGuestsTests(ReferralGraphTests):
+    def rewards(self, guest):
+        row = ReferrerStats.objects.get(referrer=guest)
+        return row.rewarded_bookings, row.total_rewards
+
+    def test_duplicate_place_in_graph_moves_to_survivor(self):
+        ann, bob, cat, dan, eve = self.build_tree()
+        survivor = self.guest('Robert')
+        linked_at = ReferralPath.objects.get(ancestor=ann, descendant=dan).created_at
+
+        merge_guests(survivor, [bob])
+
+        self.assertEqual(referral_chain(dan), [(cat.pk, 1), (survivor.pk, 2), (ann.pk, 3)])
+        self.assertEqual(self.stats(survivor), (1, 2))
+        self.assertEqual(self.stats(ann), (2, 4))
+        self.assertIsNone(self.stats(bob))
+        # The chain existed before the merge, so earlier bookings still count
+        self.assertEqual(ReferralPath.objects.get(ancestor=ann, descendant=dan).created_at, linked_at)
+
+    def test_survivor_keeps_its_own_referrer(self):
+        ann, bob, cat, dan, eve = self.build_tree()
+        survivor = self.guest('Robert')
+        add_referral(eve, survivor)
+
+        merge_guests(survivor, [bob])
+
+        self.assertEqual(referral_chain(survivor), [(eve.pk, 1), (ann.pk, 2)])
+        self.assertEqual(referral_chain(dan), [(cat.pk, 1), (survivor.pk, 2), (eve.pk, 3), (ann.pk, 4)])
+        self.assertEqual(self.stats(ann), (1, 4))
+        self.assertEqual(self.stats(eve), (1, 3))
+
+    def test_duplicate_that_referred_the_survivor(self):
+        ann, bob, cat, dan, eve = self.build_tree()
+
+        # Bob referred Cat; they turn out to be the same guest
+        merge_guests(cat, [bob])
+
+        self.assertEqual(referral_chain(dan), [(cat.pk, 1), (ann.pk, 2)])
+        self.assertEqual(self.stats(cat), (1, 1))
+        self.assertEqual(self.stats(ann), (2, 3))
+
+    def test_referrer_below_the_merged_guest_is_dropped(self):
+        ann, bob, cat, dan, eve = self.build_tree()
+
+        # Dan's referrer Cat is Ann's descendant: linking Ann under Cat would be a cycle
+        merge_guests(ann, [dan])
+
+        self.assertEqual(referral_chain(ann), [])
+        self.assertEqual(referral_chain(cat), [(bob.pk, 1), (ann.pk, 2)])
+        self.assertEqual(self.stats(ann), (2, 3))
+        self.assertEqual(self.stats(cat), (0, 0))
+
+    def test_rewards_move_without_double_counting(self):
+        ann, bob, cat, dan, eve = self.build_tree()
+        room_type = RoomType.objects.create(hotel=self.hotel, name='Deluxe')
+        room = Room.objects.create(hotel=self.hotel, room_type=room_type, number='101')
+        stays = [
+            create_booking(room, date(2030, 1, 1) + timedelta(days=i * 3), date(2030, 1, 3) + timedelta(days=i * 3),
+                           guest_name='Dan')
+            for i in range(2)
+        ]
+        ReferralReward.objects.bulk_create([
+            ReferralReward(hotel=self.hotel, referrer=bob, booking=stays[0], level=2, amount=Decimal('10')),
+            ReferralReward(hotel=self.hotel, referrer=bob, booking=stays[1], level=2, amount=Decimal('12')),
+            ReferralReward(hotel=self.hotel, referrer=ann, booking=stays[0], level=3, amount=Decimal('4')),
+        ])
+
+        merge_guests(ann, [bob])
+
+        self.assertEqual(ReferralReward.objects.filter(referrer=ann).count(), 2)
+        self.assertEqual(self.rewards(ann), (2, Decimal('16')))
+        # Cat and Eve directly, Dan through Cat
+        self.assertEqual(self.stats(ann), (2, 3))
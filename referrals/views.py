@@ -1,3 +1,130 @@
-from django.shortcuts import render
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.http import require_http_methods
+import json
 
-# Create your views here.
+from guests.models import Guest
+from .services import LEADERBOARD_ORDERS, InvalidReferral, add_referral, leaderboard, referral_chain
+
+
+MAX_LEADERBOARD_SIZE = 100
+
+
+def _no_hotel():
+    return JsonResponse({
+        'success': False,
+        'message': 'No hotel profile found. Please contact support.'
+    }, status=403)
+
+
+def _guest_not_found():
+    return JsonResponse({
+        'success': False,
+        'message': 'Guest not found.'
+    }, status=404)
+
+
+# #############################################################
+# ADD REFERRAL VIEW
+# #############################################################
+@login_required
+@csrf_protect
+@require_http_methods(["POST"])
+def add_referral_view(request):
+    """Record that one guest referred another"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return _no_hotel()
+
+    try:
+        data = json.loads(request.body)
+        referrer_id = int(data.get('referrer_id'))
+        referred_id = int(data.get('guest_id'))
+    except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid request format.'
+        }, status=400)
+
+    guests = Guest.objects.in_bulk([referrer_id, referred_id])
+    referrer, referred = guests.get(referrer_id), guests.get(referred_id)
+    if referrer is None or referred is None or {referrer.hotel_id, referred.hotel_id} != {hotel.pk}:
+        return _guest_not_found()
+
+    try:
+        referral = add_referral(referrer, referred)
+    except InvalidReferral as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'message': f'{referred} is now referred by {referrer}.',
+        'referral_id': referral.id,
+    }, status=201)
+
+
+# #############################################################
+# REFERRAL CHAIN VIEW
+# #############################################################
+@login_required
+@require_http_methods(["GET"])
+def referral_chain_view(request, guest_id):
+    """Who referred the guest, who referred them, and so on"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return _no_hotel()
+
+    guest = Guest.objects.filter(hotel=hotel, pk=guest_id).first()
+    if guest is None:
+        return _guest_not_found()
+
+    chain = referral_chain(guest)
+    names = dict(Guest.objects.filter(pk__in=[ancestor for ancestor, _ in chain]).values_list('id', 'full_name'))
+    return JsonResponse({
+        'success': True,
+        'guest': {'id': guest.id, 'name': guest.full_name},
+        'chain': [{'id': ancestor, 'name': names.get(ancestor, ''), 'level': depth} for ancestor, depth in chain],
+    })
+
+
+# #############################################################
+# LEADERBOARD VIEW
+# #############################################################
+@login_required
+@require_http_methods(["GET"])
+def leaderboard_view(request):
+    """Top referrers by rewards, direct referrals or network size"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return _no_hotel()
+
+    order = request.GET.get('order', 'rewards')
+    if order not in LEADERBOARD_ORDERS:
+        return JsonResponse({
+            'success': False,
+            'message': 'Order must be rewards, referrals or network.'
+        }, status=400)
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), MAX_LEADERBOARD_SIZE)
+    except ValueError:
+        limit = 20
+
+    return JsonResponse({
+        'success': True,
+        'order': order,
+        'referrers': [
+            {
+                'id': stats.referrer_id,
+                'name': stats.referrer.full_name,
+                'direct_referrals': stats.direct_referrals,
+                'network_size': stats.network_size,
+                'rewarded_bookings': stats.rewarded_bookings,
+                'total_rewards': str(stats.total_rewards),
+            }
+            for stats in leaderboard(hotel, order, limit)
+        ],
+    })
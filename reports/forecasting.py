@@ -0,0 +1,235 @@
+"""
+Pace, pickup and occupancy forecasts per room type.
+
+Booking history is read with one columnar query (room type, booked-on date,
+check-in, check-out) and expanded into room-night arrays with NumPy; every
+curve below is a bincount or a matrix product over those arrays rather than
+a Python loop over bookings. Results are cached per hotel and business date.
+
+- On the books: room-nights already booked for each of the next
+  FORECAST_DAYS nights.
+- Same time last year: what was on the books 364 days ago (same weekday)
+  for the matching nights, for pace comparisons.
+- Pickup: room-nights booked in the last PICKUP_DAYS days.
+- Pace curve: the share of a night's final room-nights typically on the
+  books L days before arrival, learnt from past nights.
+- Forecast: the mean of a pickup projection (on the books / pace share) and
+  a simple exponential smoothing level per weekday, never below what is
+  already booked nor above the room count.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from bookings.models import Booking
+from rooms.models import RoomType
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+FORECAST_DAYS = 90
+HISTORY_DAYS = 5 * 365
+MAX_LEAD = 90
+PICKUP_DAYS = 7
+SMOOTHING_ALPHA = 0.3
+# Keeps weekdays aligned for year-over-year pace
+LAST_YEAR_OFFSET = 364
+
+
+class ForecastUnavailable(Exception):
+    """numpy is not installed"""
+
+
+def load_booking_facts(hotel, start, end):
+    """
+    Live bookings touching [start, end) as parallel arrays: room type id,
+    booked-on, check-in and check-out (datetime64[D]).
+    """
+    rows = list(
+        Booking.objects
+        .filter(hotel=hotel, stay__overlap=DateRange(start, end))
+        .exclude(status=Booking.STATUS_CANCELLED)
+        .order_by()
+        .values_list('room__room_type_id', TruncDate('created_at'), 'stay__startswith', 'stay__endswith')
+    )
+    if not rows:
+        empty = np.array([], dtype='datetime64[D]')
+        return np.array([], dtype=np.int64), empty, empty, empty
+
+    room_types, booked_on, check_in, check_out = zip(*rows)
+    return (
+        np.array(room_types, dtype=np.int64),
+        np.array(booked_on, dtype='datetime64[D]'),
+        np.array(check_in, dtype='datetime64[D]'),
+        np.array(check_out, dtype='datetime64[D]'),
+    )
+
+
+def expand_nights(type_index, booked_on, check_in, check_out):
+    """One entry per room-night: (type index, night, booked-on)"""
+    nights = (check_out - check_in).astype(np.int64)
+    total = int(nights.sum())
+    starts = np.repeat(np.cumsum(nights) - nights, nights)
+    offsets = np.arange(total) - starts
+    return (
+        np.repeat(type_index, nights),
+        np.repeat(check_in, nights) + offsets,
+        np.repeat(booked_on, nights),
+    )
+
+
+def _grid(type_index, day, types, days):
+    """Count room-nights into a (types, days) matrix; `day` is 0-based"""
+    keep = (day >= 0) & (day < days)
+    flat = type_index[keep] * days + day[keep]
+    return np.bincount(flat, minlength=types * days).reshape(types, days)
+
+
+def smoothed_weekday_levels(history, alpha=SMOOTHING_ALPHA):
+    """
+    Simple exponential smoothing of each weekday's series, for every room
+    type at once. `history` is (types, days) ending yesterday; returns
+    (types, 7) levels, column j being the weekday of history's day j (mod 7).
+    """
+    types, days = history.shape
+    weeks = days // 7
+    if not weeks:
+        return np.zeros((types, 7))
+    # Column alignment: keep whole weeks ending on the last day
+    series = history[:, days - weeks * 7:].reshape(types, weeks, 7)
+    # Closed form of l_t = a*x_t + (1-a)*l_(t-1) with l_0 = x_0
+    weights = alpha * (1 - alpha) ** np.arange(weeks - 1, -1, -1)
+    weights[0] = (1 - alpha) ** (weeks - 1)
+    levels = np.tensordot(series, weights, axes=([1], [0]))
+    # Rotate so column j matches day j of the full history
+    return np.roll(levels, (days - weeks * 7) % 7, axis=1)
+
+
+def pace_curve(type_index, night, booked_on, types):
+    """
+    (types, MAX_LEAD + 1) share of room-nights already booked L days
+    before the night.
+    """
+    lead = np.clip((night - booked_on).astype(np.int64), 0, MAX_LEAD)
+    counts = np.bincount(type_index * (MAX_LEAD + 1) + lead, minlength=types * (MAX_LEAD + 1))
+    counts = counts.reshape(types, MAX_LEAD + 1)
+    # Booked at lead >= L means on the books L days out
+    on_books = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+    totals = on_books[:, :1]
+    return np.divide(on_books, totals, out=np.zeros(on_books.shape), where=totals > 0)
+
+
+def compute_forecast(room_type_ids, room_counts, facts, business_date):
+    """Pace, pickup and forecast arrays for the FORECAST_DAYS from business_date"""
+    types = len(room_type_ids)
+    order = np.argsort(room_type_ids)
+    sorted_ids = np.asarray(room_type_ids)[order]
+    fact_types, booked_on, check_in, check_out = facts
+    position = np.searchsorted(sorted_ids, fact_types)
+    known = (position < types) & (sorted_ids[np.minimum(position, types - 1)] == fact_types)
+    type_index = order[position[known]]
+
+    type_index, night, booked = expand_nights(type_index, booked_on[known], check_in[known], check_out[known])
+    today = np.datetime64(business_date, 'D')
+    history_start = today - HISTORY_DAYS
+    night_day = (night - history_start).astype(np.int64)
+    booked_day = (booked - history_start).astype(np.int64)
+    today_day = HISTORY_DAYS
+
+    past = night_day < today_day
+    history = _grid(type_index[past], night_day[past], types, HISTORY_DAYS)
+    levels = smoothed_weekday_levels(history)
+    curve = pace_curve(type_index[past], night[past], booked[past], types)
+
+    horizon = night_day - today_day
+    on_books = _grid(type_index, horizon, types, FORECAST_DAYS)
+    recent = booked_day > today_day - PICKUP_DAYS
+    pickup = _grid(type_index[recent], horizon[recent], types, FORECAST_DAYS)
+    last_year = booked_day <= today_day - LAST_YEAR_OFFSET
+    same_time_last_year = _grid(
+        type_index[last_year], horizon[last_year] + LAST_YEAR_OFFSET, types, FORECAST_DAYS
+    )
+
+    leads = np.minimum(np.arange(FORECAST_DAYS), MAX_LEAD)
+    share = curve[:, leads]
+    projected = np.divide(on_books, share, out=np.full(on_books.shape, np.nan), where=share > 0)
+    # Horizon day d falls on the weekday of history column (HISTORY_DAYS + d) % 7
+    smoothed = levels[:, (HISTORY_DAYS + np.arange(FORECAST_DAYS)) % 7]
+    forecast = np.where(np.isnan(projected), smoothed, (projected + smoothed) / 2)
+    capacity = np.asarray(room_counts, dtype=float)[:, None]
+    forecast = np.clip(np.maximum(forecast, on_books), 0, capacity)
+
+    return {
+        'on_the_books': on_books,
+        'same_time_last_year': same_time_last_year,
+        'pickup': pickup,
+        'forecast': forecast,
+        'occupancy': np.divide(forecast * 100, capacity, out=np.zeros(forecast.shape), where=capacity > 0),
+        'pace_curve': curve,
+    }
+
+
+def build_forecast(hotel, business_date):
+    room_types = list(
+        RoomType.objects
+        .filter(hotel=hotel)
+        .annotate(room_count=Count('rooms', filter=Q(rooms__is_active=True)))
+        .order_by('id')
+        .values('id', 'name', 'room_count')
+    )
+    dates = [(business_date + timedelta(days=i)).isoformat() for i in range(FORECAST_DAYS)]
+    if not room_types:
+        return {'business_date': business_date.isoformat(), 'dates': dates, 'room_types': []}
+
+    start = business_date - timedelta(days=HISTORY_DAYS)
+    end = business_date + timedelta(days=FORECAST_DAYS)
+    facts = load_booking_facts(hotel, start, end)
+    arrays = compute_forecast(
+        [room_type['id'] for room_type in room_types],
+        [room_type['room_count'] for room_type in room_types],
+        facts,
+        business_date,
+    )
+
+    return {
+        'business_date': business_date.isoformat(),
+        'dates': dates,
+        'room_types': [
+            {
+                'id': room_type['id'],
+                'name': room_type['name'],
+                'rooms': room_type['room_count'],
+                'on_the_books': arrays['on_the_books'][i].tolist(),
+                'same_time_last_year': arrays['same_time_last_year'][i].tolist(),
+                'pickup': arrays['pickup'][i].tolist(),
+                'forecast': arrays['forecast'][i].round(1).tolist(),
+                'occupancy': arrays['occupancy'][i].round(1).tolist(),
+                'pace_curve': arrays['pace_curve'][i].round(3).tolist(),
+            }
+            for i, room_type in enumerate(room_types)
+        ],
+    }
+
+
+def get_forecast(hotel, business_date=None):
+    """The hotel's forecast for business_date (default today), cached"""
+    if np is None:
+        raise ForecastUnavailable('Forecasting requires numpy to be installed.')
+
+    business_date = business_date or timezone.localdate()
+    cache = caches[settings.REPORTS_CACHE_ALIAS]
+    key = f'hotel_forecast:{hotel.pk}:{business_date.isoformat()}'
+    forecast = cache.get(key)
+    if forecast is None:
+        forecast = build_forecast(hotel, business_date)
+        cache.set(key, forecast, settings.FORECAST_CACHE_TIMEOUT)
+    return forecast
@@ -0,0 +1,248 @@
+"""
+Background report jobs.
+
+A request only records a ReportJob; run_report_jobs claims queued jobs with
+SELECT ... FOR UPDATE SKIP LOCKED and runs them in a process pool. Jobs write
+their progress to the row as they go (polled by the jobs endpoint) and their
+CSV artifact under REPORT_ARTIFACT_DIR.
+
+Each report kind also defines a cheap "data version" query. It is hashed
+with the kind and parameters into the job's fingerprint, so asking for the
+same report again returns the finished (or in-flight) job until the data it
+reads changes.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.utils import timezone
+
+from billing.models import FolioLine
+from guests.models import Guest
+from .models import ReportJob
+
+
+CHUNK_SIZE = 5000
+
+
+class InvalidReport(Exception):
+    """Unknown report kind or bad parameters"""
+
+
+def artifact_path(job):
+    return Path(settings.REPORT_ARTIFACT_DIR) / job.artifact
+
+
+# #############################################################
+# ANNUAL REVENUE
+# #############################################################
+def _revenue_lines(hotel_id, params):
+    year = params['year']
+    return FolioLine.objects.filter(
+        folio__hotel_id=hotel_id,
+        business_date__gte=date(year, 1, 1),
+        business_date__lt=date(year + 1, 1, 1),
+    )
+
+
+def annual_revenue_params(data):
+    try:
+        year = int(data.get('year') or timezone.localdate().year)
+    except (TypeError, ValueError):
+        raise InvalidReport('Year must be a number.')
+    if not 2000 <= year <= 2100:
+        raise InvalidReport('Year is out of range.')
+    return {'year': year}
+
+
+def annual_revenue_version(hotel_id, params):
+    # Folio lines are append-only, so the newest id moves with every posting
+    return _revenue_lines(hotel_id, params).aggregate(last=Max('id'))['last']
+
+
+def annual_revenue_report(hotel_id, params, set_progress):
+    """Revenue by month and category for a year, one month at a time"""
+    year = params['year']
+    header = ['Month', 'Category', 'Charges', 'Adjustments', 'Payments', 'Net Revenue', 'Lines']
+    rows = []
+    for month in range(1, 13):
+        start = date(year, month, 1)
+        end = date(year + (month == 12), month % 12 + 1, 1)
+        totals = (
+            _revenue_lines(hotel_id, params)
+            .filter(business_date__gte=start, business_date__lt=end)
+            .order_by()
+            .values('category')
+            .annotate(
+                charges=Sum('amount', filter=Q(kind=FolioLine.KIND_CHARGE)),
+                adjustments=Sum('amount', filter=Q(kind=FolioLine.KIND_ADJUSTMENT)),
+                payments=Sum('amount', filter=Q(kind=FolioLine.KIND_PAYMENT)),
+                lines=Count('id'),
+            )
+            .order_by('category')
+        )
+        for row in totals:
+            charges = row['charges'] or 0
+            adjustments = row['adjustments'] or 0
+            rows.append([
+                start.strftime('%Y-%m'),
+                row['category'],
+                charges,
+                adjustments,
+                -(row['payments'] or 0),
+                charges + adjustments,
+                row['lines'],
+            ])
+        set_progress(month * 100 // 12)
+    return header, rows
+
+
+# #############################################################
+# GUEST NATIONALITY
+# #############################################################
+def guest_nationality_params(data):
+    return {}
+
+
+def guest_nationality_version(hotel_id, params):
+    stats = Guest.objects.filter(hotel_id=hotel_id).aggregate(
+        count=Count('id'), updated=Max('updated_at'),
+    )
+    return f'{stats["count"]}:{stats["updated"]}'
+
+
+def guest_nationality_report(hotel_id, params, set_progress):
+    """Guest profiles per nationality, counted in id ranges of CHUNK_SIZE"""
+    guests = Guest.objects.filter(hotel_id=hotel_id)
+    bounds = guests.aggregate(first=Min('id'), last=Max('id'))
+    counts = {}
+    if bounds['first'] is not None:
+        span = bounds['last'] - bounds['first'] + 1
+        for low in range(bounds['first'], bounds['last'] + 1, CHUNK_SIZE):
+            chunk = (
+                guests
+                .filter(id__gte=low, id__lt=low + CHUNK_SIZE)
+                .order_by()
+                .values('nationality')
+                .annotate(total=Count('id'))
+            )
+            for row in chunk:
+                nationality = row['nationality'].strip() or 'Unknown'
+                counts[nationality] = counts.get(nationality, 0) + row['total']
+            set_progress(min(low + CHUNK_SIZE - bounds['first'], span) * 100 // span)
+
+    total = sum(counts.values())
+    rows = [
+        [nationality, count, f'{count * 100 / total:.1f}']
+        for nationality, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    ]
+    return ['Nationality', 'Guests', 'Share %'], rows
+
+
+REPORTS = {
+    ReportJob.KIND_ANNUAL_REVENUE: (annual_revenue_params, annual_revenue_version, annual_revenue_report),
+    ReportJob.KIND_GUEST_NATIONALITY: (
+        guest_nationality_params, guest_nationality_version, guest_nationality_report,
+    ),
+}
+
+
+# #############################################################
+# QUEUE
+# #############################################################
+def fingerprint(hotel_id, kind, params, version):
+    payload = json.dumps([hotel_id, kind, params, str(version)], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def request_report(hotel, kind, data, user=None):
+    """
+    Queue a report, or return the job that already has (or is building)
+    the same report over the same data.
+    """
+    if kind not in REPORTS:
+        raise InvalidReport('Unknown report.')
+    clean_params, data_version, _ = REPORTS[kind]
+    params = clean_params(data)
+    key = fingerprint(hotel.pk, kind, params, data_version(hotel.pk, params))
+
+    existing = (
+        ReportJob.objects
+        .filter(hotel=hotel, fingerprint=key)
+        .exclude(status=ReportJob.STATUS_FAILED)
+        .order_by('-created_at')
+        .first()
+    )
+    if existing and (existing.status != ReportJob.STATUS_COMPLETED or artifact_path(existing).exists()):
+        return existing
+
+    return ReportJob.objects.create(hotel=hotel, requested_by=user, kind=kind, params=params, fingerprint=key)
+
+
+def claim_jobs(limit):
+    """Mark up to `limit` queued jobs running and return their ids"""
+    with transaction.atomic():
+        ids = list(
+            ReportJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=ReportJob.STATUS_QUEUED)
+            .order_by('created_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        ReportJob.objects.filter(id__in=ids).update(
+            status=ReportJob.STATUS_RUNNING, started_at=timezone.now(), progress=0,
+        )
+    return ids
+
+
+def requeue_stale_jobs(older_than):
+    """Put back jobs left running by a worker that died"""
+    return ReportJob.objects.filter(
+        status=ReportJob.STATUS_RUNNING,
+        started_at__lt=timezone.now() - timedelta(seconds=older_than),
+    ).update(status=ReportJob.STATUS_QUEUED, started_at=None, progress=0)
+
+
+def _write_csv(path, header, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written beside the target and renamed, so downloads never see half a file
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.csv.tmp')
+    try:
+        with os.fdopen(fd, 'w', newline='') as output:
+            writer = csv.writer(output)
+            writer.writerow(header)
+            writer.writerows(rows)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def run_job(job_id):
+    """Build one claimed job's artifact, recording progress and the outcome"""
+    job = ReportJob.objects.get(pk=job_id)
+    jobs = ReportJob.objects.filter(pk=job_id)
+
+    def set_progress(percent):
+        jobs.update(progress=min(percent, 99))
+
+    try:
+        _, _, generate = REPORTS[job.kind]
+        header, rows = generate(job.hotel_id, job.params, set_progress)
+        artifact = f'{job.hotel_id}/{job.kind}-{job.fingerprint}.csv'
+        _write_csv(Path(settings.REPORT_ARTIFACT_DIR) / artifact, header, rows)
+    except Exception as e:
+        jobs.update(status=ReportJob.STATUS_FAILED, error=str(e), finished_at=timezone.now())
+        raise
+
+    jobs.update(
+        status=ReportJob.STATUS_COMPLETED, progress=100, artifact=artifact, finished_at=timezone.now(),
+    )
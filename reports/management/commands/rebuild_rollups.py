@@ -0,0 +1,55 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from billing.models import FolioLine
+from bookings.models import Booking
+from reports.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily, weekly and monthly occupancy and revenue rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotel', type=int, help='Only rebuild this hotel id')
+        parser.add_argument('--start', type=date.fromisoformat,
+                            help='First day (YYYY-MM-DD), default the hotel\'s earliest booking or charge')
+        parser.add_argument('--end', type=date.fromisoformat,
+                            help='Day after the last one (YYYY-MM-DD), default its latest check-out')
+
+    def handle(self, *args, **options):
+        if options['start'] and options['end'] and options['end'] <= options['start']:
+            raise CommandError('--end must be after --start')
+
+        stays = Booking.objects.order_by().values('hotel_id').annotate(
+            first=Min('stay__startswith'), last=Max('stay__endswith'),
+        )
+        lines = FolioLine.objects.order_by().values('folio__hotel_id').annotate(
+            first=Min('business_date'), last=Max('business_date'),
+        )
+        if options['hotel']:
+            stays = stays.filter(hotel_id=options['hotel'])
+            lines = lines.filter(folio__hotel_id=options['hotel'])
+
+        ranges = {row['hotel_id']: (row['first'], row['last']) for row in stays}
+        for row in lines:
+            first, last = ranges.get(row['folio__hotel_id'], (row['first'], row['last']))
+            ranges[row['folio__hotel_id']] = (min(first, row['first']), max(last, row['last'] + timedelta(days=1)))
+
+        began = time.monotonic()
+        rows = 0
+        today = timezone.localdate()
+        for hotel_id, (first, last) in sorted(ranges.items()):
+            start = options['start'] or first
+            end = options['end'] or max(last, today + timedelta(days=1))
+            written = rebuild_rollups(hotel_id, start, end)
+            rows += written
+            self.stdout.write(f'  Hotel #{hotel_id}: {written} row(s) from {start} to {end}')
+
+        elapsed = time.monotonic() - began
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {rows} rollup row(s) for {len(ranges)} hotel(s) in {elapsed:.2f}s'
+        ))
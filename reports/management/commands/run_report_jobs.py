@@ -0,0 +1,73 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _setup_worker():
+    django.setup()
+
+
+def _run_job(job_id):
+    # Imported here: spawned workers load this module before django.setup()
+    from reports.jobs import run_job
+
+    try:
+        run_job(job_id)
+        return job_id, ''
+    except Exception as e:
+        return job_id, str(e)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run queued report jobs in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                            help='Jobs run in parallel')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between queue checks')
+        parser.add_argument('--stale-after', type=int, default=3600,
+                            help='Requeue jobs left running longer than this many seconds')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        from reports.jobs import claim_jobs, requeue_stale_jobs
+
+        requeued = requeue_stale_jobs(options['stale_after'])
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale job(s)'))
+
+        workers = options['workers']
+        finished = 0
+        # Spawned (not forked) workers never inherit this process's DB connection
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_setup_worker) as pool:
+            running = {}
+            while True:
+                if len(running) < workers:
+                    for job_id in claim_jobs(workers - len(running)):
+                        running[pool.submit(_run_job, job_id)] = job_id
+
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    job_id, error = future.result()
+                    finished += 1
+                    if error:
+                        self.stderr.write(f'  Report job #{job_id}: failed - {error}')
+                    else:
+                        self.stdout.write(f'  Report job #{job_id}: completed')
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {finished} report job(s)'))
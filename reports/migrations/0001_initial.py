@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 06:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0004_auth_user_upper_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HotelStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('rooms_available', models.PositiveIntegerField(default=0)),
+                ('rooms_sold', models.IntegerField(default=0)),
+                ('arrivals', models.IntegerField(default=0)),
+                ('room_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats_rollups', to='accounts.hotel')),
+            ],
+            options={
+                'verbose_name': 'Hotel Stats Rollup',
+                'verbose_name_plural': 'Hotel Stats Rollups',
+                'ordering': ['hotel', 'period', '-period_start'],
+                'constraints': [models.UniqueConstraint(fields=('hotel', 'period', 'period_start'), name='unique_hotel_stats_period')],
+            },
+        ),
+    ]
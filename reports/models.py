@@ -1,3 +1,122 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
 from django.db import models
+from accounts.models import Hotel
+
+
+class HotelStatsRollup(models.Model):
+    """
+    Occupancy and revenue totals for one hotel over a day, week (starting
+    Monday) or calendar month.
+
+    Rows are adjusted by reports.rollups in the same transaction as the
+    booking or folio change that moves them, so dashboards read a few rows
+    instead of scanning bookings and folios. rebuild_rollups recomputes them
+    from the source tables.
+    """
+    PERIOD_DAY = 'day'
+    PERIOD_WEEK = 'week'
+    PERIOD_MONTH = 'month'
+    PERIOD_CHOICES = [
+        (PERIOD_DAY, 'Day'),
+        (PERIOD_WEEK, 'Week'),
+        (PERIOD_MONTH, 'Month'),
+    ]
+
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='stats_rollups')
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    # Room-nights: active rooms x nights in the period
+    rooms_available = models.PositiveIntegerField(default=0)
+    rooms_sold = models.IntegerField(default=0)
+    arrivals = models.IntegerField(default=0)
+    room_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Hotel Stats Rollup'
+        verbose_name_plural = 'Hotel Stats Rollups'
+        ordering = ['hotel', 'period', '-period_start']
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'period', 'period_start'], name='unique_hotel_stats_period'),
+        ]
+
+    def __str__(self):
+        return f'{self.hotel} {self.get_period_display()} {self.period_start}'
+
+    @property
+    def occupancy(self):
+        """Rooms sold as a percentage of rooms available"""
+        if not self.rooms_available:
+            return Decimal('0')
+        return Decimal(self.rooms_sold * 100) / self.rooms_available
+
+    @property
+    def adr(self):
+        """Average daily rate: room revenue per room sold"""
+        if not self.rooms_sold:
+            return Decimal('0')
+        return self.room_revenue / self.rooms_sold
+
+    @property
+    def revpar(self):
+        """Room revenue per available room"""
+        if not self.rooms_available:
+            return Decimal('0')
+        return self.room_revenue / self.rooms_available
+
+
+class ReportJob(models.Model):
+    """
+    A report generated outside the request by run_report_jobs.
+
+    `fingerprint` hashes the report kind, its parameters and a version of
+    the data it reads, so a finished job's artifact is handed out again
+    until that data changes.
+    """
+    KIND_ANNUAL_REVENUE = 'annual_revenue'
+    KIND_GUEST_NATIONALITY = 'guest_nationality'
+    KIND_CHOICES = [
+        (KIND_ANNUAL_REVENUE, 'Annual Revenue'),
+        (KIND_GUEST_NATIONALITY, 'Guest Nationality'),
+    ]
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='report_jobs')
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict, blank=True)
+    fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0)
+    # Relative to REPORT_ARTIFACT_DIR
+    artifact = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Report Job'
+        verbose_name_plural = 'Report Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            # Worker queue, oldest first
+            models.Index(fields=['status', 'created_at'], name='report_job_queue_idx'),
+            models.Index(fields=['hotel', 'fingerprint'], name='report_job_fingerprint_idx'),
+        ]
 
-# Create your models here.
+    def __str__(self):
+        return f'{self.get_kind_display()} #{self.pk} ({self.status})'
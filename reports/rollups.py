@@ -0,0 +1,275 @@
+"""
+Daily, weekly and monthly occupancy/revenue rollups.
+
+Booking and billing code report what changed (a stay added or removed,
+folio lines posted) and the matching day, week and month rows are moved by
+F() deltas in the caller's transaction, the same way folio totals track the
+ledger. rebuild_rollups() recomputes a date range from bookings and folio
+lines, for backfills and to repair drift.
+"""
+
+import calendar
+from collections import Counter, defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from billing.models import FolioLine
+from bookings.models import Booking
+from rooms.availability import stay_nights
+from rooms.models import Room
+from .models import HotelStatsRollup
+
+
+DAY = HotelStatsRollup.PERIOD_DAY
+WEEK = HotelStatsRollup.PERIOD_WEEK
+MONTH = HotelStatsRollup.PERIOD_MONTH
+METRICS = ['rooms_sold', 'arrivals', 'room_revenue', 'total_revenue']
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def period_length(period, start):
+    """Number of days in the period beginning on `start`"""
+    if period == DAY:
+        return 1
+    if period == WEEK:
+        return 7
+    return calendar.monthrange(start.year, start.month)[1]
+
+
+def period_keys(day):
+    """The (period, period_start) rows a single day counts towards"""
+    return [(DAY, day), (WEEK, week_start(day)), (MONTH, month_start(day))]
+
+
+def count_rooms(hotel_id):
+    return Room.objects.filter(hotel_id=hotel_id, is_active=True).count()
+
+
+def apply_changes(hotel_id, changes):
+    """
+    Fold per-day deltas into the hotel's rollups.
+
+    `changes` is {date: {metric: delta}}. Missing rows are created first so
+    every change is a single UPDATE of F() expressions.
+    """
+    totals = defaultdict(Counter)
+    for day, metrics in changes.items():
+        for key in period_keys(day):
+            totals[key].update(metrics)
+    totals = {key: metrics for key, metrics in totals.items() if any(metrics.values())}
+    if not totals:
+        return
+
+    with transaction.atomic():
+        keys = Q()
+        for period, start in totals:
+            keys |= Q(period=period, period_start=start)
+        existing = set(
+            HotelStatsRollup.objects.filter(keys, hotel_id=hotel_id).values_list('period', 'period_start')
+        )
+        missing = [key for key in totals if key not in existing]
+        if missing:
+            rooms = count_rooms(hotel_id)
+            HotelStatsRollup.objects.bulk_create(
+                [
+                    HotelStatsRollup(
+                        hotel_id=hotel_id,
+                        period=period,
+                        period_start=start,
+                        rooms_available=rooms * period_length(period, start),
+                    )
+                    for period, start in missing
+                ],
+                ignore_conflicts=True,
+            )
+
+        # A fixed order keeps concurrent writers from deadlocking
+        now = timezone.now()
+        for (period, start), metrics in sorted(totals.items()):
+            HotelStatsRollup.objects.filter(hotel_id=hotel_id, period=period, period_start=start).update(
+                updated_at=now,
+                **{metric: F(metric) + delta for metric, delta in metrics.items() if delta},
+            )
+
+
+def record_stay(hotel_id, check_in, check_out, rooms=1, sign=1):
+    """Count (sign=1) or uncount (sign=-1) `rooms` rooms booked for a stay"""
+    changes = {night: {'rooms_sold': sign * rooms} for night in stay_nights(check_in, check_out)}
+    changes.setdefault(check_in, {})['arrivals'] = sign * rooms
+    apply_changes(hotel_id, changes)
+
+
+def record_lines(hotel_id, lines):
+    """Add posted folio lines (FolioLine instances) to the revenue totals"""
+    changes = defaultdict(Counter)
+    for line in lines:
+        if line.kind == FolioLine.KIND_PAYMENT:
+            continue
+        changes[line.business_date]['total_revenue'] += line.amount
+        if line.category == 'room':
+            changes[line.business_date]['room_revenue'] += line.amount
+    apply_changes(hotel_id, changes)
+
+
+def sync_rooms_available(hotel_id, change, start=None):
+    """
+    Move rooms_available for nights from `start` (default today) on after
+    `change` rooms were added (or removed, if negative).
+
+    Earlier nights keep the capacity they had, so only the remaining days
+    of the current week and month are adjusted.
+    """
+    if not change:
+        return
+    start = start or timezone.localdate()
+    rooms = count_rooms(hotel_id)
+    rows = HotelStatsRollup.objects.filter(hotel_id=hotel_id)
+    with transaction.atomic():
+        rows.filter(period=DAY, period_start__gte=start).update(rooms_available=rooms)
+        rows.filter(period=WEEK, period_start__gte=start).update(rooms_available=rooms * 7)
+        for row in rows.filter(period=MONTH, period_start__gte=start).only('id', 'period_start'):
+            rows.filter(pk=row.pk).update(rooms_available=rooms * period_length(MONTH, row.period_start))
+        # The week and month already under way: only their remaining nights change
+        for period, period_start in period_keys(start)[1:]:
+            if period_start < start:
+                remaining = period_length(period, period_start) - (start - period_start).days
+                rows.filter(period=period, period_start=period_start).update(
+                    rooms_available=F('rooms_available') + change * remaining
+                )
+
+
+def rebuild_rollups(hotel_id, start, end):
+    """
+    Recompute every rollup covering [start, end) from bookings and folio lines.
+
+    The range is widened to whole weeks and months so no partial period is
+    written. Returns the number of rows written.
+    """
+    lo = min(week_start(start), month_start(start))
+    last = end - timedelta(days=1)
+    next_month = (month_start(last) + timedelta(days=32)).replace(day=1)
+    hi = max(week_start(last) + timedelta(days=7), next_month)
+
+    days = {day: Counter() for day in stay_nights(lo, hi)}
+    stays = (
+        Booking.objects
+        .filter(hotel_id=hotel_id, stay__overlap=DateRange(lo, hi))
+        .exclude(status=Booking.STATUS_CANCELLED)
+        .values_list('stay', flat=True)
+    )
+    for stay in stays.iterator(chunk_size=2000):
+        for night in stay_nights(max(stay.lower, lo), min(stay.upper, hi)):
+            days[night]['rooms_sold'] += 1
+        if lo <= stay.lower < hi:
+            days[stay.lower]['arrivals'] += 1
+
+    not_payment = ~Q(kind=FolioLine.KIND_PAYMENT)
+    revenue = (
+        FolioLine.objects
+        .filter(folio__hotel_id=hotel_id, business_date__gte=lo, business_date__lt=hi)
+        .order_by()
+        .values('business_date')
+        .annotate(
+            total=Sum('amount', filter=not_payment),
+            room=Sum('amount', filter=not_payment & Q(category='room')),
+        )
+    )
+    for row in revenue:
+        days[row['business_date']]['total_revenue'] += row['total'] or Decimal('0')
+        days[row['business_date']]['room_revenue'] += row['room'] or Decimal('0')
+
+    periods = defaultdict(Counter)
+    for day, metrics in days.items():
+        for key in period_keys(day):
+            periods[key].update(metrics)
+
+    rooms = count_rooms(hotel_id)
+    rows = [
+        HotelStatsRollup(
+            hotel_id=hotel_id,
+            period=period,
+            period_start=period_start,
+            rooms_available=rooms * period_length(period, period_start),
+            **{metric: metrics[metric] for metric in METRICS},
+        )
+        for (period, period_start), metrics in periods.items()
+        # Weeks straddling the widened range would be partial
+        if period_start >= lo and period_start + timedelta(days=period_length(period, period_start)) <= hi
+    ]
+    with transaction.atomic():
+        HotelStatsRollup.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['hotel', 'period', 'period_start'],
+            update_fields=['rooms_available', *METRICS, 'updated_at'],
+        )
+    return len(rows)
+
+
+def _change(current, previous):
+    """Percentage change, or None when there is nothing to compare with"""
+    if not previous:
+        return None
+    return (current - previous) * 100 / previous
+
+
+def dashboard_kpis(hotel, today=None):
+    """Tonight's and this month's KPIs from the rollup rows (one query)"""
+    today = today or timezone.localdate()
+    yesterday = today - timedelta(days=1)
+    this_month = month_start(today)
+    last_month = month_start(this_month - timedelta(days=1))
+
+    days = {}
+    months = {}
+    for row in HotelStatsRollup.objects.filter(
+        Q(period=DAY, period_start__gte=min(this_month, yesterday), period_start__lte=today)
+        | Q(period=MONTH, period_start__in=[this_month, last_month]),
+        hotel=hotel,
+    ):
+        (days if row.period == DAY else months)[row.period_start] = row
+    empty = HotelStatsRollup(hotel=hotel)
+    tonight = days.get(today, empty)
+    last_night = days.get(yesterday, empty)
+    previous_month = months.get(last_month, empty)
+
+    # Nights of this month before tonight, whose room charges the night
+    # audit has posted. Quiet nights have no day row, so their capacity
+    # comes from the month row.
+    nightly_rooms = months.get(this_month, empty).rooms_available // period_length(MONTH, this_month)
+    month_to_date = HotelStatsRollup(hotel=hotel, room_revenue=Decimal('0'))
+    for night in stay_nights(this_month, today):
+        row = days.get(night)
+        if row is None:
+            month_to_date.rooms_available += nightly_rooms
+            continue
+        month_to_date.room_revenue += row.room_revenue
+        month_to_date.rooms_sold += row.rooms_sold
+        month_to_date.rooms_available += row.rooms_available
+
+    return {
+        'occupancy': tonight.occupancy,
+        'occupancy_change': _change(tonight.occupancy, last_night.occupancy),
+        'rooms_sold': tonight.rooms_sold,
+        'rooms_available': tonight.rooms_available,
+        'arrivals': tonight.arrivals,
+        'adr': month_to_date.adr,
+        'adr_change': _change(month_to_date.adr, previous_month.adr),
+        'revpar': month_to_date.revpar,
+        'revpar_change': _change(month_to_date.revpar, previous_month.revpar),
+        'revenue': tonight.total_revenue,
+        'revenue_change': _change(tonight.total_revenue, last_night.total_revenue),
+    }
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('forecast/', views.forecast_view, name='forecast'),
+    path('jobs/', views.report_jobs_view, name='report_jobs'),
+    path('jobs/<int:job_id>/', views.report_job_view, name='report_job'),
+    path('jobs/<int:job_id>/download/', views.report_job_download_view, name='report_job_download'),
+]
@@ -0,0 +1,46 @@
+"""
+Keep rollup capacity (rooms_available) in step with each hotel's rooms.
+"""
+
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from rooms.models import Room
+from .rollups import sync_rooms_available
+
+
+# Saves that leave these alone cannot change a hotel's room count
+CAPACITY_FIELDS = {'is_active', 'hotel', 'hotel_id'}
+
+
+def _touches_capacity(update_fields):
+    return update_fields is None or not CAPACITY_FIELDS.isdisjoint(update_fields)
+
+
+@receiver(pre_save, sender=Room)
+def remember_room_capacity(sender, instance, update_fields=None, **kwargs):
+    instance._previous_capacity = (
+        Room.objects.filter(pk=instance.pk).values_list('hotel_id', 'is_active').first()
+        if instance.pk and _touches_capacity(update_fields) else None
+    )
+
+
+@receiver(post_save, sender=Room)
+def room_saved(sender, instance, created, update_fields=None, **kwargs):
+    if not _touches_capacity(update_fields):
+        return
+    changes = Counter({instance.hotel_id: int(instance.is_active)})
+    previous = None if created else instance._previous_capacity
+    if previous is not None:
+        previous_hotel_id, was_active = previous
+        changes[previous_hotel_id] -= int(was_active)
+    for hotel_id, change in changes.items():
+        sync_rooms_available(hotel_id, change)
+
+
+@receiver(post_delete, sender=Room)
+def room_deleted(sender, instance, **kwargs):
+    if instance.is_active:
+        sync_rooms_available(instance.hotel_id, -1)
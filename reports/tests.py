@@ -1,3 +1,202 @@
-from django.test import TestCase
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import skipIf
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import Hotel
+from bookings.models import Booking
+from rooms.models import Room, RoomType
+from .forecasting import FORECAST_DAYS, HISTORY_DAYS, MAX_LEAD, build_forecast, get_forecast, np
+from .models import HotelStatsRollup
+from .rollups import DAY, MONTH, WEEK, apply_changes, dashboard_kpis, month_start, period_length, week_start
+
+
+class DashboardKpiTests(TestCase):
+    TODAY = date(2030, 3, 15)
+
+    def setUp(self):
+        user = User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+        self.hotel = Hotel.objects.create(user=user, hotel_name='Lakeside Inn', mobile_number='9812345670')
+        room_type = RoomType.objects.create(hotel=self.hotel, name='Deluxe')
+        Room.objects.bulk_create(
+            Room(hotel=self.hotel, room_type=room_type, number=str(101 + i)) for i in range(10)
+        )
+
+    def sell(self, night, rooms, revenue=0):
+        apply_changes(self.hotel.id, {night: {'rooms_sold': rooms, 'room_revenue': Decimal(revenue)}})
+
+    def test_month_to_date_ignores_future_nights(self):
+        self.sell(date(2030, 3, 10), 5, 500)
+        self.sell(date(2030, 3, 14), 3, 360)
+        # Booked but not yet stayed
+        self.sell(self.TODAY, 8)
+        self.sell(date(2030, 3, 20), 10)
+
+        kpis = dashboard_kpis(self.hotel, today=self.TODAY)
+
+        self.assertEqual(kpis['adr'], Decimal('860') / 8)
+        # 14 nights of 10 rooms so far, including nights without a row
+        self.assertEqual(kpis['revpar'], Decimal('860') / 140)
+        self.assertEqual(kpis['rooms_sold'], 8)
+        self.assertEqual(kpis['occupancy'], Decimal('80'))
+
+    def test_change_compares_with_last_month(self):
+        self.sell(date(2030, 2, 10), 10, 800)
+        self.sell(date(2030, 3, 1), 5, 500)
+
+        kpis = dashboard_kpis(self.hotel, today=date(2030, 3, 2))
+
+        self.assertEqual(kpis['adr'], Decimal('100'))
+        self.assertEqual(kpis['adr_change'], 25)
+        self.assertEqual(kpis['revpar'], Decimal('50'))
+
+    def test_first_of_the_month_has_no_month_to_date(self):
+        self.sell(date(2030, 2, 28), 5, 500)
+
+        kpis = dashboard_kpis(self.hotel, today=date(2030, 3, 1))
+
+        self.assertEqual(kpis['adr'], 0)
+        self.assertEqual(kpis['revpar'], 0)
+        self.assertEqual(kpis['revenue_change'], None)
+
+
+
+class RoomCapacityTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+        self.hotel = Hotel.objects.create(user=user, hotel_name='Lakeside Inn', mobile_number='9812345670')
+        self.room_type = RoomType.objects.create(hotel=self.hotel, name='Deluxe')
+        Room.objects.bulk_create(
+            Room(hotel=self.hotel, room_type=self.room_type, number=str(101 + i)) for i in range(10)
+        )
+        self.today = timezone.localdate()
+        self.this_month = month_start(self.today)
+        self.next_month = month_start(self.this_month + timedelta(days=32))
+        self.nights = [self.today - timedelta(days=1), self.today + timedelta(days=1), self.next_month]
+        apply_changes(self.hotel.id, {night: {'rooms_sold': 1} for night in self.nights})
+
+    def capacity(self, period, period_start):
+        return HotelStatsRollup.objects.get(hotel=self.hotel, period=period, period_start=period_start).rooms_available
+
+    def test_adding_a_room_leaves_past_nights_alone(self):
+        this_week = week_start(self.today)
+        month_length = period_length(MONTH, self.this_month)
+
+        Room.objects.create(hotel=self.hotel, room_type=self.room_type, number='201')
+
+        self.assertEqual(self.capacity(DAY, self.nights[0]), 10)
+        self.assertEqual(self.capacity(DAY, self.nights[1]), 11)
+        # Nights from today to the end of the period gain the room
+        self.assertEqual(self.capacity(WEEK, this_week), 70 + 7 - (self.today - this_week).days)
+        self.assertEqual(self.capacity(MONTH, self.this_month), 10 * month_length + month_length - self.today.day + 1)
+        self.assertEqual(self.capacity(MONTH, self.next_month), 11 * period_length(MONTH, self.next_month))
+
+    def test_deactivating_and_deleting_rooms(self):
+        before = list(HotelStatsRollup.objects.order_by('pk').values_list('rooms_available', flat=True))
+        room = Room.objects.create(hotel=self.hotel, room_type=self.room_type, number='201')
+
+        room.is_active = False
+        room.save(update_fields=['is_active'])
+        self.assertEqual(list(HotelStatsRollup.objects.order_by('pk').values_list('rooms_available', flat=True)), before)
+
+        room.is_active = True
+        room.save()
+        room.delete()
+        self.assertEqual(list(HotelStatsRollup.objects.order_by('pk').values_list('rooms_available', flat=True)), before)
+
+    def test_saves_that_keep_capacity_skip_the_resync(self):
+        room = Room.objects.first()
+        room.floor = 2
+        with CaptureQueriesContext(connection) as queries:
+            room.save(update_fields=['floor'])
+        self.assertFalse([query for query in queries if 'reports_hotelstatsrollup' in query['sql']])
+        self.assertFalse([query for query in queries if '"is_active" AS "is_active"' in query['sql']])
+        # A full save looks the room up but has nothing to move
+        room.save()
+        self.assertEqual(self.capacity(DAY, self.nights[1]), 10)
+
+
+@tag('load')
+@skipIf(np is None, 'numpy is not installed')
+class ForecastLoadTests(TestCase):
+    """Five years of booking history for a 300-room hotel"""
+
+    ROOM_TYPES = 5
+    ROOMS = 300
+    STAY_NIGHTS = 3
+    BUSINESS_DATE = date(2030, 5, 1)
+    MAX_SECONDS = 3.0
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+        cls.hotel = Hotel.objects.create(user=user, hotel_name='Lakeside Inn', mobile_number='9812345670')
+        room_types = RoomType.objects.bulk_create(
+            RoomType(hotel=cls.hotel, name=f'Type {i}') for i in range(cls.ROOM_TYPES)
+        )
+        rooms = Room.objects.bulk_create(
+            Room(hotel=cls.hotel, room_type=room_types[i % cls.ROOM_TYPES], number=str(101 + i))
+            for i in range(cls.ROOMS)
+        )
+        first_night = cls.BUSINESS_DATE - timedelta(days=HISTORY_DAYS)
+        # Three stays in four, back to back, up to the end of the forecast window
+        Booking.objects.bulk_create(
+            (
+                Booking(
+                    hotel=cls.hotel, room=room, guest_name=f'Guest {room.number}',
+                    stay=DateRange(
+                        first_night + timedelta(days=day), first_night + timedelta(days=day + cls.STAY_NIGHTS),
+                    ),
+                )
+                for room in rooms
+                for n, day in enumerate(range(0, HISTORY_DAYS + FORECAST_DAYS, cls.STAY_NIGHTS))
+                if (n + room.pk) % 4
+            ),
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            # Booked 0-89 days ahead; stays not yet booked on the business date go
+            cursor.execute(
+                "UPDATE bookings_booking SET created_at = "
+                "lower(stay) - (id * 7919 %% %s) * interval '1 day' + interval '12 hours' WHERE hotel_id = %s",
+                [MAX_LEAD, cls.hotel.pk],
+            )
+            cursor.execute(
+                'DELETE FROM bookings_booking WHERE hotel_id = %s AND created_at >= %s::date + 1',
+                [cls.hotel.pk, cls.BUSINESS_DATE],
+            )
+            cursor.execute('ANALYZE bookings_booking')
+
+    def setUp(self):
+        self.addCleanup(caches[settings.REPORTS_CACHE_ALIAS].clear)
+
+    def test_five_years_of_history(self):
+        began = time.perf_counter()
+        forecast = build_forecast(self.hotel, self.BUSINESS_DATE)
+        self.assertLess(time.perf_counter() - began, self.MAX_SECONDS)
+
+        self.assertEqual(len(forecast['room_types']), self.ROOM_TYPES)
+        for room_type in forecast['room_types']:
+            self.assertEqual(room_type['rooms'], self.ROOMS // self.ROOM_TYPES)
+            self.assertEqual(len(room_type['forecast']), FORECAST_DAYS)
+            self.assertEqual(len(room_type['pace_curve']), MAX_LEAD + 1)
+            for booked, expected in zip(room_type['on_the_books'], room_type['forecast']):
+                self.assertLessEqual(booked, expected + 0.05)
+                self.assertLessEqual(expected, room_type['rooms'])
+            # Three rooms in four were taken every night of the history
+            next_month = room_type['forecast'][:30]
+            self.assertAlmostEqual(sum(next_month) / 30, room_type['rooms'] * 0.75, delta=room_type['rooms'] * 0.1)
+
+        get_forecast(self.hotel, self.BUSINESS_DATE)
+        began = time.perf_counter()
+        self.assertEqual(get_forecast(self.hotel, self.BUSINESS_DATE), forecast)
+        self.assertLess(time.perf_counter() - began, 0.05)
@@ -1,3 +1,132 @@
-from django.shortcuts import render
+from django.http import FileResponse, JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.http import require_http_methods
+import json
 
-# Create your views here.
+from .forecasting import ForecastUnavailable, get_forecast
+from .jobs import InvalidReport, artifact_path, request_report
+from .models import ReportJob
+
+
+def _no_hotel():
+    return JsonResponse({
+        'success': False,
+        'message': 'No hotel profile found. Please contact support.'
+    }, status=403)
+
+
+def _job_json(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'params': job.params,
+        'status': job.status,
+        'progress': job.progress,
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'status_url': reverse('report_job', args=[job.id]),
+        'download_url': (
+            reverse('report_job_download', args=[job.id])
+            if job.status == ReportJob.STATUS_COMPLETED else None
+        ),
+    }
+
+
+# #############################################################
+# FORECAST VIEW
+# #############################################################
+@login_required
+@require_http_methods(["GET"])
+def forecast_view(request):
+    """Pace, pickup and 90-day occupancy forecast per room type"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return _no_hotel()
+
+    try:
+        forecast = get_forecast(hotel)
+    except ForecastUnavailable as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=501)
+
+    return JsonResponse({
+        'success': True,
+        **forecast,
+    })
+
+
+# #############################################################
+# REPORT JOB VIEWS
+# #############################################################
+@login_required
+@csrf_protect
+@require_http_methods(["POST"])
+def report_jobs_view(request):
+    """Queue a report (or reuse an identical one) and return its job"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return _no_hotel()
+
+    try:
+        data = json.loads(request.body)
+        job = request_report(hotel, str(data.get('kind', '')), data.get('params') or {}, user=request.user)
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid request format.'
+        }, status=400)
+    except InvalidReport as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'job': _job_json(job),
+    }, status=202 if job.status != ReportJob.STATUS_COMPLETED else 200)
+
+
+@login_required
+@require_http_methods(["GET"])
+def report_job_view(request, job_id):
+    """Poll a report job's status and progress"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return _no_hotel()
+
+    job = ReportJob.objects.filter(hotel=hotel, pk=job_id).first()
+    if job is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'Report not found.'
+        }, status=404)
+
+    return JsonResponse({
+        'success': True,
+        'job': _job_json(job),
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def report_job_download_view(request, job_id):
+    """Download a finished report's CSV"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return _no_hotel()
+
+    job = ReportJob.objects.filter(hotel=hotel, pk=job_id, status=ReportJob.STATUS_COMPLETED).first()
+    if job is None or not artifact_path(job).exists():
+        return JsonResponse({
+            'success': False,
+            'message': 'Report not ready.'
+        }, status=404)
+
+    filename = f'{job.kind}-{job.created_at:%Y%m%d}.csv'
+    return FileResponse(open(artifact_path(job), 'rb'), as_attachment=True, filename=filename)
@@ -0,0 +1,172 @@
+"""
+Per-night availability calendar for room types.
+
+RoomTypeAvailability keeps one row per room type per night with the number
+of sellable rooms and how many of them are booked. Bookings adjust the
+counters with reserve()/release() as they change, so "which room types are
+free from A to B" is a range scan on the (room_type, date) index instead of
+an overlap query over every booking.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from .models import Room, RoomType, RoomTypeAvailability
+
+
+CALENDAR_HORIZON_DAYS = 365
+
+
+class RoomUnavailable(Exception):
+    """Not enough free rooms of a type for every night of a stay"""
+
+
+def stay_nights(check_in, check_out):
+    """Dates of each night between check-in and check-out"""
+    return [check_in + timedelta(days=i) for i in range((check_out - check_in).days)]
+
+
+def count_active_rooms(room_type_ids):
+    """Return {room_type_id: active room count}"""
+    counts = (
+        Room.objects
+        .filter(room_type_id__in=room_type_ids, is_active=True)
+        .values('room_type_id')
+        .annotate(total=Count('id'))
+    )
+    totals = {room_type_id: 0 for room_type_id in room_type_ids}
+    totals.update({row['room_type_id']: row['total'] for row in counts})
+    return totals
+
+
+def ensure_calendar(room_type_ids, start, end):
+    """Create any missing nights in [start, end) for the given room types"""
+    room_type_ids = list(room_type_ids)
+    existing = RoomTypeAvailability.objects.filter(
+        room_type_id__in=room_type_ids, date__gte=start, date__lt=end,
+    ).count()
+    if existing == len(room_type_ids) * (end - start).days:
+        return
+
+    totals = count_active_rooms(room_type_ids)
+    RoomTypeAvailability.objects.bulk_create(
+        [
+            RoomTypeAvailability(room_type_id=room_type_id, date=night, total_rooms=totals[room_type_id])
+            for room_type_id in room_type_ids
+            for night in stay_nights(start, end)
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def sync_total_rooms(room_type_id, start=None):
+    """Refresh total_rooms from the active room count for future nights"""
+    start = start or timezone.localdate()
+    total = count_active_rooms([room_type_id])[room_type_id]
+    return (
+        RoomTypeAvailability.objects
+        .filter(room_type_id=room_type_id, date__gte=start)
+        .exclude(total_rooms=total)
+        .update(total_rooms=total)
+    )
+
+
+def rebuild_calendar(room_type_ids, start, end, booked=None):
+    """
+    Rewrite [start, end) for the given room types.
+
+    `booked` maps (room_type_id, date) to booked room counts; nights that are
+    not in it keep their current booked_rooms.
+    """
+    room_type_ids = list(room_type_ids)
+    totals = count_active_rooms(room_type_ids)
+    existing = {
+        (row['room_type_id'], row['date']): row['booked_rooms']
+        for row in RoomTypeAvailability.objects
+        .filter(room_type_id__in=room_type_ids, date__gte=start, date__lt=end)
+        .values('room_type_id', 'date', 'booked_rooms')
+    }
+    if booked is not None:
+        existing = {key: 0 for key in existing}
+        existing.update(booked)
+
+    rows = [
+        RoomTypeAvailability(
+            room_type_id=room_type_id,
+            date=night,
+            total_rooms=totals[room_type_id],
+            booked_rooms=existing.get((room_type_id, night), 0),
+        )
+        for room_type_id in room_type_ids
+        for night in stay_nights(start, end)
+    ]
+    RoomTypeAvailability.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['room_type', 'date'],
+        update_fields=['total_rooms', 'booked_rooms'],
+    )
+    return len(rows)
+
+
+def reserve(room_type_id, check_in, check_out, rooms=1):
+    """Take `rooms` rooms on every night of the stay or raise RoomUnavailable"""
+    nights = (check_out - check_in).days
+    with transaction.atomic():
+        ensure_calendar([room_type_id], check_in, check_out)
+        updated = (
+            RoomTypeAvailability.objects
+            .filter(
+                room_type_id=room_type_id,
+                date__gte=check_in,
+                date__lt=check_out,
+                booked_rooms__lte=F('total_rooms') - rooms,
+            )
+            .update(booked_rooms=F('booked_rooms') + rooms)
+        )
+        if updated != nights:
+            # Roll back the nights that did fit
+            raise RoomUnavailable(f'Room type {room_type_id} is not available for the whole stay')
+
+
+def release(room_type_id, check_in, check_out, rooms=1):
+    """Give back `rooms` rooms on every night of the stay"""
+    return (
+        RoomTypeAvailability.objects
+        .filter(
+            room_type_id=room_type_id,
+            date__gte=check_in,
+            date__lt=check_out,
+            booked_rooms__gte=rooms,
+        )
+        .update(booked_rooms=F('booked_rooms') - rooms)
+    )
+
+
+def get_available_room_types(hotel, check_in, check_out, rooms=1):
+    """
+    Room types of a hotel with at least `rooms` free rooms on every night.
+
+    Each result is annotated with `available_rooms`, the minimum number of
+    free rooms across the stay.
+    """
+    room_types = RoomType.objects.filter(hotel=hotel)
+    ensure_calendar(room_types.values_list('id', flat=True), check_in, check_out)
+
+    in_stay = Q(availability__date__gte=check_in, availability__date__lt=check_out)
+    return (
+        room_types
+        .annotate(
+            nights=Count('availability', filter=in_stay),
+            available_rooms=Min(
+                F('availability__total_rooms') - F('availability__booked_rooms'),
+                filter=in_stay,
+            ),
+        )
+        .filter(nights=(check_out - check_in).days, available_rooms__gte=rooms)
+    )
@@ -0,0 +1,195 @@
+"""
+Housekeeping status changes and the live task-board feed.
+
+A status change is sent with PostgreSQL NOTIFY in the transaction that
+stores it, so it goes out on commit (and never on rollback). Every worker
+process runs one broker thread that LISTENs on that channel over its own
+connection and fans each event out to the boards connected to that worker.
+Changes made by any worker therefore reach every board, whatever the number
+of ASGI workers.
+
+Each listener keeps only the latest pending status per room, so a slow
+client never builds up a backlog and a burst of changes to one room is
+delivered once. Fan-out is thread-safe: events are handed to each
+listener's event loop with call_soon_threadsafe.
+
+If the LISTEN connection drops, or anything else goes wrong in the
+thread, the broker reconnects; changes committed while it was down are
+not replayed, the boards catch up on their next snapshot (reconnect).
+Waiting for notifications needs psycopg 3.2 or newer.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from threading import Event, Lock, Thread
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.utils import timezone
+
+from .models import Room
+
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'hms_housekeeping'
+# How often the broker thread checks whether it should stop
+POLL_SECONDS = 1.0
+RECONNECT_SECONDS = 5.0
+
+
+class Listener:
+    """One connected board: pending changes keyed by room id"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.pending = {}
+        self.ready = asyncio.Event()
+
+    def deliver(self, event):
+        # Runs on the listener's loop
+        self.pending[event['id']] = event
+        self.ready.set()
+
+    async def changes(self, timeout):
+        """Wait up to `timeout` seconds for changes and return them"""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self.ready.clear()
+        changes, self.pending = list(self.pending.values()), {}
+        return changes
+
+
+class Broker:
+    """This worker's boards, fed from PostgreSQL by a background thread"""
+
+    def __init__(self, channel=NOTIFY_CHANNEL, using=DEFAULT_DB_ALIAS):
+        self.channel = channel
+        self.using = using
+        self.listeners = defaultdict(set)
+        self.lock = Lock()
+        self.thread = None
+        self.listening = Event()
+        self.stopping = Event()
+
+    def subscribe(self, hotel_id):
+        listener = Listener(asyncio.get_running_loop())
+        with self.lock:
+            self.listeners[hotel_id].add(listener)
+            if self.thread is None or not self.thread.is_alive():
+                self.stopping.clear()
+                self.thread = Thread(target=self._listen, name='housekeeping-broker', daemon=True)
+                self.thread.start()
+        return listener
+
+    async def wait_listening(self, timeout=RECONNECT_SECONDS):
+        """Wait until LISTEN is active, so no committed change can be missed"""
+        if not self.listening.is_set():
+            await asyncio.to_thread(self.listening.wait, timeout)
+
+    def unsubscribe(self, hotel_id, listener):
+        with self.lock:
+            self.listeners[hotel_id].discard(listener)
+            if not self.listeners[hotel_id]:
+                del self.listeners[hotel_id]
+
+    def publish(self, hotel_id, event):
+        """Hand `event` to this worker's boards for the hotel"""
+        with self.lock:
+            listeners = list(self.listeners.get(hotel_id, ()))
+        for listener in listeners:
+            try:
+                listener.loop.call_soon_threadsafe(listener.deliver, event)
+            except RuntimeError:
+                # Loop already closed; the listener is going away
+                pass
+        return len(listeners)
+
+    def listener_count(self, hotel_id=None):
+        with self.lock:
+            if hotel_id is not None:
+                return len(self.listeners.get(hotel_id, ()))
+            return sum(map(len, self.listeners.values()))
+
+    def stop(self):
+        """Stop the broker thread and close its connection"""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _listen(self):
+        while not self.stopping.is_set():
+            # A connection of its own, outside Django's per-thread handling
+            connection = connections.create_connection(self.using)
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+                self.listening.set()
+                while not self.stopping.is_set():
+                    for notify in connection.connection.notifies(timeout=POLL_SECONDS):
+                        try:
+                            message = json.loads(notify.payload)
+                            hotel_id, event = message['hotel'], message['event']
+                        except (ValueError, TypeError, KeyError):
+                            logger.warning('Ignoring malformed housekeeping notification: %r', notify.payload)
+                            continue
+                        self.publish(hotel_id, event)
+            except (DatabaseError, OSError, connection.Database.Error):
+                logger.exception('Housekeeping broker lost its connection, reconnecting')
+                self.stopping.wait(RECONNECT_SECONDS)
+            except Exception:
+                # A bad payload or driver error must not end the thread
+                logger.exception('Housekeeping broker failed, reconnecting')
+                self.stopping.wait(RECONNECT_SECONDS)
+            finally:
+                self.listening.clear()
+                connection.close()
+
+
+broker = Broker()
+
+
+def notify(hotel_id, event, using=DEFAULT_DB_ALIAS):
+    """Send `event` to the hotel's boards on every worker when the transaction commits"""
+    payload = json.dumps({'hotel': hotel_id, 'event': event})
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [NOTIFY_CHANNEL, payload])
+
+
+def room_event(room_id, number, status, updated_at):
+    return {
+        'id': room_id,
+        'number': number,
+        'status': status,
+        'updated_at': updated_at.isoformat() if updated_at else None,
+    }
+
+
+def board_snapshot(hotel_id):
+    """Current status of every active room, for a board that just connected"""
+    rooms = (
+        Room.objects
+        .filter(hotel_id=hotel_id, is_active=True)
+        .order_by('number')
+        .values_list('id', 'number', 'housekeeping_status', 'housekeeping_updated_at')
+    )
+    return [room_event(*room) for room in rooms]
+
+
+def set_housekeeping_status(room, status):
+    """Store a room's new status and notify the boards once it commits"""
+    if status not in dict(Room.HOUSEKEEPING_CHOICES):
+        raise ValueError(f'Unknown housekeeping status: {status}')
+
+    now = timezone.now()
+    with transaction.atomic():
+        # A plain UPDATE: Room.save() would also resync availability and rollups
+        Room.objects.filter(pk=room.pk).update(housekeeping_status=status, housekeeping_updated_at=now)
+        notify(room.hotel_id, room_event(room.pk, room.number, status, now))
+    room.housekeeping_status = status
+    room.housekeeping_updated_at = now
+    return room
@@ -0,0 +1,44 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.services import count_booked_rooms
+from rooms.availability import CALENDAR_HORIZON_DAYS, rebuild_calendar
+from rooms.models import RoomType
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-night room type availability calendar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotel', type=int, help='Only rebuild this hotel id')
+        parser.add_argument('--start', type=date.fromisoformat, help='First night (YYYY-MM-DD), default today')
+        parser.add_argument('--days', type=int, default=CALENDAR_HORIZON_DAYS)
+
+    def handle(self, *args, **options):
+        start = options['start'] or timezone.localdate()
+        end = start + timedelta(days=options['days'])
+
+        room_types = RoomType.objects.order_by('hotel_id', 'id')
+        if options['hotel']:
+            room_types = room_types.filter(hotel_id=options['hotel'])
+
+        began = time.monotonic()
+        rows = 0
+        hotels = {}
+        for room_type_id, hotel_id in room_types.values_list('id', 'hotel_id'):
+            hotels.setdefault(hotel_id, []).append(room_type_id)
+
+        for hotel_id, room_type_ids in hotels.items():
+            with transaction.atomic():
+                booked = count_booked_rooms(room_type_ids, start, end)
+                rows += rebuild_calendar(room_type_ids, start, end, booked=booked)
+
+        elapsed = time.monotonic() - began
+        self.stdout.write(
+            f'Rebuilt {rows} night(s) for {sum(map(len, hotels.values()))} room type(s) '
+            f'from {start} to {end} in {elapsed:.2f}s'
+        )
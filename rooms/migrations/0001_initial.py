@@ -0,0 +1,83 @@
+# Generated by Django 6.0 on 2026-10-18 06:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0004_auth_user_upper_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('base_rate', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('max_occupancy', models.PositiveSmallIntegerField(default=2)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_types', to='accounts.hotel')),
+            ],
+            options={
+                'verbose_name': 'Room Type',
+                'verbose_name_plural': 'Room Types',
+                'ordering': ['hotel', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Room',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.CharField(max_length=20)),
+                ('floor', models.SmallIntegerField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rooms', to='accounts.hotel')),
+                ('room_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='rooms', to='rooms.roomtype')),
+            ],
+            options={
+                'verbose_name': 'Room',
+                'verbose_name_plural': 'Rooms',
+                'ordering': ['hotel', 'number'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RoomTypeAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_rooms', models.PositiveIntegerField(default=0)),
+                ('booked_rooms', models.PositiveIntegerField(default=0)),
+                ('room_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='rooms.roomtype')),
+            ],
+            options={
+                'verbose_name': 'Room Type Availability',
+                'verbose_name_plural': 'Room Type Availability',
+                'ordering': ['room_type', 'date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='roomtype',
+            constraint=models.UniqueConstraint(fields=('hotel', 'name'), name='unique_room_type_per_hotel'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['room_type', 'is_active'], name='room_type_active_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='room',
+            constraint=models.UniqueConstraint(fields=('hotel', 'number'), name='unique_room_number_per_hotel'),
+        ),
+        migrations.AddConstraint(
+            model_name='roomtypeavailability',
+            constraint=models.UniqueConstraint(fields=('room_type', 'date'), name='unique_room_type_night'),
+        ),
+    ]
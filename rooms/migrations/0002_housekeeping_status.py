@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='housekeeping_status',
+            field=models.CharField(choices=[('dirty', 'Dirty'), ('clean', 'Clean'), ('inspected', 'Inspected')], default='clean', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='housekeeping_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
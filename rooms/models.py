@@ -1,3 +1,89 @@
 from django.db import models
+from accounts.models import Hotel
 
-# Create your models here.
+
+class RoomType(models.Model):
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='room_types')
+    name = models.CharField(max_length=100)
+    description = models.TextField(blank=True)
+    base_rate = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    max_occupancy = models.PositiveSmallIntegerField(default=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Room Type'
+        verbose_name_plural = 'Room Types'
+        ordering = ['hotel', 'name']
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'name'], name='unique_room_type_per_hotel'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.hotel})'
+
+
+class Room(models.Model):
+    HOUSEKEEPING_DIRTY = 'dirty'
+    HOUSEKEEPING_CLEAN = 'clean'
+    HOUSEKEEPING_INSPECTED = 'inspected'
+    HOUSEKEEPING_CHOICES = [
+        (HOUSEKEEPING_DIRTY, 'Dirty'),
+        (HOUSEKEEPING_CLEAN, 'Clean'),
+        (HOUSEKEEPING_INSPECTED, 'Inspected'),
+    ]
+
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='rooms')
+    room_type = models.ForeignKey(RoomType, on_delete=models.PROTECT, related_name='rooms')
+    number = models.CharField(max_length=20)
+    floor = models.SmallIntegerField(blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    # Changed through rooms.housekeeping, which notifies live task boards
+    housekeeping_status = models.CharField(
+        max_length=10, choices=HOUSEKEEPING_CHOICES, default=HOUSEKEEPING_CLEAN
+    )
+    housekeeping_updated_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Room'
+        verbose_name_plural = 'Rooms'
+        ordering = ['hotel', 'number']
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'number'], name='unique_room_number_per_hotel'),
+        ]
+        indexes = [
+            models.Index(fields=['room_type', 'is_active'], name='room_type_active_idx'),
+        ]
+
+    def __str__(self):
+        return f'Room {self.number} ({self.hotel})'
+
+
+class RoomTypeAvailability(models.Model):
+    """
+    One row per room type per night, maintained by rooms.availability.
+
+    free rooms = total_rooms - booked_rooms
+    """
+    room_type = models.ForeignKey(RoomType, on_delete=models.CASCADE, related_name='availability')
+    date = models.DateField()
+    total_rooms = models.PositiveIntegerField(default=0)
+    booked_rooms = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Room Type Availability'
+        verbose_name_plural = 'Room Type Availability'
+        ordering = ['room_type', 'date']
+        constraints = [
+            # Also serves as the (room_type, date) index for range lookups
+            models.UniqueConstraint(fields=['room_type', 'date'], name='unique_room_type_night'),
+        ]
+
+    def __str__(self):
+        return f'{self.room_type.name} {self.date}: {self.available_rooms}/{self.total_rooms}'
+
+    @property
+    def available_rooms(self):
+        return self.total_rooms - self.booked_rooms
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('housekeeping/events/', views.housekeeping_events_view, name='housekeeping_events'),
+    path('housekeeping/<int:room_id>/status/', views.housekeeping_status_view, name='housekeeping_status'),
+]
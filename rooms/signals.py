@@ -0,0 +1,30 @@
+"""
+Keep RoomTypeAvailability.total_rooms in step with the rooms of each type.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .availability import sync_total_rooms
+from .models import Room
+
+
+@receiver(pre_save, sender=Room)
+def remember_room_type(sender, instance, **kwargs):
+    instance._previous_room_type_id = (
+        Room.objects.filter(pk=instance.pk).values_list('room_type_id', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Room)
+def room_saved(sender, instance, **kwargs):
+    sync_total_rooms(instance.room_type_id)
+    previous = getattr(instance, '_previous_room_type_id', None)
+    if previous and previous != instance.room_type_id:
+        sync_total_rooms(previous)
+
+
+@receiver(post_delete, sender=Room)
+def room_deleted(sender, instance, **kwargs):
+    sync_total_rooms(instance.room_type_id)
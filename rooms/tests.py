@@ -1,3 +1,317 @@
-from django.test import TestCase
+import asyncio
+import json
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.test import TestCase, TransactionTestCase, tag
+from django.utils import timezone
+
+from accounts.models import Hotel
+from bookings.models import Booking
+from . import housekeeping
+from .availability import CALENDAR_HORIZON_DAYS, get_available_room_types, reserve
+from .housekeeping import NOTIFY_CHANNEL, broker, room_event, set_housekeeping_status
+from .models import Room, RoomType, RoomTypeAvailability
+
+
+class HousekeepingMixin:
+    def setUp(self):
+        self.user = User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+        self.hotel = Hotel.objects.create(user=self.user, hotel_name='Lakeside Inn', mobile_number='9812345670')
+        room_type = RoomType.objects.create(hotel=self.hotel, name='Deluxe')
+        self.rooms = Room.objects.bulk_create(
+            Room(hotel=self.hotel, room_type=room_type, number=str(101 + i)) for i in range(20)
+        )
+        # The broker thread holds a connection to the test database
+        self.addCleanup(broker.stop)
+
+
+class BrokerTests(HousekeepingMixin, TransactionTestCase):
+    async def subscribe(self):
+        listener = broker.subscribe(self.hotel.pk)
+        self.addCleanup(broker.unsubscribe, self.hotel.pk, listener)
+        await broker.wait_listening()
+        self.assertTrue(broker.listening.is_set())
+        return listener
+
+    async def test_committed_change_reaches_board(self):
+        listener = await self.subscribe()
+
+        room = await sync_to_async(set_housekeeping_status)(self.rooms[0], 'clean')
+
+        changes = await listener.changes(5)
+        self.assertEqual(changes, [room_event(room.pk, room.number, 'clean', room.housekeeping_updated_at)])
+
+    async def test_burst_is_coalesced_per_room(self):
+        listener = await self.subscribe()
+
+        for status in ['dirty', 'clean', 'inspected']:
+            await sync_to_async(set_housekeeping_status)(self.rooms[0], status)
+        await sync_to_async(set_housekeeping_status)(self.rooms[1], 'dirty')
+        await asyncio.sleep(0.5)
+
+        changes = await listener.changes(5)
+        self.assertEqual(
+            sorted((change['id'], change['status']) for change in changes),
+            [(self.rooms[0].pk, 'inspected'), (self.rooms[1].pk, 'dirty')],
+        )
+
+    async def test_rolled_back_change_is_not_sent(self):
+        listener = await self.subscribe()
+
+        def change_then_fail():
+            with transaction.atomic():
+                set_housekeeping_status(self.rooms[0], 'clean')
+                raise RuntimeError('rolled back')
+
+        with self.assertRaises(RuntimeError):
+            await sync_to_async(change_then_fail)()
+        self.assertEqual(await listener.changes(0.5), [])
+
+    async def test_change_from_another_worker(self):
+        listener = await self.subscribe()
+        event = {'id': self.rooms[1].pk, 'number': '102', 'status': 'dirty', 'updated_at': None}
+
+        def notify_from_other_process():
+            # Another worker's connection, not this process's broker
+            other = connections.create_connection('default')
+            try:
+                with other.cursor() as cursor:
+                    cursor.execute(
+                        'SELECT pg_notify(%s, %s)',
+                        [NOTIFY_CHANNEL, json.dumps({'hotel': self.hotel.pk, 'event': event})],
+                    )
+            finally:
+                other.close()
+
+        await sync_to_async(notify_from_other_process, thread_sensitive=False)()
+        self.assertEqual(await listener.changes(5), [event])
+
+    async def test_changes_for_other_hotels_are_not_sent(self):
+        listener = await self.subscribe()
+        other_user = await sync_to_async(User.objects.create_user)('other', 'other@example.com', 'Str0ng!Pass')
+        other_hotel = await sync_to_async(Hotel.objects.create)(
+            user=other_user, hotel_name='Hilltop', mobile_number='9812345671',
+        )
+        other_type = await sync_to_async(RoomType.objects.create)(hotel=other_hotel, name='Standard')
+        other_room = await sync_to_async(Room.objects.create)(hotel=other_hotel, room_type=other_type, number='1')
+
+        await sync_to_async(set_housekeeping_status)(other_room, 'clean')
+        self.assertEqual(await listener.changes(0.5), [])
+
+    async def test_malformed_notification_is_skipped(self):
+        listener = await self.subscribe()
+
+        def notify_raw(payload):
+            with connections['default'].cursor() as cursor:
+                cursor.execute('SELECT pg_notify(%s, %s)', [NOTIFY_CHANNEL, payload])
+
+        with self.assertLogs('rooms.housekeeping', 'WARNING'):
+            await sync_to_async(notify_raw)('not json')
+            await sync_to_async(notify_raw)('{"hotel": 1}')
+            room = await sync_to_async(set_housekeeping_status)(self.rooms[0], 'clean')
+            await asyncio.sleep(0.5)
+
+        self.assertEqual([change['id'] for change in await listener.changes(5)], [room.pk])
+
+    async def test_thread_survives_unexpected_errors(self):
+        listener = await self.subscribe()
+        publish = broker.publish
+        failed = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def fail_once(hotel_id, event):
+            if not failed.is_set():
+                loop.call_soon_threadsafe(failed.set)
+                raise RuntimeError('driver bug')
+            return publish(hotel_id, event)
+
+        with mock.patch.object(housekeeping, 'RECONNECT_SECONDS', 0.05), \
+                mock.patch.object(broker, 'publish', fail_once), \
+                self.assertLogs('rooms.housekeeping', 'ERROR'):
+            await sync_to_async(set_housekeeping_status)(self.rooms[0], 'dirty')
+            await asyncio.wait_for(failed.wait(), 5)
+
+            # The thread reconnects; changes made meanwhile are not replayed
+            changes = []
+            for _ in range(10):
+                room = await sync_to_async(set_housekeeping_status)(self.rooms[1], 'clean')
+                changes = await listener.changes(0.5)
+                if changes:
+                    break
+        self.assertTrue(broker.thread.is_alive())
+        self.assertEqual([change['id'] for change in changes], [room.pk])
+
+
+class EventStream:
+    """One board connected to the ASGI app: parses the server-sent events it receives"""
+
+    def __init__(self):
+        self.requested = False
+        self.closed = asyncio.Event()
+        self.status = None
+        self.buffer = ''
+        self.events = []
+        self.received = {}
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.closed.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+            return
+        self.buffer += message.get('body', b'').decode()
+        while '\n\n' in self.buffer:
+            block, self.buffer = self.buffer.split('\n\n', 1)
+            if not block.startswith('event: '):
+                continue
+            name, data = block[len('event: '):].split('\ndata: ', 1)
+            self.events.append(name)
+            if name == 'changes':
+                for room in json.loads(data):
+                    self.received.setdefault((room['id'], room['status']), time.perf_counter())
+
+
+@tag('load')
+class HousekeepingLoadTests(HousekeepingMixin, TransactionTestCase):
+    """1,000 boards on one worker's event loop, fed through PostgreSQL NOTIFY"""
+
+    CONNECTIONS = 1000
+    CONNECT_TIMEOUT = 120
+    # Generous; locally the last board has a change within 200 ms
+    MAX_FAN_OUT_SECONDS = 2.0
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.cookie = f'sessionid={self.client.cookies["sessionid"].value}'.encode()
+
+    def scope(self):
+        return {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'query_string': b'', 'root_path': '',
+            'path': '/rooms/housekeeping/events/', 'raw_path': b'/rooms/housekeeping/events/',
+            'headers': [(b'host', b'testserver'), (b'cookie', self.cookie)],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+
+    async def wait_for(self, condition, timeout, message):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                self.fail(message)
+            await asyncio.sleep(0.005)
+
+    async def test_thousand_boards(self):
+        app = get_asgi_application()
+        boards = [EventStream() for _ in range(self.CONNECTIONS)]
+        requests = [asyncio.create_task(app(self.scope(), board.receive, board.send)) for board in boards]
+        try:
+            await self.wait_for(
+                lambda: all('snapshot' in board.events for board in boards),
+                self.CONNECT_TIMEOUT, 'Not every board received its snapshot',
+            )
+            self.assertEqual({board.status for board in boards}, {200})
+            self.assertEqual(broker.listener_count(self.hotel.pk), self.CONNECTIONS)
+
+            latencies = []
+            for i, room in enumerate(self.rooms):
+                status = ['dirty', 'clean', 'inspected'][i % 3]
+                started = time.perf_counter()
+                await sync_to_async(set_housekeeping_status)(room, status)
+                await self.wait_for(
+                    lambda: all((room.pk, status) in board.received for board in boards),
+                    10, f'Room {room.number} did not reach every board',
+                )
+                latencies.append(max(board.received[room.pk, status] for board in boards) - started)
+            latencies.sort()
+            self.assertLess(latencies[-1], self.MAX_FAN_OUT_SECONDS)
+
+        finally:
+            for board in boards:
+                board.closed.set()
+            await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), 30)
+
+        self.assertEqual(broker.listener_count(), 0)
+
+
+@tag('load')
+class AvailabilityLoadTests(TestCase):
+    """The calendar for 500 rooms over a year of back-to-back bookings"""
+
+    ROOM_TYPES = 10
+    ROOMS = 500
+    STAY_NIGHTS = 3
+    MAX_REBUILD_SECONDS = 30.0
+    SEARCHES = 100
+    MAX_SEARCH_MS = 20.0
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+        cls.hotel = Hotel.objects.create(user=user, hotel_name='Lakeside Inn', mobile_number='9812345670')
+        cls.room_types = RoomType.objects.bulk_create(
+            RoomType(hotel=cls.hotel, name=f'Type {i}') for i in range(cls.ROOM_TYPES)
+        )
+        rooms = Room.objects.bulk_create(
+            Room(hotel=cls.hotel, room_type=cls.room_types[i % cls.ROOM_TYPES], number=str(i + 1))
+            for i in range(cls.ROOMS)
+        )
+        cls.today = timezone.localdate()
+        # Three in every four rooms are booked solid, one stay after another
+        booked_rooms = [room for room in rooms if int(room.number) % 4]
+        Booking.objects.bulk_create(
+            (
+                Booking(
+                    hotel=cls.hotel, room=room, guest_name=f'Guest {room.number}',
+                    stay=DateRange(cls.today + timedelta(days=day), cls.today + timedelta(days=day + cls.STAY_NIGHTS)),
+                )
+                for room in booked_rooms
+                for day in range(0, CALENDAR_HORIZON_DAYS, cls.STAY_NIGHTS)
+            ),
+            batch_size=5000,
+        )
+        cls.expected = {room_type.pk: (0, 0) for room_type in cls.room_types}
+        for room in rooms:
+            total, booked = cls.expected[room.room_type_id]
+            cls.expected[room.room_type_id] = (total + 1, booked + (room in booked_rooms))
+
+    def test_rebuild_and_search(self):
+        began = time.perf_counter()
+        call_command('rebuild_availability', hotel=self.hotel.pk, stdout=StringIO())
+        self.assertLess(time.perf_counter() - began, self.MAX_REBUILD_SECONDS)
+
+        nights = RoomTypeAvailability.objects.filter(room_type__hotel=self.hotel)
+        self.assertEqual(nights.count(), self.ROOM_TYPES * CALENDAR_HORIZON_DAYS)
+        self.assertEqual(
+            set(nights.values_list('room_type_id', 'total_rooms', 'booked_rooms').distinct()),
+            {(room_type_id, *counts) for room_type_id, counts in self.expected.items()},
+        )
+        with_free_rooms = {room_type_id for room_type_id, (total, booked) in self.expected.items() if booked < total}
+
+        began = time.perf_counter()
+        for i in range(self.SEARCHES):
+            check_in = self.today + timedelta(days=i * 3)
+            available = list(get_available_room_types(self.hotel, check_in, check_in + timedelta(days=4)))
+        elapsed_ms = (time.perf_counter() - began) * 1000 / self.SEARCHES
+        self.assertEqual({room_type.pk for room_type in available}, with_free_rooms)
+        self.assertLess(elapsed_ms, self.MAX_SEARCH_MS)
+
+        began = time.perf_counter()
+        for i in range(self.SEARCHES):
+            check_in = self.today + timedelta(days=i * 3)
+            reserve(available[i % len(available)].pk, check_in, check_in + timedelta(days=4))
+        self.assertLess((time.perf_counter() - began) * 1000 / self.SEARCHES, self.MAX_SEARCH_MS)
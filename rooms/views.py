@@ -1,3 +1,100 @@
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.contrib.auth.decorators import login_required
+from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.http import require_http_methods
+import json
 
-# Create your views here.
+from .housekeeping import board_snapshot, broker, room_event, set_housekeeping_status
+from .models import Room
+
+
+# Comment lines keep idle connections open through proxies
+HEARTBEAT_SECONDS = 15
+
+
+def _no_hotel():
+    return JsonResponse({
+        'success': False,
+        'message': 'No hotel profile found. Please contact support.'
+    }, status=403)
+
+
+def _sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+# #############################################################
+# HOUSEKEEPING STATUS VIEW
+# #############################################################
+@login_required
+@csrf_protect
+@require_http_methods(["POST"])
+def housekeeping_status_view(request, room_id):
+    """Mark a room dirty, clean or inspected"""
+    hotel = getattr(request.user, 'hotel', None)
+    if hotel is None:
+        return _no_hotel()
+
+    try:
+        status = json.loads(request.body).get('status', '')
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid request format.'
+        }, status=400)
+
+    room = Room.objects.filter(hotel=hotel, pk=room_id).first()
+    if room is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'Room not found.'
+        }, status=404)
+
+    try:
+        set_housekeeping_status(room, status)
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Status must be dirty, clean or inspected.'
+        }, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'room': room_event(room.pk, room.number, room.housekeeping_status, room.housekeeping_updated_at),
+    })
+
+
+# #############################################################
+# HOUSEKEEPING EVENTS VIEW (ASGI)
+# #############################################################
+@login_required
+@require_http_methods(["GET"])
+async def housekeeping_events_view(request):
+    """
+    Server-sent events for the housekeeping board: a `snapshot` of every
+    room on connect, then `changes` with only the rooms that changed.
+    Needs an ASGI server; each connection is a coroutine, not a thread.
+    """
+    user = await request.auser()
+    hotel = await sync_to_async(getattr)(user, 'hotel', None)
+    if hotel is None:
+        return _no_hotel()
+
+    async def stream():
+        # Subscribe before the snapshot so no change falls in between
+        listener = broker.subscribe(hotel.pk)
+        try:
+            await broker.wait_listening()
+            yield _sse('snapshot', await sync_to_async(board_snapshot)(hotel.pk))
+            while True:
+                changes = await listener.changes(HEARTBEAT_SECONDS)
+                yield _sse('changes', changes) if changes else ': keep-alive\n\n'
+        finally:
+            broker.unsubscribe(hotel.pk, listener)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import Hotel
+from staff.models import Employee
+from staff.scheduling import DEFAULT_TIME_BUDGET, RosterPublished, build_roster
+
+
+class Command(BaseCommand):
+    help = "Build next week's staff roster from forecast occupancy"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotel', type=int, help='Only build this hotel id')
+        parser.add_argument('--week', type=date.fromisoformat,
+                            help='Monday the week starts on (YYYY-MM-DD), default next Monday')
+        parser.add_argument('--time-budget', type=float, default=DEFAULT_TIME_BUDGET,
+                            help='Seconds the solver may spend per hotel')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        week_start = options['week'] or today + timedelta(days=7 - today.weekday())
+        if week_start.weekday() != 0:
+            raise CommandError('--week must be a Monday')
+
+        hotels = Hotel.objects.filter(
+            id__in=Employee.objects.filter(is_active=True).values('hotel_id')
+        ).order_by('id')
+        if options['hotel']:
+            hotels = hotels.filter(id=options['hotel'])
+
+        for hotel in hotels:
+            try:
+                roster, result = build_roster(hotel, week_start, options['time_budget'], options['seed'])
+            except RosterPublished as e:
+                self.stdout.write(self.style.WARNING(f'  {hotel}: {e}'))
+                continue
+
+            message = (
+                f'  {hotel}: {len(result["assignments"])} shift(s), {result["unfilled"]} unfilled, '
+                f'score {result["score"]:.0f}, {result["iterations"]} iteration(s) in {result["elapsed_ms"]} ms'
+            )
+            self.stdout.write(self.style.WARNING(message) if result['unfilled'] else message)
+
+        self.stdout.write(self.style.SUCCESS(f'Rosters built for the week of {week_start}'))
@@ -0,0 +1,86 @@
+# Generated by Django 6.0 on 2026-10-18 06:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0004_auth_user_upper_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Employee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('department', models.CharField(choices=[('front_desk', 'Front Desk'), ('housekeeping', 'Housekeeping')], max_length=20)),
+                ('skills', models.JSONField(blank=True, default=list)),
+                ('max_hours_per_week', models.PositiveSmallIntegerField(default=40)),
+                ('hourly_rate', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='employees', to='accounts.hotel')),
+            ],
+            options={
+                'verbose_name': 'Employee',
+                'verbose_name_plural': 'Employees',
+                'ordering': ['department', 'first_name', 'last_name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Roster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField()),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('published', 'Published')], default='draft', max_length=10)),
+                ('occupancy', models.JSONField(default=dict)),
+                ('unfilled_shifts', models.PositiveIntegerField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('solve_ms', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rosters', to='accounts.hotel')),
+            ],
+            options={
+                'verbose_name': 'Roster',
+                'verbose_name_plural': 'Rosters',
+                'ordering': ['-week_start'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Shift',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(choices=[('front_desk', 'Front Desk'), ('housekeeping', 'Housekeeping')], max_length=20)),
+                ('date', models.DateField()),
+                ('shift', models.CharField(choices=[('morning', 'Morning (07:00-15:00)'), ('evening', 'Evening (15:00-23:00)'), ('night', 'Night (23:00-07:00)')], max_length=10)),
+                ('required_skill', models.CharField(blank=True, max_length=30)),
+                ('employee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='shifts', to='staff.employee')),
+                ('roster', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shifts', to='staff.roster')),
+            ],
+            options={
+                'verbose_name': 'Shift',
+                'verbose_name_plural': 'Shifts',
+                'ordering': ['date', 'shift', 'department'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['hotel', 'department'], name='employee_hotel_dept_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='roster',
+            constraint=models.UniqueConstraint(fields=('hotel', 'week_start'), name='unique_roster_per_week'),
+        ),
+        migrations.AddIndex(
+            model_name='shift',
+            index=models.Index(fields=['employee', 'date'], name='shift_employee_date_idx'),
+        ),
+    ]
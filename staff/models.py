@@ -1,3 +1,101 @@
 from django.db import models
+from accounts.models import Hotel
 
-# Create your models here.
+
+class Employee(models.Model):
+    DEPARTMENT_FRONT_DESK = 'front_desk'
+    DEPARTMENT_HOUSEKEEPING = 'housekeeping'
+    DEPARTMENT_CHOICES = [
+        (DEPARTMENT_FRONT_DESK, 'Front Desk'),
+        (DEPARTMENT_HOUSEKEEPING, 'Housekeeping'),
+    ]
+
+    SKILL_SUPERVISOR = 'supervisor'
+    SKILL_NIGHT_AUDIT = 'night_audit'
+
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='employees')
+    first_name = models.CharField(max_length=150)
+    last_name = models.CharField(max_length=150, blank=True)
+    department = models.CharField(max_length=20, choices=DEPARTMENT_CHOICES)
+    # e.g. ["supervisor", "night_audit"]
+    skills = models.JSONField(default=list, blank=True)
+    max_hours_per_week = models.PositiveSmallIntegerField(default=40)
+    hourly_rate = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Employee'
+        verbose_name_plural = 'Employees'
+        ordering = ['department', 'first_name', 'last_name']
+        indexes = [
+            models.Index(fields=['hotel', 'department'], name='employee_hotel_dept_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.first_name} {self.last_name}'.strip()
+
+
+class Roster(models.Model):
+    """One week of shifts (Monday to Sunday) built by staff.scheduling"""
+    STATUS_DRAFT = 'draft'
+    STATUS_PUBLISHED = 'published'
+    STATUS_CHOICES = [
+        (STATUS_DRAFT, 'Draft'),
+        (STATUS_PUBLISHED, 'Published'),
+    ]
+
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='rosters')
+    week_start = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_DRAFT)
+    # Occupied rooms per day the roster was planned for
+    occupancy = models.JSONField(default=dict)
+    unfilled_shifts = models.PositiveIntegerField(default=0)
+    score = models.FloatField(default=0)
+    solve_ms = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Roster'
+        verbose_name_plural = 'Rosters'
+        ordering = ['-week_start']
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'week_start'], name='unique_roster_per_week'),
+        ]
+
+    def __str__(self):
+        return f'{self.hotel} week of {self.week_start}'
+
+
+class Shift(models.Model):
+    SHIFT_MORNING = 'morning'
+    SHIFT_EVENING = 'evening'
+    SHIFT_NIGHT = 'night'
+    SHIFT_CHOICES = [
+        (SHIFT_MORNING, 'Morning (07:00-15:00)'),
+        (SHIFT_EVENING, 'Evening (15:00-23:00)'),
+        (SHIFT_NIGHT, 'Night (23:00-07:00)'),
+    ]
+
+    roster = models.ForeignKey(Roster, on_delete=models.CASCADE, related_name='shifts')
+    # Empty when the scheduler could not fill the shift
+    employee = models.ForeignKey(
+        Employee, on_delete=models.SET_NULL, related_name='shifts', blank=True, null=True
+    )
+    department = models.CharField(max_length=20, choices=Employee.DEPARTMENT_CHOICES)
+    date = models.DateField()
+    shift = models.CharField(max_length=10, choices=SHIFT_CHOICES)
+    required_skill = models.CharField(max_length=30, blank=True)
+
+    class Meta:
+        verbose_name = 'Shift'
+        verbose_name_plural = 'Shifts'
+        ordering = ['date', 'shift', 'department']
+        indexes = [
+            models.Index(fields=['employee', 'date'], name='shift_employee_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.date} {self.get_shift_display()} - {self.employee or "Unfilled"}'
@@ -0,0 +1,292 @@
+"""
+Weekly roster builder.
+
+Staffing demand comes from forecast occupancy (reports.forecasting, or the
+on-the-books counts in the rollups when no forecast is available) and is
+turned into shift slots per day and department. Slots are then filled in
+two phases:
+
+1. Greedy construction, most constrained slot first (fewest qualified
+   employees), giving each slot to the qualified employee with the fewest
+   shifts so far.
+2. Local search until the time budget runs out or nothing improves: an
+   unfilled slot is given to someone whose blocking shift can be handed to
+   a colleague (a one-step ejection chain), and shifts are moved from busier
+   to quieter colleagues to even out hours.
+
+Every move keeps the labour rules: one shift a day, at least MIN_REST_HOURS
+between shifts, and each employee's weekly hour limit. The rest rule also
+covers the night before the week, from the previous roster's last day.
+"""
+
+import math
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+
+from reports.forecasting import ForecastUnavailable, get_forecast
+from reports.models import HotelStatsRollup
+from .models import Employee, Roster, Shift
+
+
+SHIFT_HOURS = 8
+SHIFT_STARTS = {Shift.SHIFT_MORNING: 7, Shift.SHIFT_EVENING: 15, Shift.SHIFT_NIGHT: 23}
+MIN_REST_HOURS = 11
+
+ROOMS_PER_ATTENDANT = 14
+ROOMS_PER_TURNDOWN_ATTENDANT = 60
+ROOMS_PER_DESK_AGENT = 80
+ATTENDANTS_PER_SUPERVISOR = 10
+
+DEFAULT_TIME_BUDGET = 5.0
+UNFILLED_PENALTY = 1000
+
+
+class RosterPublished(Exception):
+    """A published roster is not rebuilt"""
+
+
+def staffing_demand(occupancy):
+    """
+    Shift slots for a week as (day index, department, shift, required
+    skill) tuples, given occupied rooms for each of the 7 days.
+    """
+    housekeeping = Employee.DEPARTMENT_HOUSEKEEPING
+    front_desk = Employee.DEPARTMENT_FRONT_DESK
+    slots = []
+    for day, occupied in enumerate(occupancy):
+        attendants = max(1, math.ceil(occupied / ROOMS_PER_ATTENDANT))
+        demand = [
+            (housekeeping, Shift.SHIFT_MORNING, Employee.SKILL_SUPERVISOR,
+             math.ceil(attendants / ATTENDANTS_PER_SUPERVISOR)),
+            (housekeeping, Shift.SHIFT_MORNING, '', attendants),
+            (housekeeping, Shift.SHIFT_EVENING, '', max(1, math.ceil(occupied / ROOMS_PER_TURNDOWN_ATTENDANT))),
+            (front_desk, Shift.SHIFT_MORNING, '', 1 + occupied // ROOMS_PER_DESK_AGENT),
+            (front_desk, Shift.SHIFT_EVENING, '', 1 + occupied // ROOMS_PER_DESK_AGENT),
+            (front_desk, Shift.SHIFT_NIGHT, Employee.SKILL_NIGHT_AUDIT, 1),
+        ]
+        for department, shift, skill, count in demand:
+            slots.extend([(day, department, shift, skill)] * count)
+    return slots
+
+
+class RosterSolver:
+    """
+    Assign `slots` (from staffing_demand) to `employees`, dicts with id,
+    department, skills and max_hours_per_week. `previous_shifts` maps
+    employee ids to the shift they work the day before the week.
+    """
+
+    def __init__(self, slots, employees, seed=0, previous_shifts=None):
+        self.slots = slots
+        self.employees = employees
+        self.random = random.Random(seed)
+        self.max_shifts = [employee['max_hours_per_week'] // SHIFT_HOURS for employee in employees]
+        self.assigned = [None] * len(slots)
+        # Per employee: {day: slot index}
+        self.days = [{} for _ in employees]
+        # Per employee: start hour of their shift on day -1, or None. Fixed,
+        # so it only limits rest and never counts towards this week's hours.
+        previous_shifts = previous_shifts or {}
+        self.previous_starts = [
+            SHIFT_STARTS[previous_shifts[employee['id']]] - 24 if employee['id'] in previous_shifts else None
+            for employee in employees
+        ]
+
+        qualified = defaultdict(list)
+        for index, employee in enumerate(employees):
+            skills = set(employee['skills'])
+            for department, shift, skill in {(s[1], s[2], s[3]) for s in slots}:
+                if employee['department'] == department and (not skill or skill in skills):
+                    qualified[department, shift, skill].append(index)
+        self.qualified = [qualified[slot[1], slot[2], slot[3]] for slot in slots]
+
+    def _start(self, slot):
+        day, _, shift, _ = self.slots[slot]
+        return day * 24 + SHIFT_STARTS[shift]
+
+    def can_take(self, employee, slot, releasing=None):
+        """Whether `employee` may work `slot`, optionally after giving up `releasing`"""
+        day = self.slots[slot][0]
+        days = self.days[employee]
+        working = len(days) - (releasing is not None and self.assigned[releasing] == employee)
+        if working >= self.max_shifts[employee]:
+            return False
+        if days.get(day, releasing) != releasing:
+            return False
+
+        start = self._start(slot)
+        neighbours = [
+            self._start(other)
+            for other in (days.get(day - 1), days.get(day + 1))
+            if other is not None and other != releasing
+        ]
+        if day == 0 and self.previous_starts[employee] is not None:
+            neighbours.append(self.previous_starts[employee])
+        for other_start in neighbours:
+            if other_start < start:
+                rest = start - other_start - SHIFT_HOURS
+            else:
+                rest = other_start - start - SHIFT_HOURS
+            if rest < MIN_REST_HOURS:
+                return False
+        return True
+
+    def assign(self, slot, employee):
+        previous = self.assigned[slot]
+        if previous is not None:
+            del self.days[previous][self.slots[slot][0]]
+        self.assigned[slot] = employee
+        if employee is not None:
+            self.days[employee][self.slots[slot][0]] = slot
+
+    def construct(self):
+        order = sorted(range(len(self.slots)), key=lambda slot: (len(self.qualified[slot]), self.slots[slot][0]))
+        for slot in order:
+            candidates = [employee for employee in self.qualified[slot] if self.can_take(employee, slot)]
+            if candidates:
+                self.assign(slot, min(candidates, key=lambda employee: len(self.days[employee])))
+
+    def _fill(self, slot):
+        """Fill an empty slot, moving one blocking shift to a colleague if needed"""
+        candidates = list(self.qualified[slot])
+        self.random.shuffle(candidates)
+        for employee in candidates:
+            if self.can_take(employee, slot):
+                self.assign(slot, employee)
+                return True
+
+        for employee in candidates:
+            # Blocked by a shift that day, too little rest, or the weekly limit
+            for blocking in list(self.days[employee].values()):
+                if not self.can_take(employee, slot, releasing=blocking):
+                    continue
+                for colleague in self.qualified[blocking]:
+                    if colleague != employee and self.can_take(colleague, blocking):
+                        self.assign(blocking, colleague)
+                        self.assign(slot, employee)
+                        return True
+        return False
+
+    def _balance(self, slot):
+        """Move a shift to a colleague with at least two fewer shifts"""
+        employee = self.assigned[slot]
+        load = len(self.days[employee])
+        for colleague in self.qualified[slot]:
+            if len(self.days[colleague]) < load - 1 and self.can_take(colleague, slot):
+                self.assign(slot, colleague)
+                return True
+        return False
+
+    def improve(self, deadline):
+        iterations = 0
+        stalled = 0
+        patience = max(1000, 20 * len(self.slots))
+        while stalled < patience and time.monotonic() < deadline:
+            iterations += 1
+            unfilled = [slot for slot, employee in enumerate(self.assigned) if employee is None]
+            if unfilled and self.random.random() < 0.5:
+                improved = self._fill(self.random.choice(unfilled))
+            else:
+                slot = self.random.randrange(len(self.slots))
+                improved = self.assigned[slot] is not None and self._balance(slot)
+            stalled = 0 if improved else stalled + 1
+        return iterations
+
+    def score(self):
+        """Unfilled slots dominate; then the spread of shifts within each department"""
+        loads = defaultdict(list)
+        for index, employee in enumerate(self.employees):
+            loads[employee['department']].append(len(self.days[index]))
+        spread = sum(
+            sum((load - sum(values) / len(values)) ** 2 for load in values)
+            for values in loads.values()
+        )
+        return self.assigned.count(None) * UNFILLED_PENALTY + spread
+
+    def solve(self, time_budget=DEFAULT_TIME_BUDGET):
+        began = time.monotonic()
+        if self.slots:
+            self.construct()
+            iterations = self.improve(began + time_budget)
+        else:
+            iterations = 0
+        return {
+            'assignments': [
+                None if employee is None else self.employees[employee]['id'] for employee in self.assigned
+            ],
+            'unfilled': self.assigned.count(None),
+            'score': self.score(),
+            'iterations': iterations,
+            'elapsed_ms': int((time.monotonic() - began) * 1000),
+        }
+
+
+def forecast_occupancy(hotel, week_start):
+    """Occupied rooms for each day of the week: forecast, else on the books"""
+    days = [week_start + timedelta(days=i) for i in range(7)]
+    occupied = {}
+    try:
+        forecast = get_forecast(hotel)
+        for index, day in enumerate(forecast['dates']):
+            occupied[day] = sum(room_type['forecast'][index] for room_type in forecast['room_types'])
+    except ForecastUnavailable:
+        pass
+
+    missing = [day for day in days if day.isoformat() not in occupied]
+    if missing:
+        occupied.update(
+            (row['period_start'].isoformat(), row['rooms_sold'])
+            for row in HotelStatsRollup.objects.filter(
+                hotel=hotel, period=HotelStatsRollup.PERIOD_DAY, period_start__in=missing,
+            ).values('period_start', 'rooms_sold')
+        )
+    return [round(occupied.get(day.isoformat(), 0)) for day in days]
+
+
+def build_roster(hotel, week_start, time_budget=DEFAULT_TIME_BUDGET, seed=0):
+    """Plan the week starting `week_start` (a Monday) and store it as a draft roster"""
+    employees = list(
+        Employee.objects
+        .filter(hotel=hotel, is_active=True)
+        .order_by('id')
+        .values('id', 'department', 'skills', 'max_hours_per_week')
+    )
+    occupancy = forecast_occupancy(hotel, week_start)
+    slots = staffing_demand(occupancy)
+    previous_shifts = dict(
+        Shift.objects
+        .filter(roster__hotel=hotel, date=week_start - timedelta(days=1), employee__isnull=False)
+        .values_list('employee_id', 'shift')
+    )
+    result = RosterSolver(slots, employees, seed=seed, previous_shifts=previous_shifts).solve(time_budget)
+
+    with transaction.atomic():
+        roster, created = Roster.objects.select_for_update().get_or_create(hotel=hotel, week_start=week_start)
+        if roster.status == Roster.STATUS_PUBLISHED:
+            raise RosterPublished(f'The roster for the week of {week_start} is already published.')
+
+        roster.occupancy = {
+            (week_start + timedelta(days=i)).isoformat(): occupied for i, occupied in enumerate(occupancy)
+        }
+        roster.unfilled_shifts = result['unfilled']
+        roster.score = result['score']
+        roster.solve_ms = result['elapsed_ms']
+        roster.save()
+
+        roster.shifts.all().delete()
+        Shift.objects.bulk_create([
+            Shift(
+                roster=roster,
+                employee_id=employee_id,
+                department=department,
+                date=week_start + timedelta(days=day),
+                shift=shift,
+                required_skill=skill,
+            )
+            for (day, department, shift, skill), employee_id in zip(slots, result['assignments'])
+        ])
+    return roster, result
@@ -1,3 +1,147 @@
-from django.test import TestCase
+import random
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, tag
+
+from accounts.models import Hotel
+from .models import Employee, Roster, Shift
+from .scheduling import (
+    DEFAULT_TIME_BUDGET, MIN_REST_HOURS, SHIFT_HOURS, SHIFT_STARTS, RosterSolver, build_roster, staffing_demand,
+)
+
+
+FRONT_DESK = Employee.DEPARTMENT_FRONT_DESK
+WEEK_START = date(2030, 3, 4)
+
+
+def employee(employee_id, max_hours=40):
+    return {'id': employee_id, 'department': FRONT_DESK, 'skills': [], 'max_hours_per_week': max_hours}
+
+
+class RestRuleTests(TestCase):
+    def test_rest_is_kept_after_previous_week_night_shift(self):
+        slots = [(0, FRONT_DESK, Shift.SHIFT_EVENING, '')]
+
+        result = RosterSolver(slots, [employee(1)], previous_shifts={1: Shift.SHIFT_NIGHT}).solve(0.1)
+
+        # Night ends 07:00 Monday, so a 15:00 start leaves only 8 hours
+        self.assertEqual(result['assignments'], [None])
+
+    def test_colleague_covers_after_previous_week_night_shift(self):
+        slots = [(0, FRONT_DESK, Shift.SHIFT_MORNING, ''), (0, FRONT_DESK, Shift.SHIFT_NIGHT, '')]
+
+        result = RosterSolver(
+            slots, [employee(1), employee(2)], previous_shifts={1: Shift.SHIFT_NIGHT},
+        ).solve(0.1)
+
+        self.assertEqual(result['assignments'], [2, 1])
+
+    def test_previous_shift_does_not_use_weekly_hours(self):
+        slots = [(day, FRONT_DESK, Shift.SHIFT_MORNING, '') for day in range(5)]
+
+        result = RosterSolver(
+            slots, [employee(1, max_hours=40)], previous_shifts={1: Shift.SHIFT_MORNING},
+        ).solve(0.1)
+
+        self.assertEqual(result['unfilled'], 0)
+
+
+class BuildRosterTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('owner', 'owner@example.com', 'Str0ng!Pass')
+        self.hotel = Hotel.objects.create(user=user, hotel_name='Lakeside Inn', mobile_number='9812345670')
+        self.auditor = Employee.objects.create(
+            hotel=self.hotel, first_name='Night', department=FRONT_DESK, skills=[Employee.SKILL_NIGHT_AUDIT],
+        )
+        Employee.objects.bulk_create([
+            Employee(hotel=self.hotel, first_name=f'Desk {i}', department=FRONT_DESK,
+                     skills=[Employee.SKILL_NIGHT_AUDIT])
+            for i in range(4)
+        ])
+
+    def test_monday_respects_last_sunday_night(self):
+        previous = Roster.objects.create(hotel=self.hotel, week_start=WEEK_START - timedelta(days=7))
+        Shift.objects.create(
+            roster=previous, employee=self.auditor, department=FRONT_DESK,
+            date=WEEK_START - timedelta(days=1), shift=Shift.SHIFT_NIGHT,
+        )
+
+        roster, result = build_roster(self.hotel, WEEK_START, time_budget=0.2)
+
+        front_desk = roster.shifts.filter(department=FRONT_DESK)
+        self.assertFalse(front_desk.filter(employee__isnull=True).exists())
+        monday = front_desk.filter(employee=self.auditor, date=WEEK_START).values_list('shift', flat=True)
+        self.assertNotIn(Shift.SHIFT_MORNING, monday)
+        self.assertNotIn(Shift.SHIFT_EVENING, monday)
+
+
+def synthetic_staff(count, seed):
+    """A property's staff: three quarters housekeeping, the rest front desk"""
+    rng = random.Random(seed)
+    staff = []
+    for i in range(count):
+        department = Employee.DEPARTMENT_HOUSEKEEPING if i < count * 0.75 else FRONT_DESK
+        skills = []
+        if department == Employee.DEPARTMENT_HOUSEKEEPING and rng.random() < 0.15:
+            skills.append(Employee.SKILL_SUPERVISOR)
+        if department == FRONT_DESK and rng.random() < 0.3:
+            skills.append(Employee.SKILL_NIGHT_AUDIT)
+        staff.append({
+            'id': i + 1, 'department': department, 'skills': skills,
+            'max_hours_per_week': rng.choice([40, 40, 32, 24]),
+        })
+    return staff
+
+
+@tag('load')
+class RosterLoadTests(SimpleTestCase):
+    """200 employees rostered for a 300-room property"""
+
+    ROOMS = 300
+    EMPLOYEES = 200
+    # Time past the budget allowed for the last iteration and building the result
+    OVERRUN_MS = 500
+
+    def assert_labour_rules(self, slots, staff, result):
+        by_id = {person['id']: person for person in staff}
+        starts = {}
+        for (day, department, shift, skill), employee_id in zip(slots, result['assignments']):
+            if employee_id is None:
+                continue
+            person = by_id[employee_id]
+            self.assertEqual(person['department'], department)
+            if skill:
+                self.assertIn(skill, person['skills'])
+            starts.setdefault(employee_id, []).append(day * 24 + SHIFT_STARTS[shift])
+
+        for employee_id, hours in starts.items():
+            hours.sort()
+            self.assertLessEqual(len(hours) * SHIFT_HOURS, by_id[employee_id]['max_hours_per_week'])
+            self.assertEqual(len({start // 24 for start in hours}), len(hours), 'two shifts in a day')
+            for previous, following in zip(hours, hours[1:]):
+                self.assertGreaterEqual(following - previous - SHIFT_HOURS, MIN_REST_HOURS)
+
+    def roster(self, occupancy, seed, time_budget):
+        staff = synthetic_staff(self.EMPLOYEES, seed)
+        slots = staffing_demand(occupancy)
+
+        greedy = RosterSolver(slots, staff)
+        greedy.construct()
+        result = RosterSolver(slots, staff).solve(time_budget)
+
+        self.assertLessEqual(result['elapsed_ms'], time_budget * 1000 + self.OVERRUN_MS)
+        self.assertLessEqual(result['unfilled'], greedy.assigned.count(None))
+        self.assert_labour_rules(slots, staff, result)
+        return result
+
+    def test_busy_week(self):
+        result = self.roster([255, 270, 240, 230, 280, 300, 290], seed=1, time_budget=DEFAULT_TIME_BUDGET)
+        self.assertEqual(result['unfilled'], 0)
+
+    def test_random_weeks(self):
+        for seed in range(1, 4):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                occupancy = [rng.randint(self.ROOMS // 2, self.ROOMS) for _ in range(7)]
+                self.roster(occupancy, seed, time_budget=1.0)
@@ -0,0 +1,429 @@
+// Initialize Lucide Icons
+lucide.createIcons();
+
+// Endpoints
+const forgotPasswordUrl = document.getElementById('forgotPasswordForm').getAttribute('action');
+
+// Elements
+const toast = document.getElementById('toast');
+const emailInput = document.getElementById('email');
+const displayEmail = document.getElementById('displayEmail');
+const otpInputs = document.querySelectorAll('.otp-input');
+const newPasswordInput = document.getElementById('newPassword');
+const confirmPasswordInput = document.getElementById('confirmPassword');
+const passwordStrength = document.getElementById('passwordStrength');
+
+// Buttons
+const sendOtpBtn = document.getElementById('sendOtpBtn');
+const verifyOtpBtn = document.getElementById('verifyOtpBtn');
+const resetPasswordBtn = document.getElementById('resetPasswordBtn');
+const resendOtpBtn = document.getElementById('resendOtpBtn');
+const changeEmailBtn = document.getElementById('changeEmailBtn');
+const newPasswordToggle = document.getElementById('newPasswordToggle');
+const confirmPasswordToggle = document.getElementById('confirmPasswordToggle');
+
+// Step elements
+const step1Content = document.getElementById('step1Content');
+const step2Content = document.getElementById('step2Content');
+const step3Content = document.getElementById('step3Content');
+const step1Indicator = document.getElementById('step1Indicator');
+const step2Indicator = document.getElementById('step2Indicator');
+const step3Indicator = document.getElementById('step3Indicator');
+const divider1 = document.getElementById('divider1');
+const divider2 = document.getElementById('divider2');
+
+// State
+let currentEmail = '';
+let currentOtp = '';
+let resendTimer = null;
+let resendCountdown = 60;
+
+// Show Toast
+function showToast(message, type = 'error') {
+    const toastIcon = toast.querySelector('.toast-icon');
+    const toastMessage = toast.querySelector('.toast-message');
+
+    let iconName = 'alert-circle';
+    if (type === 'success') iconName = 'check-circle';
+    else if (type === 'warning') iconName = 'alert-triangle';
+
+    toastIcon.setAttribute('data-lucide', iconName);
+    toastMessage.textContent = message;
+
+    toast.className = 'toast';
+    toast.classList.add(type);
+
+    lucide.createIcons();
+
+    toast.classList.add('show');
+
+    setTimeout(() => {
+        toast.classList.remove('show');
+    }, 5000);
+}
+
+// Go to Step
+function goToStep(step) {
+    // Hide all content
+    step1Content.classList.remove('active');
+    step2Content.classList.remove('active');
+    step3Content.classList.remove('active');
+
+    // Reset indicators
+    step1Indicator.classList.remove('active', 'completed');
+    step2Indicator.classList.remove('active', 'completed');
+    step3Indicator.classList.remove('active', 'completed');
+    divider1.classList.remove('completed');
+    divider2.classList.remove('completed');
+
+    if (step === 1) {
+        step1Content.classList.add('active');
+        step1Indicator.classList.add('active');
+    } else if (step === 2) {
+        step2Content.classList.add('active');
+        step1Indicator.classList.add('completed');
+        step2Indicator.classList.add('active');
+        divider1.classList.add('completed');
+        startResendTimer();
+    } else if (step === 3) {
+        step3Content.classList.add('active');
+        step1Indicator.classList.add('completed');
+        step2Indicator.classList.add('completed');
+        step3Indicator.classList.add('active');
+        divider1.classList.add('completed');
+        divider2.classList.add('completed');
+    }
+}
+
+// Start Resend Timer
+function startResendTimer() {
+    resendCountdown = 60;
+    resendOtpBtn.disabled = true;
+    document.getElementById('resendTimer').textContent = `(${resendCountdown}s)`;
+
+    resendTimer = setInterval(() => {
+        resendCountdown--;
+        document.getElementById('resendTimer').textContent = `(${resendCountdown}s)`;
+
+        if (resendCountdown <= 0) {
+            clearInterval(resendTimer);
+            resendOtpBtn.disabled = false;
+            document.getElementById('resendTimer').textContent = '';
+        }
+    }, 1000);
+}
+
+// OTP Input Handling
+otpInputs.forEach((input, index) => {
+    input.addEventListener('input', function(e) {
+        const value = e.target.value;
+
+        // Only allow digits
+        if (!/^\d*$/.test(value)) {
+            e.target.value = '';
+            return;
+        }
+
+        if (value) {
+            e.target.classList.add('filled');
+            // Move to next input
+            if (index < otpInputs.length - 1) {
+                otpInputs[index + 1].focus();
+            }
+        } else {
+            e.target.classList.remove('filled');
+        }
+    });
+
+    input.addEventListener('keydown', function(e) {
+        // Handle backspace
+        if (e.key === 'Backspace' && !e.target.value && index > 0) {
+            otpInputs[index - 1].focus();
+        }
+    });
+
+    input.addEventListener('paste', function(e) {
+        e.preventDefault();
+        const pastedData = e.clipboardData.getData('text').slice(0, 6);
+
+        if (/^\d+$/.test(pastedData)) {
+            pastedData.split('').forEach((digit, i) => {
+                if (otpInputs[i]) {
+                    otpInputs[i].value = digit;
+                    otpInputs[i].classList.add('filled');
+                }
+            });
+
+            if (pastedData.length === 6) {
+                otpInputs[5].focus();
+            }
+        }
+    });
+});
+
+// Get OTP Value
+function getOtpValue() {
+    return Array.from(otpInputs).map(input => input.value).join('');
+}
+
+// Clear OTP Inputs
+function clearOtpInputs() {
+    otpInputs.forEach(input => {
+        input.value = '';
+        input.classList.remove('filled', 'error');
+    });
+    otpInputs[0].focus();
+}
+
+// Set Button Loading
+function setButtonLoading(button, loading) {
+    if (loading) {
+        button.classList.add('loading');
+        button.disabled = true;
+    } else {
+        button.classList.remove('loading');
+        button.disabled = false;
+    }
+}
+
+// Password Toggle
+function togglePassword(input, button) {
+    const icon = button.querySelector('i');
+    if (input.type === 'password') {
+        input.type = 'text';
+        icon.setAttribute('data-lucide', 'eye-off');
+    } else {
+        input.type = 'password';
+        icon.setAttribute('data-lucide', 'eye');
+    }
+    lucide.createIcons();
+}
+
+newPasswordToggle.addEventListener('click', () => togglePassword(newPasswordInput, newPasswordToggle));
+confirmPasswordToggle.addEventListener('click', () => togglePassword(confirmPasswordInput, confirmPasswordToggle));
+
+// Password Strength Indicator
+newPasswordInput.addEventListener('input', function() {
+    const password = this.value;
+    const bars = passwordStrength.querySelectorAll('.strength-bar');
+    let strength = 0;
+
+    if (password.length >= 8) strength++;
+    if (/[A-Z]/.test(password)) strength++;
+    if (/[0-9]/.test(password)) strength++;
+    if (/[!@#$%^&*(),.?":{}|<>_\-+=\[\]\\;\'`~]/.test(password)) strength++;
+
+    bars.forEach((bar, index) => {
+        bar.className = 'strength-bar';
+        if (index < strength) {
+            if (strength <= 1) bar.classList.add('weak');
+            else if (strength <= 2) bar.classList.add('medium');
+            else bar.classList.add('strong');
+        }
+    });
+});
+
+// Send OTP
+sendOtpBtn.addEventListener('click', async function() {
+    const email = emailInput.value.trim().toLowerCase();
+
+    if (!email) {
+        showToast('Please enter your email address.', 'error');
+        return;
+    }
+
+    const emailPattern = /^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$/;
+    if (!emailPattern.test(email)) {
+        showToast('Please enter a valid email address.', 'error');
+        return;
+    }
+
+    setButtonLoading(sendOtpBtn, true);
+
+    try {
+        const response = await fetch(forgotPasswordUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+            },
+            body: JSON.stringify({
+                action: 'send_otp',
+                email: email
+            })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            currentEmail = email;
+            displayEmail.textContent = email;
+            showToast(data.message, 'success');
+            goToStep(2);
+            setTimeout(() => otpInputs[0].focus(), 100);
+        } else {
+            showToast(data.message, 'error');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        showToast('An error occurred. Please try again.', 'error');
+    } finally {
+        setButtonLoading(sendOtpBtn, false);
+    }
+});
+
+// Verify OTP
+verifyOtpBtn.addEventListener('click', async function() {
+    const otp = getOtpValue();
+
+    if (otp.length !== 6) {
+        showToast('Please enter the complete 6-digit OTP.', 'error');
+        otpInputs.forEach(input => input.classList.add('error'));
+        return;
+    }
+
+    setButtonLoading(verifyOtpBtn, true);
+
+    try {
+        const response = await fetch(forgotPasswordUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+            },
+            body: JSON.stringify({
+                action: 'verify_otp',
+                email: currentEmail,
+                otp: otp
+            })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            currentOtp = otp;
+            showToast(data.message, 'success');
+            clearInterval(resendTimer);
+            goToStep(3);
+            setTimeout(() => newPasswordInput.focus(), 100);
+        } else {
+            showToast(data.message, 'error');
+            otpInputs.forEach(input => input.classList.add('error'));
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        showToast('An error occurred. Please try again.', 'error');
+    } finally {
+        setButtonLoading(verifyOtpBtn, false);
+    }
+});
+
+// Reset Password
+resetPasswordBtn.addEventListener('click', async function() {
+    const newPassword = newPasswordInput.value;
+    const confirmPassword = confirmPasswordInput.value;
+
+    if (!newPassword) {
+        showToast('Please enter a new password.', 'error');
+        return;
+    }
+
+    if (newPassword.length < 8) {
+        showToast('Password must be at least 8 characters.', 'error');
+        return;
+    }
+
+    if (!confirmPassword) {
+        showToast('Please confirm your password.', 'error');
+        return;
+    }
+
+    if (newPassword !== confirmPassword) {
+        showToast('Passwords do not match.', 'error');
+        return;
+    }
+
+    setButtonLoading(resetPasswordBtn, true);
+
+    try {
+        const response = await fetch(forgotPasswordUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+            },
+            body: JSON.stringify({
+                action: 'reset_password',
+                email: currentEmail,
+                otp: currentOtp,
+                new_password: newPassword,
+                confirm_password: confirmPassword
+            })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            showToast(data.message, 'success');
+            setTimeout(() => {
+                window.location.href = data.redirect;
+            }, 1500);
+        } else {
+            showToast(data.message, 'error');
+            setButtonLoading(resetPasswordBtn, false);
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        showToast('An error occurred. Please try again.', 'error');
+        setButtonLoading(resetPasswordBtn, false);
+    }
+});
+
+// Resend OTP
+resendOtpBtn.addEventListener('click', async function() {
+    setButtonLoading(resendOtpBtn, true);
+    clearOtpInputs();
+
+    try {
+        const response = await fetch(resendOtpBtn.dataset.url, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+            },
+            body: JSON.stringify({
+                email: currentEmail
+            })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            showToast(data.message, 'success');
+            startResendTimer();
+        } else {
+            showToast(data.message, 'error');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        showToast('An error occurred. Please try again.', 'error');
+    } finally {
+        setButtonLoading(resendOtpBtn, false);
+    }
+});
+
+// Change Email
+changeEmailBtn.addEventListener('click', function() {
+    clearInterval(resendTimer);
+    clearOtpInputs();
+    goToStep(1);
+    emailInput.focus();
+});
+
+// Enter key handling
+emailInput.addEventListener('keydown', function(e) {
+    if (e.key === 'Enter') {
+        e.preventDefault();
+        sendOtpBtn.click();
+    }
+});
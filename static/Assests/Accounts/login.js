@@ -0,0 +1,88 @@
+// Initialize Lucide Icons
+lucide.createIcons();
+
+// Elements
+const form = document.getElementById('loginForm');
+const submitBtn = document.getElementById('submitBtn');
+const toast = document.getElementById('toast');
+const passwordInput = document.getElementById('password');
+const passwordToggle = document.getElementById('passwordToggle');
+
+// Password Toggle
+passwordToggle.addEventListener('click', function() {
+    const icon = this.querySelector('i');
+    if (passwordInput.type === 'password') {
+        passwordInput.type = 'text';
+        icon.setAttribute('data-lucide', 'eye-off');
+    } else {
+        passwordInput.type = 'password';
+        icon.setAttribute('data-lucide', 'eye');
+    }
+    lucide.createIcons();
+});
+
+// Show Toast
+function showToast(message, type = 'error') {
+    const toastIcon = toast.querySelector('.toast-icon');
+    const toastMessage = toast.querySelector('.toast-message');
+
+    let iconName = 'alert-circle';
+    if (type === 'success') iconName = 'check-circle';
+    else if (type === 'warning') iconName = 'alert-triangle';
+
+    toastIcon.setAttribute('data-lucide', iconName);
+    toastMessage.textContent = message;
+
+    toast.className = 'toast';
+    toast.classList.add(type);
+
+    lucide.createIcons();
+
+    toast.classList.add('show');
+
+    setTimeout(() => {
+        toast.classList.remove('show');
+    }, 5000);
+}
+
+// Form Submit
+form.addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    submitBtn.classList.add('loading');
+    submitBtn.disabled = true;
+
+    const formData = {
+        email: document.getElementById('email').value,
+        password: document.getElementById('password').value
+    };
+
+    try {
+        const response = await fetch(form.getAttribute('action'), {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+            },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            showToast(data.message, 'success');
+            setTimeout(() => {
+                window.location.href = data.redirect;
+            }, 1000);
+        } else {
+            showToast(data.message, data.lockout ? 'warning' : 'error');
+            submitBtn.classList.remove('loading');
+            submitBtn.disabled = false;
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        showToast('An error occurred. Please try again.', 'error');
+        submitBtn.classList.remove('loading');
+        submitBtn.disabled = false;
+    }
+});
@@ -0,0 +1,173 @@
+// Initialize Lucide Icons
+lucide.createIcons();
+
+// Elements
+const form = document.getElementById('registerForm');
+const submitBtn = document.getElementById('submitBtn');
+const toast = document.getElementById('toast');
+const logoInput = document.getElementById('logoInput');
+const logoPreview = document.getElementById('logoPreview');
+const logoUploadCircle = document.getElementById('logoUploadCircle');
+const logoRemoveBtn = document.getElementById('logoRemoveBtn');
+const passwordInput = document.getElementById('password');
+const confirmPasswordInput = document.getElementById('confirmPassword');
+const passwordToggle = document.getElementById('passwordToggle');
+const confirmPasswordToggle = document.getElementById('confirmPasswordToggle');
+const passwordStrength = document.getElementById('passwordStrength');
+
+// Logo Upload Preview
+let logoFile = null;
+
+logoInput.addEventListener('change', function(e) {
+    const file = e.target.files[0];
+    if (file) {
+        // Check file size (max 2MB)
+        if (file.size > 2 * 1024 * 1024) {
+            showToast('Logo file is too large. Maximum size is 2MB.', 'error');
+            return;
+        }
+
+        // Check file type
+        const validTypes = ['image/png', 'image/jpeg', 'image/jpg', 'image/gif', 'image/webp'];
+        if (!validTypes.includes(file.type)) {
+            showToast('Invalid file type. Please use PNG, JPG, GIF, or WEBP.', 'error');
+            return;
+        }
+
+        logoFile = file;
+
+        const reader = new FileReader();
+        reader.onload = function(e) {
+            logoPreview.src = e.target.result;
+            logoPreview.classList.add('active');
+            logoUploadCircle.classList.add('has-image');
+            logoRemoveBtn.classList.add('active');
+        };
+        reader.readAsDataURL(file);
+    }
+});
+
+logoRemoveBtn.addEventListener('click', function() {
+    logoFile = null;
+    logoPreview.src = '';
+    logoPreview.classList.remove('active');
+    logoUploadCircle.classList.remove('has-image');
+    logoRemoveBtn.classList.remove('active');
+    logoInput.value = '';
+});
+
+// Password Toggle
+function togglePassword(input, button) {
+    const icon = button.querySelector('i');
+    if (input.type === 'password') {
+        input.type = 'text';
+        icon.setAttribute('data-lucide', 'eye-off');
+    } else {
+        input.type = 'password';
+        icon.setAttribute('data-lucide', 'eye');
+    }
+    lucide.createIcons();
+}
+
+passwordToggle.addEventListener('click', () => togglePassword(passwordInput, passwordToggle));
+confirmPasswordToggle.addEventListener('click', () => togglePassword(confirmPasswordInput, confirmPasswordToggle));
+
+// Password Strength Indicator
+passwordInput.addEventListener('input', function() {
+    const password = this.value;
+    const bars = passwordStrength.querySelectorAll('.strength-bar');
+    let strength = 0;
+
+    if (password.length >= 8) strength++;
+    if (/[A-Z]/.test(password)) strength++;
+    if (/[0-9]/.test(password)) strength++;
+    if (/[!@#$%^&*(),.?":{}|<>_\-+=\[\]\\;\'`~]/.test(password)) strength++;
+
+    bars.forEach((bar, index) => {
+        bar.className = 'strength-bar';
+        if (index < strength) {
+            if (strength <= 1) bar.classList.add('weak');
+            else if (strength <= 2) bar.classList.add('medium');
+            else bar.classList.add('strong');
+        }
+    });
+});
+
+// Show Toast
+function showToast(message, type = 'error') {
+    const toastIcon = toast.querySelector('.toast-icon');
+    const toastMessage = toast.querySelector('.toast-message');
+
+    // Set icon based on type
+    let iconName = 'alert-circle';
+    if (type === 'success') iconName = 'check-circle';
+    else if (type === 'warning') iconName = 'alert-triangle';
+
+    toastIcon.setAttribute('data-lucide', iconName);
+    toastMessage.textContent = message;
+
+    // Set toast type class
+    toast.className = 'toast';
+    toast.classList.add(type);
+
+    // Reinitialize icons
+    lucide.createIcons();
+
+    // Show toast
+    toast.classList.add('show');
+
+    // Hide after 5 seconds
+    setTimeout(() => {
+        toast.classList.remove('show');
+    }, 5000);
+}
+
+// Form Submit
+form.addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    // Disable button and show spinner
+    submitBtn.classList.add('loading');
+    submitBtn.disabled = true;
+
+    // Multipart, so the logo is streamed as a file instead of a base64 string
+    const formData = new FormData();
+    formData.append('hotel_name', document.getElementById('hotelName').value);
+    formData.append('email', document.getElementById('email').value);
+    formData.append('mobile_number', document.getElementById('mobileNumber').value);
+    formData.append('password', document.getElementById('password').value);
+    formData.append('confirm_password', document.getElementById('confirmPassword').value);
+    if (logoFile) {
+        formData.append('hotel_logo', logoFile);
+    }
+
+    try {
+        const response = await fetch(form.getAttribute('action'), {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+            },
+            body: formData
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            showToast(data.message, 'success');
+            // Redirect after short delay
+            setTimeout(() => {
+                window.location.href = data.redirect;
+            }, 1500);
+        } else {
+            showToast(data.message, 'error');
+            // Re-enable button
+            submitBtn.classList.remove('loading');
+            submitBtn.disabled = false;
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        showToast('An error occurred. Please try again.', 'error');
+        submitBtn.classList.remove('loading');
+        submitBtn.disabled = false;
+    }
+});
@@ -0,0 +1,370 @@
+// Initialize Lucide Icons
+lucide.createIcons();
+
+// Endpoints
+const updateProfileUrl = document.getElementById('generalForm').getAttribute('action');
+const uploadLogoUrl = document.getElementById('generalForm').dataset.uploadUrl;
+
+// Elements
+const toast = document.getElementById('toast');
+const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]').value;
+
+// Tabs
+const tabs = document.querySelectorAll('.profile-tab');
+const tabPanes = document.querySelectorAll('.tab-pane');
+
+tabs.forEach(tab => {
+    tab.addEventListener('click', () => {
+        const targetTab = tab.dataset.tab;
+
+        tabs.forEach(t => t.classList.remove('active'));
+        tabPanes.forEach(p => p.classList.remove('active'));
+
+        tab.classList.add('active');
+        document.getElementById(targetTab + 'Tab').classList.add('active');
+    });
+});
+
+// Password Toggle
+document.querySelectorAll('.password-toggle').forEach(btn => {
+    btn.addEventListener('click', () => {
+        const targetId = btn.dataset.target;
+        const input = document.getElementById(targetId);
+        const icon = btn.querySelector('i');
+
+        if (input.type === 'password') {
+            input.type = 'text';
+            icon.setAttribute('data-lucide', 'eye-off');
+        } else {
+            input.type = 'password';
+            icon.setAttribute('data-lucide', 'eye');
+        }
+        lucide.createIcons();
+    });
+});
+
+// Password Strength
+const newPasswordInput = document.getElementById('newPassword');
+const passwordStrength = document.getElementById('passwordStrength');
+
+newPasswordInput.addEventListener('input', function() {
+    const password = this.value;
+    const bars = passwordStrength.querySelectorAll('.strength-bar');
+    let strength = 0;
+
+    if (password.length >= 8) strength++;
+    if (/[A-Z]/.test(password)) strength++;
+    if (/[0-9]/.test(password)) strength++;
+    if (/[!@#$%^&*(),.?":{}|<>_\-+=\[\]\\;\'`~]/.test(password)) strength++;
+
+    bars.forEach((bar, index) => {
+        bar.className = 'strength-bar';
+        if (index < strength) {
+            if (strength <= 1) bar.classList.add('weak');
+            else if (strength <= 2) bar.classList.add('medium');
+            else bar.classList.add('strong');
+        }
+    });
+});
+
+// Logo Upload
+let logoFile = null;
+let removeLogo = false;
+
+// Last saved values, to tell whether the other fields changed
+let savedHotelName = document.getElementById('hotelName').value.trim();
+let savedMobileNumber = document.getElementById('mobileNumber').value.trim();
+const logoInput = document.getElementById('logoInput');
+const logoPreviewCircle = document.getElementById('logoPreviewCircle');
+const logoPlaceholder = document.getElementById('logoPlaceholder');
+const removeLogoBtn = document.getElementById('removeLogoBtn');
+
+logoInput.addEventListener('change', function(e) {
+    const file = e.target.files[0];
+    if (file) {
+        if (file.size > 2 * 1024 * 1024) {
+            showToast('Logo file is too large. Maximum size is 2MB.', 'error');
+            return;
+        }
+
+        const validTypes = ['image/png', 'image/jpeg', 'image/jpg', 'image/gif', 'image/webp'];
+        if (!validTypes.includes(file.type)) {
+            showToast('Invalid file type. Please use PNG, JPG, GIF, or WEBP.', 'error');
+            return;
+        }
+
+        logoFile = file;
+        removeLogo = false;
+        const previewUrl = URL.createObjectURL(file);
+
+        // Update preview
+        const currentPreview = document.getElementById('logoPreviewImg');
+        if (!currentPreview) {
+            const img = document.createElement('img');
+            img.id = 'logoPreviewImg';
+            img.alt = 'Logo';
+            img.src = previewUrl;
+            logoPreviewCircle.innerHTML = '';
+            logoPreviewCircle.appendChild(img);
+        } else {
+            currentPreview.src = previewUrl;
+        }
+
+        logoPreviewCircle.classList.add('has-image');
+        removeLogoBtn.classList.remove('hidden');
+
+        // Update header avatar
+        const headerAvatar = document.getElementById('headerAvatar');
+        const headerPlaceholder = document.getElementById('headerPlaceholder');
+        if (headerAvatar) {
+            headerAvatar.src = previewUrl;
+        } else if (headerPlaceholder) {
+            const img = document.createElement('img');
+            img.id = 'headerAvatar';
+            img.src = previewUrl;
+            img.alt = 'Logo';
+            headerPlaceholder.replaceWith(img);
+        }
+    }
+});
+
+removeLogoBtn.addEventListener('click', function() {
+    logoFile = null;
+    removeLogo = true;
+
+    // Reset preview
+    logoPreviewCircle.classList.remove('has-image');
+    logoPreviewCircle.innerHTML = '<span class="logo-preview-placeholder" id="logoPlaceholder">🏨</span>';
+    removeLogoBtn.classList.add('hidden');
+    logoInput.value = '';
+
+    // Reset header avatar
+    const headerAvatar = document.querySelector('.profile-avatar img');
+    if (headerAvatar) {
+        const placeholder = document.createElement('span');
+        placeholder.className = 'profile-avatar-placeholder';
+        placeholder.id = 'headerPlaceholder';
+        placeholder.textContent = '🏨';
+        headerAvatar.replaceWith(placeholder);
+    }
+});
+
+// Show Toast
+function showToast(message, type = 'error') {
+    const toastIcon = toast.querySelector('.toast-icon');
+    const toastMessage = toast.querySelector('.toast-message');
+
+    let iconName = 'alert-circle';
+    if (type === 'success') iconName = 'check-circle';
+    else if (type === 'warning') iconName = 'alert-triangle';
+
+    toastIcon.setAttribute('data-lucide', iconName);
+    toastMessage.textContent = message;
+
+    toast.className = 'toast';
+    toast.classList.add(type);
+
+    lucide.createIcons();
+    toast.classList.add('show');
+
+    setTimeout(() => {
+        toast.classList.remove('show');
+    }, 5000);
+}
+
+// General Form Submit
+document.getElementById('generalForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const btn = document.getElementById('generalSubmitBtn');
+    btn.classList.add('loading');
+    btn.disabled = true;
+
+    const hotelName = document.getElementById('hotelName').value;
+    const mobileNumber = document.getElementById('mobileNumber').value;
+    const fieldsChanged = removeLogo
+        || hotelName.trim() !== savedHotelName
+        || mobileNumber.trim() !== savedMobileNumber;
+
+    // Stream the logo as multipart before saving the other fields
+    if (logoFile) {
+        const uploadData = new FormData();
+        uploadData.append('hotel_logo', logoFile);
+        // update_profile sends the notification email when it runs too
+        uploadData.append('notify', fieldsChanged ? '0' : '1');
+
+        try {
+            const uploadResponse = await fetch(uploadLogoUrl, {
+                method: 'POST',
+                headers: {
+                    'X-CSRFToken': csrfToken
+                },
+                body: uploadData
+            });
+
+            const uploadResult = await uploadResponse.json();
+
+            if (!uploadResult.success) {
+                showToast(uploadResult.message, 'error');
+                btn.classList.remove('loading');
+                btn.disabled = false;
+                return;
+            }
+
+            logoFile = null;
+
+            // Nothing else to save
+            if (!fieldsChanged) {
+                showToast(uploadResult.message, 'success');
+                btn.classList.remove('loading');
+                btn.disabled = false;
+                return;
+            }
+        } catch (error) {
+            console.error('Error:', error);
+            showToast('Logo upload failed. Please try again.', 'error');
+            btn.classList.remove('loading');
+            btn.disabled = false;
+            return;
+        }
+    }
+
+    const formData = {
+        action: 'update_profile',
+        hotel_name: hotelName,
+        mobile_number: mobileNumber,
+        remove_logo: removeLogo
+    };
+
+    try {
+        const response = await fetch(updateProfileUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': csrfToken
+            },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            showToast(data.message, 'success');
+
+            // Update header name
+            document.getElementById('headerName').textContent = hotelName;
+            savedHotelName = hotelName.trim();
+            savedMobileNumber = mobileNumber.trim();
+
+            // Reset logo tracking
+            removeLogo = false;
+        } else {
+            showToast(data.message, 'error');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        showToast('An error occurred. Please try again.', 'error');
+    }
+
+    btn.classList.remove('loading');
+    btn.disabled = false;
+});
+
+// Email Form Submit
+document.getElementById('emailForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const btn = document.getElementById('emailSubmitBtn');
+    btn.classList.add('loading');
+    btn.disabled = true;
+
+    const formData = {
+        action: 'update_email',
+        new_email: document.getElementById('newEmail').value,
+        password: document.getElementById('emailPassword').value
+    };
+
+    try {
+        const response = await fetch(updateProfileUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': csrfToken
+            },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            showToast(data.message, 'success');
+
+            // Update header email
+            document.getElementById('headerEmail').textContent = document.getElementById('newEmail').value;
+
+            // Update current value display
+            document.querySelector('.current-value-text').textContent = document.getElementById('newEmail').value;
+
+            // Clear form
+            document.getElementById('newEmail').value = '';
+            document.getElementById('emailPassword').value = '';
+        } else {
+            showToast(data.message, 'error');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        showToast('An error occurred. Please try again.', 'error');
+    }
+
+    btn.classList.remove('loading');
+    btn.disabled = false;
+});
+
+// Password Form Submit
+document.getElementById('passwordForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const btn = document.getElementById('passwordSubmitBtn');
+    btn.classList.add('loading');
+    btn.disabled = true;
+
+    const formData = {
+        action: 'update_password',
+        current_password: document.getElementById('currentPassword').value,
+        new_password: document.getElementById('newPassword').value,
+        confirm_password: document.getElementById('confirmPassword').value
+    };
+
+    try {
+        const response = await fetch(updateProfileUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': csrfToken
+            },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            showToast(data.message, 'success');
+
+            // Redirect to login
+            if (data.redirect) {
+                setTimeout(() => {
+                    window.location.href = data.redirect;
+                }, 1500);
+            }
+        } else {
+            showToast(data.message, 'error');
+            btn.classList.remove('loading');
+            btn.disabled = false;
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        showToast('An error occurred. Please try again.', 'error');
+        btn.classList.remove('loading');
+        btn.disabled = false;
+    }
+});